@@ -17,61 +17,112 @@ Usage:
   python3 browser.py                    # Start Claude with browser in current folder
   python3 browser.py run ~/project      # Start in a specific folder
   python3 browser.py run -s             # Connect with zsh shell (--shell)
-  python3 browser.py list               # List running containers
+  python3 browser.py run --timings      # Startup phase breakdown (--timings=json also records it)
+  python3 browser.py list               # List running containers (VNC/CDP URLs)
   python3 browser.py shell [name]       # Attach to container
   python3 browser.py stop [name]        # Stop container
   python3 browser.py stopall            # Stop all containers
   python3 browser.py rm <name>          # Remove container + volumes
   python3 browser.py clean              # Full cleanup (containers+volumes+images)
+  python3 browser.py build --all        # Build base + all known project images concurrently
   python3 browser.py push               # Push image to registry
   python3 browser.py pull               # Pull image from registry
 """
 
+import contextlib
+import functools
 import hashlib
+import http.client
+import io
 import json
 import os
 import platform
 import re
+import socket
 import subprocess
 import sys
+import tarfile
 import textwrap
 import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from docker_engine import DockerError, api
+
 # ─── Configuration ────────────────────────────────────────
 LABEL = "agent-browser"
 DEFAULT_IMAGE = "agent-browser-sandbox"
+# Base image shared with claude-container (tag is the base.Dockerfile content hash)
+BASE_IMAGE = "claude-code-base"
+VOLUME_PREFIXES = ("agent-browser-config-", "agent-browser-history-", "agent-browser-firewall-")
+# Concurrent operations for stopall/rm/clean
+MAX_PARALLEL = 8
+# First host ports tried for KasmVNC and the Chrome DevTools Protocol (socat
+# forward); each container gets the next free pair, recorded in its labels
+VNC_PORT = 6901
+CDP_PORT = 9222
+PORT_SEARCH = 100
+# Startup script writes "phase EPOCHREALTIME" lines here (run --timings)
+TIMINGS_FILE = "/tmp/.startup-timings"
+STATE_DIR = Path.home() / ".cache" / "agent-browser-container"
+# The container's node user (default uid/gid in the node image)
+NODE_UID = 1000
 
 # ─── Embedded files ──────────────────────────────────────
 
-DOCKERFILE = textwrap.dedent("""\
-    FROM node:24-bookworm-slim
+# Base image shared with claude-container (base.Dockerfile is a symlink to
+# its copy). The tag is the content hash, so both tools build it once.
+BASE_DOCKERFILE = (Path(__file__).parent / "base.Dockerfile").read_text()
+BASE_REF = f"{BASE_IMAGE}:{hashlib.sha256(BASE_DOCKERFILE.encode()).hexdigest()[:12]}"
+# Base stage inlined into the generated Dockerfile (parser directives only count at the top)
+BASE_STAGE = BASE_DOCKERFILE.removeprefix("# syntax=docker/dockerfile:1\n")
+
+DOCKERFILE = textwrap.dedent(f"""\
+    # syntax=docker/dockerfile:1
+    # browser.py builds with BASE={BASE_REF} (the shared base image, built first
+    # when missing); devcontainer/docker build use the shared-base stage below instead
+    ARG BASE=shared-base
 
-    ARG CLAUDE_CODE_VERSION=latest
+""") + BASE_STAGE + textwrap.dedent(f"""\
 
-    RUN apt-get update && apt-get install -y --no-install-recommends \\
-        git curl sudo ca-certificates wget openssl \\
-        zsh fzf ripgrep jq tmux \\
-        iptables iproute2 dnsutils socat \\
-        locales \\
+    FROM ${{BASE}} AS base
+
+    # Downloads are separate stages so BuildKit fetches them concurrently with the apt layer
+    FROM base AS kasmvnc
+    RUN ARCH=$(dpkg --print-architecture) && \\
+        curl -fsSL -o /kasmvncserver.deb \\
+        "https://github.com/kasmtech/KasmVNC/releases/download/v1.4.0/kasmvncserver_bookworm_1.4.0_${{ARCH}}.deb"
+
+    FROM base AS chromium
+    ENV PLAYWRIGHT_BROWSERS_PATH=/opt/ms-playwright
+    RUN mkdir -p /opt/ms-playwright && chown node:node /opt/ms-playwright
+    USER node
+    # Playwright's bundled Chromium (its system libraries come from the apt layer below)
+    RUN --mount=type=cache,target=/home/node/.npm,uid=1000,gid=1000 \\
+        npx playwright install chromium
+
+    FROM base
+
+    # Browser libraries + KasmVNC (single binary replaces Xvfb + x11vnc + websockify + noVNC)
+    RUN --mount=type=cache,target=/var/cache/apt,sharing=locked \\
+        --mount=type=cache,target=/var/lib/apt,sharing=locked \\
+        --mount=type=bind,from=kasmvnc,source=/kasmvncserver.deb,target=/tmp/kasmvncserver.deb \\
+        apt-get update && apt-get install -y --no-install-recommends \\
+        wget openssl socat \\
         fonts-noto-cjk fonts-noto-color-emoji \\
         openbox \\
         libnss3 libatk-bridge2.0-0 libdrm2 libxcomposite1 \\
         libxdamage1 libxrandr2 libgbm1 libasound2 libxfixes3 \\
         libcups2 libxkbcommon0 libcairo2 libpango-1.0-0 \\
         xdg-utils \\
-        && rm -rf /var/lib/apt/lists/*
-
-    # KasmVNC (single binary replaces Xvfb + x11vnc + websockify + noVNC)
-    RUN ARCH=$(dpkg --print-architecture) && \\
-        wget -q "https://github.com/kasmtech/KasmVNC/releases/download/v1.4.0/kasmvncserver_bookworm_1.4.0_${ARCH}.deb" && \\
-        apt-get update && apt-get install -y --no-install-recommends ./kasmvncserver_bookworm_*.deb && \\
-        rm -f kasmvncserver_bookworm_*.deb && rm -rf /var/lib/apt/lists/*
-
-    RUN sed -i '/ko_KR.UTF-8/s/^# //' /etc/locale.gen && locale-gen
-    ENV LANG=ko_KR.UTF-8 LC_ALL=ko_KR.UTF-8
+        /tmp/kasmvncserver.deb
 
-    RUN npm install -g @anthropic-ai/claude-code@${CLAUDE_CODE_VERSION}
+    ENV PLAYWRIGHT_BROWSERS_PATH=/opt/ms-playwright
+    COPY --from=chromium --chown=node:node /opt/ms-playwright /opt/ms-playwright
 
     ENV DISPLAY=:1
     ENV VNC_PORT=6901
@@ -79,27 +130,15 @@ DOCKERFILE = textwrap.dedent("""\
 
     COPY init-firewall.sh /usr/local/bin/
     COPY start-kasmvnc.sh /usr/local/bin/
-    USER root
     RUN chmod +x /usr/local/bin/init-firewall.sh /usr/local/bin/start-kasmvnc.sh && \\
         echo "node ALL=(root) NOPASSWD: /usr/local/bin/init-firewall.sh" > /etc/sudoers.d/node-firewall && \\
         chmod 0440 /etc/sudoers.d/node-firewall
 
-    RUN mkdir -p /commandhistory /downloads && \\
-        chown node:node /commandhistory /downloads
-    RUN chsh -s /usr/bin/zsh node
-
+    RUN mkdir -p /downloads && chown node:node /downloads
     RUN mkdir -p /home/node/.vnc && chown node:node /home/node/.vnc
 
-    RUN su - node -c 'echo "HISTFILE=/commandhistory/.zsh_history\\nHISTSIZE=10000\\nSAVEHIST=10000\\nsetopt appendhistory\\nautoload -Uz compinit && compinit" > ~/.zshrc'
-
-    ENV PLAYWRIGHT_BROWSERS_PATH=/opt/ms-playwright
-    RUN mkdir -p /opt/ms-playwright && chown node:node /opt/ms-playwright
-
     USER node
     WORKDIR /workspace
-
-    # Install Playwright + its bundled Chromium
-    RUN npx playwright install chromium
 """)
 
 KASMVNC_SH = textwrap.dedent("""\
@@ -108,9 +147,25 @@ KASMVNC_SH = textwrap.dedent("""\
 
     VNC_PORT="${VNC_PORT:-6901}"
     VNC_RESOLUTION="${VNC_RESOLUTION:-1920x1080}"
+    READY_TIMEOUT="${READY_TIMEOUT:-30}"
+
+    # Phase marker for `browser.py run --timings`
+    mark() { echo "$1 $EPOCHREALTIME" >> /tmp/.startup-timings 2>/dev/null || true; }
+
+    # Wait until a local TCP port accepts, polling with exponential backoff
+    # (50 ms doubling up to 500 ms); fails after READY_TIMEOUT seconds
+    wait_port() {
+        local port=$1 deadline=$((SECONDS + READY_TIMEOUT)) ms=50
+        until (exec 3<>"/dev/tcp/127.0.0.1/$port") 2>/dev/null; do
+            [ "$SECONDS" -ge "$deadline" ] && return 1
+            sleep "$((ms / 1000)).$(printf '%03d' $((ms % 1000)))"
+            ms=$((ms * 2 > 500 ? 500 : ms * 2))
+        done
+    }
 
     # Create dirs (tmpfs wipes /home/node on each start)
     mkdir -p /home/node/.vnc
+    [ -f /home/node/.zshrc ] || printf 'HISTFILE=/commandhistory/.zsh_history\\nHISTSIZE=10000\\nSAVEHIST=10000\\nsetopt appendhistory\\nautoload -Uz compinit && compinit\\n' > /home/node/.zshrc
 
     # Create a dummy KasmVNC user with write access (required internally even with auth disabled)
     printf 'dummypass\\ndummypass\\n' | kasmvncpasswd -u node -w -o 2>&1 || true
@@ -145,15 +200,18 @@ KASMVNC_SH = textwrap.dedent("""\
         -SecurityTypes None \\
         -log '*:stderr:30' 2>&1 &
 
-    sleep 3
-
-    echo ""
-    echo "========================================="
-    echo "  KasmVNC ready!"
-    echo "  URL: http://localhost:${VNC_PORT}"
-    echo "  (No authentication required)"
-    echo "========================================="
-    echo ""
+    if wait_port "$VNC_PORT"; then
+        mark kasmvnc
+        echo ""
+        echo "========================================="
+        echo "  KasmVNC ready!"
+        echo "  URL: http://localhost:${VNC_PORT}"
+        echo "  (No authentication required)"
+        echo "========================================="
+        echo ""
+    else
+        echo "WARNING: KasmVNC not listening on port $VNC_PORT after ${READY_TIMEOUT}s"
+    fi
 
     # Launch Chromium with CDP (Chrome DevTools Protocol)
     export DISPLAY=:1
@@ -173,9 +231,13 @@ KASMVNC_SH = textwrap.dedent("""\
             --window-size=1920,1080 \
             --start-maximized \
             "about:blank" &
-        sleep 2
-        echo "Chrome launched with CDP on port 9222"
-        echo "  CDP: http://localhost:9222"
+        if wait_port 9222; then
+            mark chrome
+            echo "Chrome launched with CDP on port 9222"
+            echo "  CDP: http://localhost:9222"
+        else
+            echo "WARNING: Chrome CDP not listening on port 9222 after ${READY_TIMEOUT}s"
+        fi
         # Forward CDP from 0.0.0.0:9222 -> 127.0.0.1:9222 (Chrome ignores --remote-debugging-address)
         socat TCP-LISTEN:9223,fork,reuseaddr,bind=0.0.0.0 TCP:127.0.0.1:9222 &
     else
@@ -187,6 +249,7 @@ FIREWALL_SH = textwrap.dedent("""\
     #!/usr/bin/env bash
     set -uo pipefail
 
+    START_NS=$(date +%s%N)
     echo "Initializing firewall (browser mode)..."
 
     if command -v iptables-legacy &>/dev/null; then
@@ -200,15 +263,6 @@ FIREWALL_SH = textwrap.dedent("""\
         exit 0
     fi
 
-    $IPT -F OUTPUT 2>/dev/null || true
-    $IPT -P OUTPUT DROP
-
-    $IPT -A OUTPUT -o lo -j ACCEPT
-    $IPT -A OUTPUT -m state --state ESTABLISHED,RELATED -j ACCEPT
-    $IPT -A OUTPUT -p udp --dport 53 -j ACCEPT
-    $IPT -A OUTPUT -p tcp --dport 53 -j ACCEPT
-    $IPT -A OUTPUT -p tcp --dport 22 -j ACCEPT
-
     ALLOWED_DOMAINS=(
         "api.anthropic.com"
         "statsig.anthropic.com"
@@ -220,19 +274,77 @@ FIREWALL_SH = textwrap.dedent("""\
         "objects.githubusercontent.com"
     )
 
-    for domain in "${ALLOWED_DOMAINS[@]}"; do
-        for ip in $(dig +short "$domain" A 2>/dev/null | grep -E '^[0-9]+\\\\.' || true); do
-            $IPT -A OUTPUT -d "$ip" -j ACCEPT 2>/dev/null || true
+    # Resolved IP cache, kept on a root-only volume: within the TTL, restarts skip DNS
+    # (a changed domain list hashes to a different file and is resolved again).
+    # Never somewhere node can write (/commandhistory): the sandbox could widen the allowlist
+    CACHE_DIR="${FIREWALL_CACHE_DIR:-/var/cache/firewall}"
+    CACHE_TTL="${FIREWALL_CACHE_TTL:-3600}"
+    KEY=$(printf '%s\\n' "${ALLOWED_DOMAINS[@]}" | md5sum | cut -c1-12)
+    CACHE_FILE="$CACHE_DIR/.firewall-ips-$KEY"
+    # Only cache in a real (non-symlink) directory owned by root
+    if [ -L "$CACHE_DIR" ] || ! mkdir -p "$CACHE_DIR" 2>/dev/null || [ "$(stat -c %u "$CACHE_DIR")" != 0 ] \\
+        || ! chmod 0700 "$CACHE_DIR" 2>/dev/null; then
+        CACHE_FILE=""
+    fi
+    # Rules only ever get plain dotted-quad IPv4 addresses (no CIDR, no 0.0.0.0/0)
+    OCTET='(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])'
+    IPV4_RE="^($OCTET\\.){3}$OCTET\\$"
+
+    IPS=""
+    if [ -n "$CACHE_FILE" ] && [ -f "$CACHE_FILE" ] && [ ! -L "$CACHE_FILE" ] && [ -s "$CACHE_FILE" ] \\
+        && [ $(( $(date +%s) - $(stat -c %Y "$CACHE_FILE") )) -lt "$CACHE_TTL" ]; then
+        IPS=$(cat "$CACHE_FILE")
+        if printf '%s\\n' "$IPS" | grep -Evq "$IPV4_RE"; then
+            echo "Discarding IP cache: it has a line that is not an IPv4 address"
+            rm -f "$CACHE_FILE"
+            IPS=""
+        else
+            SOURCE="cache"
+        fi
+    fi
+    if [ -z "$IPS" ]; then
+        # Resolve all domains concurrently
+        SOURCE="dns"
+        TMP=$(mktemp -d)
+        for domain in "${ALLOWED_DOMAINS[@]}"; do
+            dig +short +time=2 +tries=2 "$domain" A > "$TMP/$domain" 2>/dev/null &
         done
-    done
+        wait
+        IPS=$(cat "$TMP"/* | grep -E "$IPV4_RE" | sort -u)
+        rm -rf "$TMP"
+        if [ -n "$IPS" ] && [ -n "$CACHE_FILE" ] && NEW=$(mktemp "$CACHE_DIR/.firewall-ips.XXXXXX" 2>/dev/null); then
+            printf '%s\\n' "$IPS" > "$NEW" && mv -f "$NEW" "$CACHE_FILE" || rm -f "$NEW"
+        fi
+    fi
 
+    # Build the complete ruleset and apply it atomically with one iptables-restore
+    {
+        echo "*filter"
+        echo ":INPUT ACCEPT [0:0]"
+        echo ":FORWARD ACCEPT [0:0]"
+        echo ":OUTPUT DROP [0:0]"
+        echo "-A OUTPUT -o lo -j ACCEPT"
+        echo "-A OUTPUT -m state --state ESTABLISHED,RELATED -j ACCEPT"
+        echo "-A OUTPUT -p udp --dport 53 -j ACCEPT"
+        echo "-A OUTPUT -p tcp --dport 53 -j ACCEPT"
+        echo "-A OUTPUT -p tcp --dport 22 -j ACCEPT"
+        for ip in $IPS; do
+            echo "-A OUTPUT -d $ip -j ACCEPT"
+        done
+        if [ "${CHROME_ALLOW_ALL:-0}" = "1" ]; then
+            echo "-A OUTPUT -p tcp --dport 80 -j ACCEPT"
+            echo "-A OUTPUT -p tcp --dport 443 -j ACCEPT"
+        fi
+        echo "COMMIT"
+    } | "$IPT-restore" || { echo "iptables-restore failed -- firewall not applied"; exit 1; }
+
+    ELAPSED_MS=$(( ($(date +%s%N) - START_NS) / 1000000 ))
     if [ "${CHROME_ALLOW_ALL:-0}" = "1" ]; then
-        $IPT -A OUTPUT -p tcp --dport 80 -j ACCEPT
-        $IPT -A OUTPUT -p tcp --dport 443 -j ACCEPT
-        echo "Firewall ready (${#ALLOWED_DOMAINS[@]} domains + ALL HTTP/HTTPS allowed)"
+        SCOPE="${#ALLOWED_DOMAINS[@]} domains + ALL HTTP/HTTPS allowed"
     else
-        echo "Firewall ready (${#ALLOWED_DOMAINS[@]} domains whitelisted, HTTP/HTTPS restricted)"
+        SCOPE="${#ALLOWED_DOMAINS[@]} domains whitelisted, HTTP/HTTPS restricted"
     fi
+    echo "Firewall ready ($SCOPE; $(echo $IPS | wc -w) IPs from $SOURCE) in ${ELAPSED_MS}ms"
 """)
 
 DEVCONTAINER_JSON = textwrap.dedent("""\
@@ -257,7 +369,8 @@ DEVCONTAINER_JSON = textwrap.dedent("""\
       "remoteUser": "node",
       "mounts": [
         "source=agent-browser-bashhistory-${devcontainerId},target=/commandhistory,type=volume",
-        "source=agent-browser-config-${devcontainerId},target=/home/node/.claude,type=volume"
+        "source=agent-browser-config-${devcontainerId},target=/home/node/.claude,type=volume",
+        "source=agent-browser-firewall-${devcontainerId},target=/var/cache/firewall,type=volume"
       ],
       "containerEnv": {
         "NODE_OPTIONS": "--max-old-space-size=4096",
@@ -271,6 +384,18 @@ DEVCONTAINER_JSON = textwrap.dedent("""\
     }
 """)
 
+# Files written to .devcontainer-browser/ (name -> content) and which of them are build inputs
+GENERATED_FILES = {
+    "Dockerfile": DOCKERFILE,
+    "init-firewall.sh": FIREWALL_SH,
+    "start-kasmvnc.sh": KASMVNC_SH,
+    "devcontainer.json": DEVCONTAINER_JSON,
+}
+EXECUTABLE_FILES = ("init-firewall.sh", "start-kasmvnc.sh")
+BUILD_INPUTS = ("Dockerfile", "init-firewall.sh", "start-kasmvnc.sh")
+# Hashes of the files we generated (tells them apart from user edits)
+MANIFEST = ".generated.json"
+
 
 # ─── Utilities ────────────────────────────────────────────
 
@@ -294,6 +419,24 @@ def image_name() -> str:
     return os.environ.get("BROWSER_IMAGE", DEFAULT_IMAGE)
 
 
+def build_hash(devc: Path | None = None) -> str:
+    """Hash of the build input files (the embedded ones if devc is None)."""
+    h = hashlib.sha256()
+    for fname in BUILD_INPUTS:
+        data = (devc / fname).read_bytes() if devc else GENERATED_FILES[fname].encode()
+        h.update(fname.encode() + b"\0" + data + b"\0")
+    return h.hexdigest()[:12]
+
+
+def image_ref(devc: Path | None = None) -> str:
+    """Image name:tag. The tag is the build input hash, so a new image is only
+    built when the files change. A tag given in BROWSER_IMAGE is used as is."""
+    img = image_name()
+    if ":" in img.rsplit("/", 1)[-1]:
+        return img
+    return f"{img}:{build_hash(devc)}"
+
+
 def slugify(name: str) -> str:
     return re.sub(r"[^a-z0-9-]", "-", name.lower()).strip("-")
 
@@ -323,9 +466,96 @@ def err(msg: str):
 
 
 def running_containers() -> list[str]:
-    r = docker("ps", "--filter", f"label={LABEL}=true", "--format", "{{.Names}}",
-               capture_output=True, text=True)
-    return [n for n in r.stdout.strip().splitlines() if n]
+    return [c["Names"][0].lstrip("/") for c in api().containers(LABEL)]
+
+
+def container_ports(c: dict) -> tuple[int | None, int | None]:
+    """(VNC, CDP) host ports of a /containers/json entry: from its labels, or the
+    published ports for containers created before per-container allocation."""
+    labels = c.get("Labels") or {}
+    published = {p.get("PrivatePort"): p.get("PublicPort") for p in c.get("Ports") or []}
+    vnc = labels.get(f"{LABEL}.vnc-port") or published.get(6901)
+    cdp = labels.get(f"{LABEL}.cdp-port") or published.get(9223)
+    return (int(vnc) if vnc else None, int(cdp) if cdp else None)
+
+
+def free_port(start: int, taken: set[int]) -> int:
+    """First port from start that no other container holds and the host can bind."""
+    for port in range(start, start + PORT_SEARCH):
+        if port in taken:
+            continue
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # Like Docker's own listener: TIME_WAIT left by readiness probes of a
+            # just-stopped container must not count as taken
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                s.bind(("0.0.0.0", port))
+            except OSError:
+                continue
+        return port
+    raise DockerError(f"No free port in {start}-{start + PORT_SEARCH - 1}")
+
+
+def allocate_ports(taken: set[int]) -> tuple[int, int]:
+    """Host (VNC, CDP) ports for a new container, skipping ports of running ones."""
+    for c in api().containers(LABEL):
+        taken |= {p for p in container_ports(c) if p}
+    return free_port(VNC_PORT, taken), free_port(CDP_PORT, taken)
+
+
+def volume_mount(source: str, target: str, name: str) -> dict:
+    """Named volume mount, labelled with its container so cleanup is one prune."""
+    return {"Type": "volume", "Source": source, "Target": target,
+            "VolumeOptions": {"Labels": {LABEL: "true", f"{LABEL}.container": name}}}
+
+
+def remove_volumes(names: list[str], label: str):
+    """Remove volumes with a single label prune; only older volumes created
+    without labels are removed one by one by name."""
+    removed = set(api().prune_volumes(label))
+    for v in names:
+        if v not in removed:
+            api().remove_volume(v)
+
+
+@functools.cache
+def stop_timeout() -> int | None:
+    """Seconds to wait before killing on stop; Docker's default (10) unless
+    BROWSER_STOP_TIMEOUT is set to a valid value."""
+    value = os.environ.get("BROWSER_STOP_TIMEOUT", "").strip()
+    if not value:
+        return None
+    try:
+        seconds = int(value)
+    except ValueError:
+        seconds = -1
+    if seconds < 0:
+        warn(f"Ignoring BROWSER_STOP_TIMEOUT={value!r} (expected whole seconds >= 0), using Docker's default")
+        return None
+    return seconds
+
+
+def run_parallel(names: list[str], action, done: str) -> int:
+    """Run action(name) concurrently on a bounded thread pool and report the
+    results together; wall time follows the slowest container, not the sum.
+    Returns the number of failures."""
+    if not names:
+        return 0
+    started = time.monotonic()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL, len(names))) as pool:
+        futures = {pool.submit(action, n): n for n in names}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                ok(f"{done}: {futures[future]}")
+            except (DockerError, OSError) as e:
+                # A connection error (ConnectionError etc.) in one task must not drop the other results
+                failed += 1
+                err(f"Failed: {futures[future]} ({e})")
+    info(f"{done} {len(names) - failed}/{len(names)}"
+         f"{f', {failed} failed' if failed else ''} ({time.monotonic() - started:.1f}s)")
+    return failed
 
 
 def tty_flags() -> list[str]:
@@ -353,75 +583,288 @@ def get_host_credentials() -> tuple[str | None, str | None]:
     return None, None
 
 
+def tar_add(tar: tarfile.TarFile, path: str, data: bytes, mode: int):
+    """Add a file owned by node to the tar archive."""
+    entry = tarfile.TarInfo(path)
+    entry.uid = entry.gid = NODE_UID
+    entry.uname = entry.gname = "node"
+    entry.mode = mode
+    entry.mtime = int(time.time())
+    entry.size = len(data)
+    tar.addfile(entry, io.BytesIO(data))
+
+
+def read_container_json(ctr_name: str, path: str) -> dict:
+    """Read a JSON file from the container; {} if missing or invalid."""
+    data = api().get_archive(ctr_name, path)
+    if data is None:
+        return {}
+    try:
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            member = tar.next()
+            f = tar.extractfile(member) if member else None
+            return json.loads(f.read()) if f else {}
+    except (tarfile.TarError, ValueError):
+        return {}
+
+
 def inject_credentials_file(ctr_name: str, creds_json: str):
-    """Inject host OAuth credentials as .credentials.json into the container
-    and set hasCompletedOnboarding to skip interactive login."""
-    docker("exec", "-u", "root", ctr_name, "chown", "node:node",
-           "/home/node/.claude", capture_output=True)
-    # Inject .credentials.json
-    run(["docker", "exec", "-i", ctr_name,
-         "sh", "-c", "cat > /home/node/.claude/.credentials.json"],
-        input=creds_json, text=True, capture_output=True)
-    docker("exec", "-u", "root", ctr_name, "sh", "-c",
-           "chmod 600 /home/node/.claude/.credentials.json && "
-           "chown node:node /home/node/.claude/.credentials.json",
-           capture_output=True)
-    # Set hasCompletedOnboarding in .claude.json (skip interactive login screen)
-    onboarding_script = (
-        "const fs = require('fs');"
-        "const p = '/home/node/.claude/.claude.json';"
-        "let d = {};"
-        "try { d = JSON.parse(fs.readFileSync(p, 'utf8')); } catch {}"
-        "d.hasCompletedOnboarding = true;"
-        "fs.writeFileSync(p, JSON.stringify(d));"
-    )
-    docker("exec", ctr_name, "node", "-e", onboarding_script,
-           capture_output=True)
+    """Write host OAuth credentials as .credentials.json and .claude.json with
+    hasCompletedOnboarding (skips interactive login) as one tar archive.
+    .claude.json is merged on the host, so there are no execs, only one
+    archive read and one archive write. The target is the config volume:
+    /home/node itself is a tmpfs on a read-only rootfs, which the archive
+    API cannot write to (.zshrc is written by start-kasmvnc.sh instead)."""
+    claude_json = read_container_json(ctr_name, "/home/node/.claude/.claude.json")
+    claude_json["hasCompletedOnboarding"] = True
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        tar_add(tar, ".credentials.json", creds_json.encode(), 0o600)
+        tar_add(tar, ".claude.json", json.dumps(claude_json).encode(), 0o644)
+    api().put_archive(ctr_name, "/home/node/.claude", buf.getvalue())
 
 
 # ─── .devcontainer generation ─────────────────────────────
 
-def ensure_devcontainer(project_dir: Path) -> Path:
-    """Create .devcontainer-browser/ in the project if it does not exist.
-    Uses a separate directory to avoid conflicts with .devcontainer/ from claude-container."""
-    devc = project_dir / ".devcontainer-browser"
+def sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
 
-    if devc.exists() and (devc / "Dockerfile").exists():
-        return devc
 
-    info(f"Creating .devcontainer: {devc}")
+def ensure_devcontainer(project_dir: Path) -> Path:
+    """Create or refresh .devcontainer-browser/ in the project.
+    Uses a separate directory to avoid conflicts with .devcontainer/ from claude-container.
+    Files the user edited (hash differs from the recorded one) are left alone;
+    older versions written before hashes were recorded are kept as .bak."""
+    devc = project_dir / ".devcontainer-browser"
+    if not devc.exists():
+        info(f"Creating .devcontainer: {devc}")
     devc.mkdir(parents=True, exist_ok=True)
 
-    (devc / "Dockerfile").write_text(DOCKERFILE)
-    (devc / "init-firewall.sh").write_text(FIREWALL_SH)
-    os.chmod(devc / "init-firewall.sh", 0o755)
-    (devc / "start-kasmvnc.sh").write_text(KASMVNC_SH)
-    os.chmod(devc / "start-kasmvnc.sh", 0o755)
-    (devc / "devcontainer.json").write_text(DEVCONTAINER_JSON)
-
-    ok(".devcontainer created")
+    try:
+        recorded = json.loads((devc / MANIFEST).read_text())
+    except (OSError, ValueError):
+        recorded = {}
+
+    manifest = dict(recorded)
+    updated = []
+    for fname, content in GENERATED_FILES.items():
+        path = devc / fname
+        want = sha256(content)
+        if path.exists():
+            have = sha256(path.read_text())
+            if have == want:
+                manifest[fname] = want
+                continue
+            if fname in manifest and manifest[fname] != have:
+                continue  # edited by the user
+            if fname not in manifest:
+                path.replace(path.with_name(f"{fname}.bak"))
+                warn(f"Kept previous {fname} as {fname}.bak")
+        path.write_text(content)
+        if fname in EXECUTABLE_FILES:
+            os.chmod(path, 0o755)
+        manifest[fname] = want
+        updated.append(fname)
+
+    if manifest != recorded:
+        (devc / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    if updated:
+        ok(f".devcontainer updated: {', '.join(updated)}")
     return devc
 
 
 # ─── Image build ──────────────────────────────────────────
 
-def ensure_image(project_dir: Path) -> str:
-    """Build the image if it does not exist. Returns the image name."""
-    img = image_name()
-    r = docker("image", "inspect", img, capture_output=True)
-    if r.returncode == 0:
-        return img
+def docker_build(img: str, *args: str, quiet: bool = False, **kwargs):
+    """Build with BuildKit (apt/npm cache mounts, only changed layers rebuild).
+    With quiet, output is captured and only its tail is raised as DockerError
+    on failure (for concurrent builds)."""
+    env = {**os.environ, "DOCKER_BUILDKIT": "1"}
+    if not quiet:
+        info(f"Building image: {img}")
+        docker_check("build", "-t", img, *args, env=env, **kwargs)
+        ok(f"Build complete: {img}")
+        return
+    r = docker("build", "--progress=plain", "-t", img, *args, env=env,
+               capture_output=True, **kwargs)
+    if r.returncode != 0:
+        tail = "\n".join(r.stderr.decode(errors="replace").strip().splitlines()[-10:])
+        raise DockerError(f"build failed\n{tail}")
+
+
+def build_base(quiet: bool = False):
+    """Build the shared base image (no build context, Dockerfile on stdin)."""
+    docker_build(BASE_REF, "-", quiet=quiet, input=BASE_DOCKERFILE.encode())
+
+
+def base_args(dockerfile: str) -> list[str] | None:
+    """Build args that swap in the shared base image, or None if the Dockerfile
+    cannot use it (its base stage was edited)."""
+    if BASE_STAGE in dockerfile:
+        return ["--build-arg", f"BASE={BASE_REF}"]
+    return None
+
+
+def build_image(devc: Path, img: str, quiet: bool = False):
+    """Build a project image on the shared base image when it can use it (building the base first if missing)."""
+    args = base_args((devc / "Dockerfile").read_text())
+    if args is not None and api().inspect_image(BASE_REF) is None:
+        build_base(quiet)
+    docker_build(img, *(args or []), "-f", str(devc / "Dockerfile"), str(devc), quiet=quiet)
 
+
+def ensure_image(project_dir: Path) -> str:
+    """Build if the build inputs changed (no image under the hash tag). Returns name:tag."""
     devc = ensure_devcontainer(project_dir)
-    info(f"Building image: {img}")
-    docker_check("build", "-t", img, "-f", str(devc / "Dockerfile"), str(devc))
-    ok(f"Build complete: {img}")
+    img = image_ref(devc)
+    if api().inspect_image(img) is None:
+        build_image(devc, img)
     return img
 
 
+# ─── Startup timings ──────────────────────────────────────
+
+def timings_mode(flag: str = "") -> str:
+    """run --timings[=json] or BROWSER_TIMINGS=1|json: "" (off), "table" or "json"."""
+    value = flag or os.environ.get("BROWSER_TIMINGS", "")
+    if value in ("", "0"):
+        return ""
+    return "json" if value == "json" else "table"
+
+
+class Timeline:
+    """Start/end of each run phase, in seconds since run started.
+    Host phases use the monotonic clock; container phases are the wall-clock
+    markers from the startup script, aligned to the host (the Docker Desktop
+    VM does not share the host's monotonic clock)."""
+
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.wall0 = time.time()
+        self.phases: list[tuple[str, str, float, float]] = []  # (where, phase, start, end)
+
+    def now(self) -> float:
+        return time.monotonic() - self.t0
+
+    @contextlib.contextmanager
+    def phase(self, label: str):
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.phases.append(("host", label, start, self.now()))
+
+    def add_container(self, markers: str):
+        """'phase EPOCHREALTIME' lines; each phase runs from the previous marker to its own."""
+        prev = None
+        for line in markers.splitlines():
+            try:
+                label, stamp = line.split()
+                at = float(stamp.replace(",", ".")) - self.wall0
+            except ValueError:
+                continue
+            if prev is not None:
+                self.phases.append(("container", label, prev, at))
+            prev = at
+
+    def report(self, mode: str, total: float, **meta):
+        print(f"  {'phase':<16}{'where':<12}{'start(s)':>9}{'took(s)':>9}")
+        for where, label, start, end in sorted(self.phases, key=lambda p: p[2]):
+            print(f"  {label:<16}{where:<12}{start:>9.3f}{end - start:>9.3f}")
+        print(f"  {'total':<28}{'':>9}{total:>9.3f}")
+        if mode != "json":
+            return
+        record = {
+            "time": self.wall0, "total": round(total, 4), **meta,
+            "phases": [{"where": w, "phase": l, "start": round(s, 4), "duration": round(e - s, 4)}
+                       for w, l, s, e in self.phases],
+        }
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(STATE_DIR / "timings.jsonl", "a") as f:
+            f.write(json.dumps(record) + "\n")
+        info(f"Timings recorded: {STATE_DIR / 'timings.jsonl'}")
+
+
+# ─── Readiness ────────────────────────────────────────────
+
+@functools.cache
+def ready_timeout() -> float:
+    """Seconds run waits for KasmVNC and CDP (BROWSER_READY_TIMEOUT, default 60)."""
+    value = os.environ.get("BROWSER_READY_TIMEOUT", "").strip()
+    if not value:
+        return 60.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = -1.0
+    if not 0 <= seconds < float("inf"):
+        warn(f"Ignoring BROWSER_READY_TIMEOUT={value!r} (expected seconds >= 0), using 60")
+        return 60.0
+    return seconds
+
+
+def vnc_ready(port: int) -> bool:
+    """KasmVNC answers HTTP on the published port. A bare TCP connect is not
+    enough: Docker's port proxy accepts before anything listens inside."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+            return True
+    except urllib.error.HTTPError:
+        return True  # any HTTP status means the server is up
+    except (OSError, http.client.HTTPException):
+        return False
+
+
+def cdp_ready(port: int) -> bool:
+    """Chrome answers /json/version through the socat forward."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1) as resp:
+            return "webSocketDebuggerUrl" in json.loads(resp.read())
+    except (OSError, ValueError, http.client.HTTPException):
+        return False
+
+
+def wait_for(name: str, label: str, check, deadline: float) -> bool:
+    """Poll check() with exponential backoff (50 ms doubling up to 500 ms) until it
+    passes; False if the deadline passes or the container exits first."""
+    delay = 0.05
+    while not check():
+        c = api().inspect_container(name)
+        if c is None or not c["State"]["Running"]:
+            err(f"Container exited before {label} was ready")
+            return False
+        if time.monotonic() >= deadline:
+            err(f"{label} not ready after {ready_timeout():.0f}s (BROWSER_READY_TIMEOUT)")
+            return False
+        time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        delay = min(delay * 2, 0.5)
+    return True
+
+
+def wait_services(name: str, ports: tuple[int, int], timeline: Timeline) -> bool:
+    """Wait for KasmVNC, then CDP on the container's host ports; returns as soon
+    as both answer. On failure, shows the container's last log lines."""
+    started = time.monotonic()
+    deadline = started + ready_timeout()
+    vnc_port, cdp_port = ports
+    for label, check in (("KasmVNC", lambda: vnc_ready(vnc_port)),
+                         ("CDP", lambda: cdp_ready(cdp_port))):
+        with timeline.phase(f"wait-{label.lower()}"):
+            ready = wait_for(name, label, check, deadline)
+        if not ready:
+            print("  Last container log lines:")
+            for line in api().logs(name).splitlines()[-20:]:
+                print(f"    {line}")
+            return False
+        ok(f"{label} ready ({time.monotonic() - started:.1f}s)")
+    return True
+
+
 # ─── Commands ─────────────────────────────────────────────
 
-def cmd_run(project_path: str = ".", shell_mode: bool = False):
+def cmd_run(project_path: str = ".", shell_mode: bool = False, timings: str = ""):
+    timeline = Timeline()
+    mode = timings_mode(timings)
     project_dir = Path(project_path).resolve()
     if not project_dir.is_dir():
         err(f"Path not found: {project_dir}")
@@ -441,77 +884,116 @@ def cmd_run(project_path: str = ".", shell_mode: bool = False):
         docker("exec", *tty_flags(), name, *exec_cmd)
         return
 
-    ensure_devcontainer(project_dir)
-    img = ensure_image(project_dir)
-    docker("rm", "-f", name, capture_output=True)
+    with timeline.phase("image"):
+        img = ensure_image(project_dir)
+    with timeline.phase("cleanup"):
+        api().remove_container(name, force=True)
 
     # Create downloads dir on host
     downloads_dir = project_dir / "downloads"
     downloads_dir.mkdir(exist_ok=True)
 
     api_key = os.environ.get("ANTHROPIC_API_KEY", "")
-    creds_json, oauth_token = get_host_credentials()
-
-    cmd = [
-        "docker", "run", "-d",
-        "--name", name,
-        "--label", f"{LABEL}=true",
-        # VNC port
-        "-p", "6901:6901",
-        # Chrome DevTools Protocol port
-        "-p", "9222:9223",
-        # Shared memory for Chromium
-        "--shm-size", "2g",
-        # Volumes
-        "-v", f"{project_dir}:/workspace",
-        "-v", f"agent-browser-config-{name}:/home/node/.claude",
-        "-v", f"agent-browser-history-{name}:/commandhistory",
-        "-v", f"{downloads_dir}:/downloads",
-        # Security hardening
-        "--cap-drop", "ALL",
-        "--cap-add", "NET_ADMIN",
-        "--cap-add", "SETUID",
-        "--cap-add", "SETGID",
-        "--security-opt", "no-new-privileges:true",
-        "--read-only",
-        # Writable tmpfs
-        "--tmpfs", "/tmp:rw,noexec,nosuid,nodev,size=500m",
-        "--tmpfs", "/run:rw,noexec,nosuid,nodev,size=10m",
-        "--tmpfs", "/home/node:rw,nosuid,nodev,size=1g,uid=1000,gid=1000",
-        # Resource limits
-        "--memory", "4g",
-        "--memory-swap", "4g",
-        "--pids-limit", "500",
-        # Environment
-        "-e", "CLAUDE_CONFIG_DIR=/home/node/.claude",
-        "-e", "NODE_OPTIONS=--max-old-space-size=4096",
-        "-e", "DISPLAY=:1",
-        "-e", "VNC_PORT=6901",
-        "-e", "VNC_RESOLUTION=1920x1080",
-        "-e", "CHROME_ALLOW_ALL=1",
-        "-e", "PLAYWRIGHT_BROWSERS_PATH=/opt/ms-playwright",
-    ]
+    with timeline.phase("credentials"):
+        creds_json, oauth_token = get_host_credentials()
+
+    # Same settings as `docker run -d`, as an Engine API create spec
+    spec = {
+        "Image": img,
+        "User": "root",  # Start as root for firewall (no-new-privileges blocks sudo)
+        "Labels": {LABEL: "true", f"{LABEL}.project": str(project_dir)},
+        # VNC port, Chrome DevTools Protocol port
+        "ExposedPorts": {"6901/tcp": {}, "9223/tcp": {}},
+        "Env": [
+            "CLAUDE_CONFIG_DIR=/home/node/.claude",
+            "NODE_OPTIONS=--max-old-space-size=4096",
+            "DISPLAY=:1",
+            "VNC_PORT=6901",
+            "VNC_RESOLUTION=1920x1080",
+            "CHROME_ALLOW_ALL=1",
+            "PLAYWRIGHT_BROWSERS_PATH=/opt/ms-playwright",
+        ],
+        "HostConfig": {
+            # Host ports (PortBindings) are filled in per attempt below
+            # Shared memory for Chromium
+            "ShmSize": 2 * 1024 ** 3,
+            # Volumes
+            "Binds": [
+                f"{project_dir}:/workspace",
+                f"{downloads_dir}:/downloads",
+            ],
+            "Mounts": [
+                volume_mount(f"agent-browser-config-{name}", "/home/node/.claude", name),
+                volume_mount(f"agent-browser-history-{name}", "/commandhistory", name),
+                # Firewall IP cache on a root-only volume node cannot write
+                volume_mount(f"agent-browser-firewall-{name}", "/var/cache/firewall", name),
+            ],
+            # Security hardening
+            "CapDrop": ["ALL"],
+            "CapAdd": ["NET_ADMIN", "SETUID", "SETGID"],
+            "SecurityOpt": ["no-new-privileges:true"],
+            "ReadonlyRootfs": True,
+            # Writable tmpfs
+            "Tmpfs": {
+                "/tmp": "rw,noexec,nosuid,nodev,size=500m",
+                "/run": "rw,noexec,nosuid,nodev,size=10m",
+                "/home/node": "rw,nosuid,nodev,size=1g,uid=1000,gid=1000",
+            },
+            # Resource limits
+            "Memory": 4 * 1024 ** 3,
+            "MemorySwap": 4 * 1024 ** 3,
+            "PidsLimit": 500,
+        },
+    }
 
     if api_key:
-        cmd += ["-e", f"ANTHROPIC_API_KEY={api_key}"]
+        spec["Env"].append(f"ANTHROPIC_API_KEY={api_key}")
     elif oauth_token:
-        cmd += ["-e", f"CLAUDE_CODE_OAUTH_TOKEN={oauth_token}"]
+        spec["Env"].append(f"CLAUDE_CODE_OAUTH_TOKEN={oauth_token}")
 
-    cmd += [
-        "-u", "root",  # Start as root for firewall (no-new-privileges blocks sudo)
-        img,
+    spec["Cmd"] = [
         "/usr/bin/bash", "-c",
+        f"echo \"start $EPOCHREALTIME\" > {TIMINGS_FILE}; chmod 666 {TIMINGS_FILE}; "
+        # New config volumes are owned by root
+        "chown node:node /home/node/.claude; "
         "/usr/local/bin/init-firewall.sh; "
+        f"echo \"firewall $EPOCHREALTIME\" >> {TIMINGS_FILE}; "
         "su -s /usr/bin/bash node -c '/usr/local/bin/start-kasmvnc.sh'; "
         "exec su -s /usr/bin/bash node -c '"
         "tmux new-session -d -s claude \"claude --dangerously-skip-permissions\"; "
+        f"echo \"tmux $EPOCHREALTIME\" >> {TIMINGS_FILE}; "
         "exec sleep infinity'",
     ]
 
-    docker_check(*cmd[1:], capture_output=True)
+    # Probe free host ports and record them as labels. Another run can take the
+    # same port between probe and start; then pick again with it excluded.
+    taken: set[int] = set()
+    for attempt in range(3):
+        with timeline.phase("ports"):
+            ports = allocate_ports(taken)
+        vnc_port, cdp_port = ports
+        spec["Labels"].update({f"{LABEL}.vnc-port": str(vnc_port),
+                               f"{LABEL}.cdp-port": str(cdp_port)})
+        spec["HostConfig"]["PortBindings"] = {
+            "6901/tcp": [{"HostPort": str(vnc_port)}],
+            "9223/tcp": [{"HostPort": str(cdp_port)}],
+        }
+        with timeline.phase("create"):
+            api().create_container(name, spec)
+        try:
+            with timeline.phase("start"):
+                api().start_container(name)
+            break
+        except DockerError as e:
+            if attempt == 2 or not re.search(r"port is already allocated|address already in use", str(e)):
+                raise
+            warn(f"Port {vnc_port}/{cdp_port} taken meanwhile -> retrying")
+            api().remove_container(name, force=True)
+            taken |= set(ports)
 
     if creds_json:
-        inject_credentials_file(name, creds_json)
+        with timeline.phase("inject"):
+            inject_credentials_file(name, creds_json)
         ok("Host credentials injected")
 
     print()
@@ -520,13 +1002,17 @@ def cmd_run(project_path: str = ".", shell_mode: bool = False):
     print(f"  Downloads: {downloads_dir}")
     print()
 
-    # Read VNC info from container logs
-    time.sleep(3)
-    r = docker("logs", name, capture_output=True, text=True)
-    for line in r.stdout.splitlines():
-        if "KasmVNC" in line or "===" in line or "URL:" in line or "CDP:" in line or "Chrome launched" in line or "authentication" in line:
-            print(f"  {line.strip()}")
+    if wait_services(name, ports, timeline):
+        print()
+        print(f"  VNC:    http://localhost:{vnc_port}  (no authentication required)")
+        print(f"  CDP:    http://localhost:{cdp_port}")
     print()
+
+    if mode:
+        ready = timeline.now()
+        timeline.add_container(api().exec(name, ["cat", TIMINGS_FILE])[1].decode())
+        timeline.report(mode, ready, project=str(project_dir), container=name)
+        print()
     print(f"  Shell:  python3 browser.py shell {name}")
     print(f"  Stop:   python3 browser.py stop {name}")
     print()
@@ -535,16 +1021,19 @@ def cmd_run(project_path: str = ".", shell_mode: bool = False):
 
 
 def cmd_list():
-    r = docker(
-        "ps", "--filter", f"label={LABEL}=true",
-        "--format", "table {{.Names}}\t{{.Status}}\t{{.RunningFor}}",
-        capture_output=True, text=True,
-    )
-    out = r.stdout.strip()
-    if not out or out.count("\n") == 0:
+    rows = []
+    for c in api().containers(LABEL):
+        vnc, cdp = container_ports(c)
+        rows.append((c["Names"][0].lstrip("/"), c["Status"],
+                     f"http://localhost:{vnc}" if vnc else "-",
+                     f"http://localhost:{cdp}" if cdp else "-"))
+    if not rows:
         print("No running agent-browser containers")
         return
-    print(out)
+    rows.insert(0, ("NAMES", "STATUS", "VNC", "CDP"))
+    widths = [max(len(r[i]) for r in rows) for i in range(4)]
+    for row in rows:
+        print("   ".join(f"{v:<{w}}" for v, w in zip(row, widths)).rstrip())
 
 
 def cmd_shell(name: str = ""):
@@ -573,29 +1062,30 @@ def cmd_stop(name: str = ""):
         for c in containers:
             print(f"  {c}")
         sys.exit(1)
-    docker("stop", name, capture_output=True)
-    docker("rm", name, capture_output=True)
+    api().stop_container(name, stop_timeout())
+    api().remove_container(name)
     ok(f"Stopped and removed: {name}")
 
 
+def stop_and_remove(name: str):
+    api().stop_container(name, stop_timeout())
+    api().remove_container(name, force=True)
+
+
 def cmd_stopall():
     containers = running_containers()
     if not containers:
         print("No containers to stop")
         return
-    for name in containers:
-        docker("stop", name, capture_output=True)
-        docker("rm", name, capture_output=True)
-        ok(f"Stopped: {name}")
+    if run_parallel(containers, stop_and_remove, "Stopped"):
+        sys.exit(1)
 
 
 def cmd_rm(name: str = ""):
     """Remove a stopped container + its volumes."""
     if not name:
-        r = docker("ps", "-a", "--filter", f"label={LABEL}=true",
-                   "--format", "{{.Names}}\t{{.Status}}",
-                   capture_output=True, text=True)
-        lines = [l for l in r.stdout.strip().splitlines() if l]
+        lines = [f"{c['Names'][0].lstrip('/')}\t{c['Status']}"
+                 for c in api().containers(LABEL, include_stopped=True)]
         if not lines:
             print("No containers to remove")
             return
@@ -604,64 +1094,90 @@ def cmd_rm(name: str = ""):
             print(f"  {l}")
         sys.exit(1)
 
-    docker("stop", name, capture_output=True)
-    docker("rm", "-f", name, capture_output=True)
+    stop_and_remove(name)
     # Remove associated volumes
-    for prefix in ("agent-browser-config-", "agent-browser-history-"):
-        docker("volume", "rm", f"{prefix}{name}", capture_output=True)
+    remove_volumes([f"{prefix}{name}" for prefix in VOLUME_PREFIXES],
+                   f"{LABEL}.container={name}")
     ok(f"Removed: {name} (including volumes)")
 
 
+def base_users() -> list[str]:
+    """Tags of other images built on the base image (they inherit its label from base.Dockerfile)."""
+    return sorted(t for i in api().images(BASE_IMAGE) for t in i.get("RepoTags") or []
+                  if t.rsplit(":", 1)[0] not in (BASE_IMAGE, image_name()))
+
+
 def cmd_clean():
     """Remove all agent-browser containers + volumes + images."""
-    r = docker("ps", "-a", "--filter", f"label={LABEL}=true",
-               "--format", "{{.Names}}", capture_output=True, text=True)
-    containers = [n for n in r.stdout.strip().splitlines() if n]
+    containers = [c["Names"][0].lstrip("/")
+                  for c in api().containers(LABEL, include_stopped=True)]
 
+    failed = 0
     if not containers:
         print("No containers to clean")
     else:
-        for name in containers:
-            docker("stop", name, capture_output=True)
-            docker("rm", "-f", name, capture_output=True)
-            for prefix in ("agent-browser-config-", "agent-browser-history-"):
-                docker("volume", "rm", f"{prefix}{name}", capture_output=True)
-            ok(f"Removed: {name}")
-
-    # Remove images
-    img = image_name()
-    r = docker("image", "inspect", img, capture_output=True)
-    if r.returncode == 0:
-        docker("rmi", img, capture_output=True)
-        ok(f"Image removed: {img}")
+        failed = run_parallel(containers, stop_and_remove, "Removed")
+        remove_volumes([f"{prefix}{name}" for name in containers for prefix in VOLUME_PREFIXES],
+                       f"{LABEL}=true")
+
+    # Remove images (every content-hash tag). Docker happily untags the base even
+    # while other images build on it, so keep it while claude-container images remain.
+    for img in api().image_tags(image_name()):
+        if api().remove_image(img):
+            ok(f"Image removed: {img}")
+    if users := base_users():
+        info(f"Keeping base image {BASE_IMAGE} (used by {', '.join(users)})")
+    else:
+        for img in api().image_tags(BASE_IMAGE):
+            if api().remove_image(img):
+                ok(f"Image removed: {img}")
 
+    if failed:
+        sys.exit(1)
     ok("Cleanup complete")
 
 
 def cmd_build(project_path: str = ".") -> str:
+    """Rebuild reusing cached layers (picks up CLAUDE_CODE_VERSION=latest)."""
     project_dir = Path(project_path).resolve()
     devc = ensure_devcontainer(project_dir)
-    img = image_name()
-    info(f"Building image: {img}")
-    docker_check("build", "-t", img, "-f", str(devc / "Dockerfile"), str(devc))
-    ok(f"Build complete: {img}")
+    img = image_ref(devc)
+    build_image(devc, img)
     return img
 
 
+def cmd_build_all(project_path: str = "."):
+    """Rebuild the base image, then the independent project images on top of it
+    (this project + projects of existing containers, each tag once) concurrently."""
+    projects = [str(Path(project_path).resolve())]
+    projects += [c["Labels"].get(f"{LABEL}.project", "")
+                 for c in api().containers(LABEL, include_stopped=True)]
+    images: dict[str, Path] = {}
+    for p in projects:
+        if p and Path(p).is_dir():
+            devc = ensure_devcontainer(Path(p))
+            images.setdefault(image_ref(devc), devc)
+
+    build_base()
+    failed = run_parallel(list(images), lambda img: build_image(images[img], img, quiet=True),
+                          "Built")
+    if failed:
+        sys.exit(1)
+
+
 def cmd_push():
-    img = image_name()
-    if img == DEFAULT_IMAGE:
+    if image_name() == DEFAULT_IMAGE:
         err("Set BROWSER_IMAGE to a registry path")
         print("  e.g.: export BROWSER_IMAGE=ghcr.io/your-org/agent-browser-sandbox")
         sys.exit(1)
-    cmd_build()
+    img = cmd_build()
     info(f"Pushing: {img}")
     docker_check("push", img)
-    ok(f"Done -- teammates: BROWSER_IMAGE={img} python3 browser.py pull && python3 browser.py run .")
+    ok(f"Done -- teammates: BROWSER_IMAGE={image_name()} python3 browser.py pull && python3 browser.py run .")
 
 
 def cmd_pull():
-    img = image_name()
+    img = image_ref()
     info(f"Pulling: {img}")
     docker_check("pull", img)
     ok("Done")
@@ -676,17 +1192,19 @@ def cmd_help():
         Run:
           run [path]      Start Claude with browser in project (default: current dir)
           run -s [path]   Connect with zsh shell (--shell / -s)
-          list (ls)       List running containers
+          run --timings   Startup phase breakdown (=json: also append to timings.jsonl)
+          list (ls)       List running containers with VNC/CDP URLs
           shell (sh)      Attach zsh to a running container (persists after exit)
 
         Stop/Remove:
           stop <name>     Stop + remove container
-          stopall         Stop + remove all containers
+          stopall         Stop + remove all containers (concurrently)
           rm <name>       Remove container + volumes
           clean           Full cleanup: all containers + volumes + images
 
         Build/Share:
-          build [path]    Build image only
+          build [path]    (Re)build image (changed layers only)
+          build --all     (Re)build base + all known project images (concurrently)
           push            Push to registry (team sharing)
           pull            Pull from registry
 
@@ -697,17 +1215,32 @@ def cmd_help():
           ANTHROPIC_API_KEY   Claude API key
           BROWSER_IMAGE       Image name (registry path for team sharing)
           CHROME_ALLOW_ALL    Set to 1 to allow all HTTP/HTTPS (default: 1)
+          BROWSER_STOP_TIMEOUT  Seconds to wait before killing on stop (default: 10)
+          BROWSER_READY_TIMEOUT Seconds run waits for KasmVNC and CDP (default: 60)
+          BROWSER_TIMINGS     1 for --timings on every run, json for --timings=json
     """))
 
 
 # ─── Main ─────────────────────────────────────────────────
 
 def _dispatch_run(rest: list[str]):
-    """Parse --shell/-s flag and dispatch to cmd_run."""
+    """Parse --shell/-s and --timings[=json] flags and dispatch to cmd_run."""
     shell_mode = "--shell" in rest or "-s" in rest
-    path_args = [a for a in rest if a not in ("--shell", "-s")]
+    timings = next((a.partition("=")[2] or "1" for a in rest
+                    if a == "--timings" or a.startswith("--timings=")), "")
+    path_args = [a for a in rest if a not in ("--shell", "-s") and not a.startswith("--timings")]
     project_path = path_args[0] if path_args else "."
-    cmd_run(project_path, shell_mode=shell_mode)
+    cmd_run(project_path, shell_mode=shell_mode, timings=timings)
+
+
+def _dispatch_build(rest: list[str]):
+    """Parse --all flag and dispatch to cmd_build / cmd_build_all."""
+    path_args = [a for a in rest if a != "--all"]
+    project_path = path_args[0] if path_args else "."
+    if "--all" in rest:
+        cmd_build_all(project_path)
+    else:
+        cmd_build(project_path)
 
 
 def main():
@@ -728,7 +1261,7 @@ def main():
         "rm":      lambda: cmd_rm(rest[0] if rest else ""),
         "remove":  lambda: cmd_rm(rest[0] if rest else ""),
         "clean":   cmd_clean,
-        "build":   lambda: cmd_build(rest[0] if rest else "."),
+        "build":   lambda: _dispatch_build(rest),
         "push":    cmd_push,
         "pull":    cmd_pull,
         "help":    cmd_help,
@@ -737,16 +1270,19 @@ def main():
     }
 
     fn = commands.get(cmd)
-    if fn:
-        fn()
-    else:
+    if fn is None and Path(cmd).is_dir():
         # If the argument is a path, treat it as "run"
-        if Path(cmd).is_dir():
-            _dispatch_run([cmd] + rest)
-        else:
-            err(f"Unknown command: {cmd}")
-            cmd_help()
-            sys.exit(1)
+        fn = lambda: _dispatch_run([cmd] + rest)
+    if fn is None:
+        err(f"Unknown command: {cmd}")
+        cmd_help()
+        sys.exit(1)
+
+    try:
+        fn()
+    except DockerError as e:
+        err(str(e))
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+../../claude-container/scripts/docker_engine.py
\ No newline at end of file
@@ -13,47 +13,76 @@ Claude Code Container Manager
   python3 claude.py                    # 현재 폴더에서 Claude 시작
   python3 claude.py run ~/project      # 특정 폴더에서 Claude 시작
   python3 claude.py run -s              # zsh 셸로 접속 (--shell)
+  python3 claude.py run --timings      # 시작 단계별 소요 시간 표 (--timings=json: 기록도 남김)
   python3 claude.py list               # 실행 중 목록
+  python3 claude.py pool [fill|clear]  # 대기 컨테이너 풀 상태/채우기/비우기
   python3 claude.py shell [이름]       # 접속
   python3 claude.py stop [이름]        # 정지
   python3 claude.py stopall            # 전체 정지
   python3 claude.py rm <이름>          # 컨테이너 + 볼륨 제거
   python3 claude.py clean              # 전체 정리 (컨테이너+볼륨+이미지)
+  python3 claude.py build --all        # 기본 이미지 + 최근 프로젝트 이미지 동시 빌드
   python3 claude.py push               # 이미지 레지스트리 푸시
   python3 claude.py pull               # 이미지 풀
 """
 
+import contextlib
+import fcntl
+import functools
+import hashlib
+import io
 import json
 import os
 import platform
 import re
 import subprocess
 import sys
+import tarfile
 import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from docker_engine import DockerError, api
+
 # ─── 설정 ───────────────────────────────────────────────────
 LABEL = "claude-dev"
 DEFAULT_IMAGE = "claude-code-sandbox"
+# agent-browser-container와 공유하는 기본 이미지 (태그는 base.Dockerfile 내용 해시)
+BASE_IMAGE = "claude-code-base"
+VOLUME_PREFIXES = ("claude-config-", "claude-history-", "claude-firewall-")
+# stopall/rm/clean 동시 작업 수
+MAX_PARALLEL = 8
+# 대기 컨테이너: {컨테이너명}-standby, 방화벽 초기화가 끝나면 READY_MARKER 생성
+STANDBY_SUFFIX = "-standby"
+READY_MARKER = "/tmp/.claude-ready"
+# 엔트리포인트가 "단계 EPOCHREALTIME" 줄을 남기는 파일 (run --timings)
+TIMINGS_FILE = "/tmp/.startup-timings"
+# 컨테이너의 node 사용자 (node 이미지 기본 uid/gid)
+NODE_UID = 1000
+STATE_DIR = Path.home() / ".cache" / "claude-container"
+MAX_RECENT = 20
 
 # ─── 임베디드 파일들 ────────────────────────────────────────
 
-DOCKERFILE = textwrap.dedent("""\
-    FROM node:24-bookworm-slim
-
-    ARG CLAUDE_CODE_VERSION=latest
+# claude-container와 agent-browser-container가 함께 쓰는 기본 이미지 (browser 쪽은
+# 같은 파일에 대한 심볼릭 링크). 태그는 내용 해시라 두 도구가 한 번만 빌드함
+BASE_DOCKERFILE = (Path(__file__).parent / "base.Dockerfile").read_text()
+BASE_REF = f"{BASE_IMAGE}:{hashlib.sha256(BASE_DOCKERFILE.encode()).hexdigest()[:12]}"
+# 생성하는 Dockerfile에 넣는 기본 스테이지 (파서 지시자는 파일 맨 앞에서만 유효)
+BASE_STAGE = BASE_DOCKERFILE.removeprefix("# syntax=docker/dockerfile:1\n")
 
-    RUN apt-get update && apt-get install -y --no-install-recommends \\
-        git curl sudo ca-certificates \\
-        zsh fzf ripgrep jq tmux \\
-        iptables iproute2 dnsutils \\
-        locales \\
-        && rm -rf /var/lib/apt/lists/*
+DOCKERFILE = textwrap.dedent(f"""\
+    # syntax=docker/dockerfile:1
+    # claude.py는 BASE={BASE_REF}(공유 기본 이미지, 없으면 먼저 빌드)로 빌드하고,
+    # devcontainer/docker build는 아래 shared-base 스테이지를 빌드 (로컬 이미지 불필요)
+    ARG BASE=shared-base
 
-    RUN sed -i '/ko_KR.UTF-8/s/^# //' /etc/locale.gen && locale-gen
-    ENV LANG=ko_KR.UTF-8 LC_ALL=ko_KR.UTF-8
+""") + BASE_STAGE + textwrap.dedent("""\
 
-    RUN npm install -g @anthropic-ai/claude-code@${CLAUDE_CODE_VERSION}
+    FROM ${BASE}
 
     COPY init-firewall.sh /usr/local/bin/
     USER root
@@ -61,11 +90,6 @@ DOCKERFILE = textwrap.dedent("""\
         echo "node ALL=(root) NOPASSWD: /usr/local/bin/init-firewall.sh" > /etc/sudoers.d/node-firewall && \\
         chmod 0440 /etc/sudoers.d/node-firewall
 
-    RUN mkdir -p /commandhistory && chown node:node /commandhistory
-    RUN chsh -s /usr/bin/zsh node
-
-    RUN su - node -c 'echo "HISTFILE=/commandhistory/.zsh_history\\nHISTSIZE=10000\\nSAVEHIST=10000\\nsetopt appendhistory\\nautoload -Uz compinit && compinit" > ~/.zshrc'
-
     USER node
     WORKDIR /workspace
 """)
@@ -74,6 +98,7 @@ FIREWALL_SH = textwrap.dedent("""\
     #!/usr/bin/env bash
     set -uo pipefail
 
+    START_NS=$(date +%s%N)
     echo "🔒 Initializing firewall..."
 
     if command -v iptables-legacy &>/dev/null; then
@@ -87,15 +112,6 @@ FIREWALL_SH = textwrap.dedent("""\
         exit 0
     fi
 
-    $IPT -F OUTPUT 2>/dev/null || true
-    $IPT -P OUTPUT DROP
-
-    $IPT -A OUTPUT -o lo -j ACCEPT
-    $IPT -A OUTPUT -m state --state ESTABLISHED,RELATED -j ACCEPT
-    $IPT -A OUTPUT -p udp --dport 53 -j ACCEPT
-    $IPT -A OUTPUT -p tcp --dport 53 -j ACCEPT
-    $IPT -A OUTPUT -p tcp --dport 22 -j ACCEPT
-
     ALLOWED_DOMAINS=(
         "api.anthropic.com"
         "statsig.anthropic.com"
@@ -107,13 +123,68 @@ FIREWALL_SH = textwrap.dedent("""\
         "objects.githubusercontent.com"
     )
 
-    for domain in "${ALLOWED_DOMAINS[@]}"; do
-        for ip in $(dig +short "$domain" A 2>/dev/null | grep -E '^[0-9]+\\.' || true); do
-            $IPT -A OUTPUT -d "$ip" -j ACCEPT 2>/dev/null || true
+    # 해석한 IP 캐시: root만 쓸 수 있는 볼륨에 두고 TTL 안이면 재시작 시 DNS 조회를 생략
+    # (도메인 목록이 바뀌면 파일 이름의 해시가 달라져 새로 조회). node가 쓸 수 있는
+    # 곳(/commandhistory 등)에 두면 샌드박스 안에서 허용 IP를 바꿀 수 있으므로 쓰지 않음
+    CACHE_DIR="${FIREWALL_CACHE_DIR:-/var/cache/firewall}"
+    CACHE_TTL="${FIREWALL_CACHE_TTL:-3600}"
+    KEY=$(printf '%s\\n' "${ALLOWED_DOMAINS[@]}" | md5sum | cut -c1-12)
+    CACHE_FILE="$CACHE_DIR/.firewall-ips-$KEY"
+    # root 소유의 실제 디렉토리(심볼릭 링크 아님)일 때만 캐시 사용
+    if [ -L "$CACHE_DIR" ] || ! mkdir -p "$CACHE_DIR" 2>/dev/null || [ "$(stat -c %u "$CACHE_DIR")" != 0 ] \\
+        || ! chmod 0700 "$CACHE_DIR" 2>/dev/null; then
+        CACHE_FILE=""
+    fi
+    # 규칙에는 점으로 구분된 IPv4 주소만 (CIDR, 0.0.0.0/0 등 불가)
+    OCTET='(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])'
+    IPV4_RE="^($OCTET\\.){3}$OCTET\\$"
+
+    IPS=""
+    if [ -n "$CACHE_FILE" ] && [ -f "$CACHE_FILE" ] && [ ! -L "$CACHE_FILE" ] && [ -s "$CACHE_FILE" ] \\
+        && [ $(( $(date +%s) - $(stat -c %Y "$CACHE_FILE") )) -lt "$CACHE_TTL" ]; then
+        IPS=$(cat "$CACHE_FILE")
+        if printf '%s\\n' "$IPS" | grep -Evq "$IPV4_RE"; then
+            echo "⚠️  IP 캐시에 IPv4 주소가 아닌 줄 — 캐시를 버리고 다시 조회"
+            rm -f "$CACHE_FILE"
+            IPS=""
+        else
+            SOURCE="cache"
+        fi
+    fi
+    if [ -z "$IPS" ]; then
+        # 모든 도메인을 동시에 조회
+        SOURCE="dns"
+        TMP=$(mktemp -d)
+        for domain in "${ALLOWED_DOMAINS[@]}"; do
+            dig +short +time=2 +tries=2 "$domain" A > "$TMP/$domain" 2>/dev/null &
         done
-    done
+        wait
+        IPS=$(cat "$TMP"/* | grep -E "$IPV4_RE" | sort -u)
+        rm -rf "$TMP"
+        if [ -n "$IPS" ] && [ -n "$CACHE_FILE" ] && NEW=$(mktemp "$CACHE_DIR/.firewall-ips.XXXXXX" 2>/dev/null); then
+            printf '%s\\n' "$IPS" > "$NEW" && mv -f "$NEW" "$CACHE_FILE" || rm -f "$NEW"
+        fi
+    fi
+
+    # 전체 규칙을 만들어 iptables-restore 한 번으로 원자적으로 적용
+    {
+        echo "*filter"
+        echo ":INPUT ACCEPT [0:0]"
+        echo ":FORWARD ACCEPT [0:0]"
+        echo ":OUTPUT DROP [0:0]"
+        echo "-A OUTPUT -o lo -j ACCEPT"
+        echo "-A OUTPUT -m state --state ESTABLISHED,RELATED -j ACCEPT"
+        echo "-A OUTPUT -p udp --dport 53 -j ACCEPT"
+        echo "-A OUTPUT -p tcp --dport 53 -j ACCEPT"
+        echo "-A OUTPUT -p tcp --dport 22 -j ACCEPT"
+        for ip in $IPS; do
+            echo "-A OUTPUT -d $ip -j ACCEPT"
+        done
+        echo "COMMIT"
+    } | "$IPT-restore" || { echo "⚠️  iptables-restore 실패 — 방화벽 미적용"; exit 1; }
 
-    echo "✅ Firewall ready (${#ALLOWED_DOMAINS[@]} domains whitelisted)"
+    ELAPSED_MS=$(( ($(date +%s%N) - START_NS) / 1000000 ))
+    echo "✅ Firewall ready (${#ALLOWED_DOMAINS[@]} domains, $(echo $IPS | wc -w) IPs from $SOURCE) in ${ELAPSED_MS}ms"
 """)
 
 DEVCONTAINER_JSON = textwrap.dedent("""\
@@ -141,7 +212,8 @@ DEVCONTAINER_JSON = textwrap.dedent("""\
       "remoteUser": "node",
       "mounts": [
         "source=claude-code-bashhistory-${devcontainerId},target=/commandhistory,type=volume",
-        "source=claude-code-config-${devcontainerId},target=/home/node/.claude,type=volume"
+        "source=claude-code-config-${devcontainerId},target=/home/node/.claude,type=volume",
+        "source=claude-code-firewall-${devcontainerId},target=/var/cache/firewall,type=volume"
       ],
       "containerEnv": {
         "NODE_OPTIONS": "--max-old-space-size=4096",
@@ -152,6 +224,25 @@ DEVCONTAINER_JSON = textwrap.dedent("""\
     }
 """)
 
+ZSHRC = textwrap.dedent("""\
+    HISTFILE=/commandhistory/.zsh_history
+    HISTSIZE=10000
+    SAVEHIST=10000
+    setopt appendhistory
+    autoload -Uz compinit && compinit
+""")
+
+# .devcontainer/에 쓰는 파일 (이름 → 내용)과 그중 이미지 빌드 입력
+GENERATED_FILES = {
+    "Dockerfile": DOCKERFILE,
+    "init-firewall.sh": FIREWALL_SH,
+    "devcontainer.json": DEVCONTAINER_JSON,
+}
+EXECUTABLE_FILES = ("init-firewall.sh",)
+BUILD_INPUTS = ("Dockerfile", "init-firewall.sh")
+# 생성한 파일의 해시 기록 (사용자가 고친 파일과 구분)
+MANIFEST = ".generated.json"
+
 
 # ─── 유틸 ───────────────────────────────────────────────────
 
@@ -175,12 +266,29 @@ def image_name() -> str:
     return os.environ.get("CLAUDE_IMAGE", DEFAULT_IMAGE)
 
 
+def build_hash(devc: Path | None = None) -> str:
+    """빌드 입력 파일 내용의 해시 (devc가 없으면 임베디드 파일 기준)"""
+    h = hashlib.sha256()
+    for fname in BUILD_INPUTS:
+        data = (devc / fname).read_bytes() if devc else GENERATED_FILES[fname].encode()
+        h.update(fname.encode() + b"\0" + data + b"\0")
+    return h.hexdigest()[:12]
+
+
+def image_ref(devc: Path | None = None) -> str:
+    """이미지 이름:태그. 태그가 빌드 입력 해시라 파일 내용이 바뀔 때만 새 이미지가 됨.
+    CLAUDE_IMAGE에 태그가 지정돼 있으면 그대로 사용"""
+    img = image_name()
+    if ":" in img.rsplit("/", 1)[-1]:
+        return img
+    return f"{img}:{build_hash(devc)}"
+
+
 def slugify(name: str) -> str:
     return re.sub(r"[^a-z0-9-]", "-", name.lower()).strip("-")
 
 
 def path_hash(p: Path) -> str:
-    import hashlib
     return hashlib.sha256(str(p).encode()).hexdigest()[:5]
 
 
@@ -205,9 +313,62 @@ def err(msg: str):
 
 
 def running_containers() -> list[str]:
-    r = docker("ps", "--filter", f"label={LABEL}=true", "--format", "{{.Names}}",
-               capture_output=True, text=True)
-    return [n for n in r.stdout.strip().splitlines() if n]
+    """실행 중인 프로젝트 컨테이너 (대기 컨테이너 제외)"""
+    names = [c["Names"][0].lstrip("/") for c in api().containers(LABEL)]
+    return [n for n in names if not is_standby(n)]
+
+
+def volume_mount(source: str, target: str, name: str) -> dict:
+    """이름 있는 볼륨 마운트. 컨테이너 라벨을 붙여 정리 시 prune 한 번으로 지울 수 있게 함"""
+    return {"Type": "volume", "Source": source, "Target": target,
+            "VolumeOptions": {"Labels": {LABEL: "true", f"{LABEL}.container": name}}}
+
+
+def remove_volumes(names: list[str], label: str):
+    """라벨 prune 한 번으로 볼륨을 일괄 제거하고, 라벨 없이 만들어진
+    이전 볼륨만 이름으로 개별 제거"""
+    removed = set(api().prune_volumes(label))
+    for v in names:
+        if v not in removed:
+            api().remove_volume(v)
+
+
+@functools.cache
+def stop_timeout() -> int | None:
+    """정지 대기 시간(초). CLAUDE_STOP_TIMEOUT이 없거나 잘못되면 Docker 기본값(10초)"""
+    value = os.environ.get("CLAUDE_STOP_TIMEOUT", "").strip()
+    if not value:
+        return None
+    try:
+        seconds = int(value)
+    except ValueError:
+        seconds = -1
+    if seconds < 0:
+        warn(f"CLAUDE_STOP_TIMEOUT={value!r} 무시 (0 이상의 정수 초여야 함), Docker 기본값 사용")
+        return None
+    return seconds
+
+
+def run_parallel(names: list[str], action, done: str) -> int:
+    """action(name)을 제한된 스레드 풀에서 동시에 실행하고 결과를 모아 보고.
+    소요 시간은 합이 아니라 가장 느린 컨테이너 기준. Returns 실패 수"""
+    if not names:
+        return 0
+    started = time.monotonic()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL, len(names))) as pool:
+        futures = {pool.submit(action, n): n for n in names}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                ok(f"{done}: {futures[future]}")
+            except (DockerError, OSError) as e:
+                # 한 컨테이너의 연결 오류(ConnectionError 등)가 나머지 결과를 버리지 않도록
+                failed += 1
+                err(f"실패: {futures[future]} ({e})")
+    info(f"{done} {len(names) - failed}/{len(names)}개"
+         f"{f', 실패 {failed}개' if failed else ''} ({time.monotonic() - started:.1f}s)")
+    return failed
 
 
 def tty_flags() -> list[str]:
@@ -235,71 +396,402 @@ def get_host_credentials() -> tuple[str | None, str | None]:
     return None, None
 
 
-def inject_credentials_file(container_name: str, creds_json: str):
-    """호스트 OAuth 자격증명을 .credentials.json 파일로 컨테이너에 주입하고
-    interactive 모드 온보딩 스킵을 위한 .claude.json 설정"""
-    docker("exec", "-u", "root", container_name, "chown", "node:node",
-           "/home/node/.claude", capture_output=True)
-    # .credentials.json 주입
-    run(["docker", "exec", "-i", container_name,
-         "sh", "-c", "cat > /home/node/.claude/.credentials.json"],
-        input=creds_json, text=True, capture_output=True)
-    docker("exec", "-u", "root", container_name, "sh", "-c",
-           "chmod 600 /home/node/.claude/.credentials.json && "
-           "chown node:node /home/node/.claude/.credentials.json",
-           capture_output=True)
-    # .claude.json에 hasCompletedOnboarding 설정 (interactive 로그인 선택 화면 스킵)
-    onboarding_script = (
-        "const fs = require('fs');"
-        "const p = '/home/node/.claude/.claude.json';"
-        "let d = {};"
-        "try { d = JSON.parse(fs.readFileSync(p, 'utf8')); } catch {}"
-        "d.hasCompletedOnboarding = true;"
-        "fs.writeFileSync(p, JSON.stringify(d));"
-    )
-    docker("exec", container_name, "node", "-e", onboarding_script,
-           capture_output=True)
+def tar_add(tar: tarfile.TarFile, path: str, data: bytes | None, mode: int):
+    """node 소유의 파일(data가 None이면 디렉터리)을 tar에 추가"""
+    entry = tarfile.TarInfo(path)
+    entry.uid = entry.gid = NODE_UID
+    entry.uname = entry.gname = "node"
+    entry.mode = mode
+    entry.mtime = int(time.time())
+    if data is None:
+        entry.type = tarfile.DIRTYPE
+        tar.addfile(entry)
+    else:
+        entry.size = len(data)
+        tar.addfile(entry, io.BytesIO(data))
+
+
+def read_container_json(container_name: str, path: str) -> dict:
+    """컨테이너의 JSON 파일을 읽음. 없거나 깨졌으면 {}"""
+    data = api().get_archive(container_name, path)
+    if data is None:
+        return {}
+    try:
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            member = tar.next()
+            f = tar.extractfile(member) if member else None
+            return json.loads(f.read()) if f else {}
+    except (tarfile.TarError, ValueError):
+        return {}
+
+
+def provision(container_name: str, creds_json: str | None):
+    """.zshrc와 (있으면) 호스트 OAuth 자격증명 .credentials.json, 온보딩 스킵 플래그를
+    넣은 .claude.json을 tar 하나로 /home/node 아래에 씀.
+    .claude.json은 호스트에서 병합하므로 exec 없이 archive API 요청만 씀
+    (기존 .claude.json 읽기 1번 + 쓰기 1번)"""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        tar_add(tar, ".zshrc", ZSHRC.encode(), 0o644)
+        # 새 볼륨은 root 소유라 node 소유로 바꿈
+        tar_add(tar, ".claude", None, 0o755)
+        if creds_json:
+            # hasCompletedOnboarding: interactive 로그인 선택 화면 스킵
+            claude_json = read_container_json(container_name, "/home/node/.claude/.claude.json")
+            claude_json["hasCompletedOnboarding"] = True
+            tar_add(tar, ".claude/.credentials.json", creds_json.encode(), 0o600)
+            tar_add(tar, ".claude/.claude.json", json.dumps(claude_json).encode(), 0o644)
+    api().put_archive(container_name, "/home/node", buf.getvalue())
 
 
 # ─── .devcontainer 생성 ─────────────────────────────────────
 
-def ensure_devcontainer(project_dir: Path) -> Path:
-    """프로젝트에 .devcontainer/ 가 없으면 생성"""
-    devc = project_dir / ".devcontainer"
+def sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
 
-    if devc.exists() and (devc / "Dockerfile").exists():
-        return devc
 
-    info(f".devcontainer 생성: {devc}")
+def ensure_devcontainer(project_dir: Path) -> Path:
+    """프로젝트의 .devcontainer/ 를 생성하거나 최신 내용으로 갱신.
+    직접 수정한 파일(기록된 해시와 다름)은 그대로 두고, 기록 없이 있던
+    이전 버전 파일은 .bak으로 남긴 뒤 새로 씀"""
+    devc = project_dir / ".devcontainer"
+    if not devc.exists():
+        info(f".devcontainer 생성: {devc}")
     devc.mkdir(parents=True, exist_ok=True)
 
-    (devc / "Dockerfile").write_text(DOCKERFILE)
-    (devc / "init-firewall.sh").write_text(FIREWALL_SH)
-    os.chmod(devc / "init-firewall.sh", 0o755)
-    (devc / "devcontainer.json").write_text(DEVCONTAINER_JSON)
-
-    ok(".devcontainer 생성 완료")
+    try:
+        recorded = json.loads((devc / MANIFEST).read_text())
+    except (OSError, ValueError):
+        recorded = {}
+
+    manifest = dict(recorded)
+    updated = []
+    for fname, content in GENERATED_FILES.items():
+        path = devc / fname
+        want = sha256(content)
+        if path.exists():
+            have = sha256(path.read_text())
+            if have == want:
+                manifest[fname] = want
+                continue
+            if fname in manifest and manifest[fname] != have:
+                continue  # 사용자가 수정한 파일
+            if fname not in manifest:
+                path.replace(path.with_name(f"{fname}.bak"))
+                warn(f"이전 {fname} → {fname}.bak 으로 보관")
+        path.write_text(content)
+        if fname in EXECUTABLE_FILES:
+            os.chmod(path, 0o755)
+        manifest[fname] = want
+        updated.append(fname)
+
+    if manifest != recorded:
+        (devc / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    if updated:
+        ok(f".devcontainer 갱신: {', '.join(updated)}")
     return devc
 
 
 # ─── 이미지 빌드 ────────────────────────────────────────────
 
-def ensure_image(project_dir: Path):
-    """이미지 없으면 빌드"""
-    img = image_name()
-    r = docker("image", "inspect", img, capture_output=True)
-    if r.returncode == 0:
+def docker_build(img: str, *args: str, quiet: bool = False, **kwargs):
+    """BuildKit으로 빌드 (apt/npm 캐시 마운트, 바뀐 레이어만 다시 빌드).
+    quiet면 출력을 모아 두었다가 실패 시 마지막 부분만 DockerError로 (동시 빌드용)"""
+    env = {**os.environ, "DOCKER_BUILDKIT": "1"}
+    if not quiet:
+        info(f"이미지 빌드: {img}")
+        docker_check("build", "-t", img, *args, env=env, **kwargs)
+        ok(f"빌드 완료: {img}")
         return
+    r = docker("build", "--progress=plain", "-t", img, *args, env=env,
+               capture_output=True, **kwargs)
+    if r.returncode != 0:
+        tail = "\n".join(r.stderr.decode(errors="replace").strip().splitlines()[-10:])
+        raise DockerError(f"빌드 실패\n{tail}")
+
+
+def build_base(quiet: bool = False):
+    """공유 기본 이미지 빌드 (빌드 컨텍스트 없이 Dockerfile만 stdin으로)"""
+    docker_build(BASE_REF, "-", quiet=quiet, input=BASE_DOCKERFILE.encode())
+
+
+def base_args(dockerfile: str) -> list[str] | None:
+    """Dockerfile이 공유 기본 이미지를 쓸 수 있으면 그 빌드 인자 (기본 스테이지를 고쳤으면 None)"""
+    if BASE_STAGE in dockerfile:
+        return ["--build-arg", f"BASE={BASE_REF}"]
+    return None
+
+
+def build_image(devc: Path, img: str, quiet: bool = False):
+    """프로젝트 이미지 빌드. 공유 기본 이미지를 쓸 수 있으면 그걸로 (없으면 먼저 빌드)"""
+    args = base_args((devc / "Dockerfile").read_text())
+    if args is not None and api().inspect_image(BASE_REF) is None:
+        build_base(quiet)
+    docker_build(img, *(args or []), "-f", str(devc / "Dockerfile"), str(devc), quiet=quiet)
 
+
+def ensure_image(project_dir: Path) -> str:
+    """빌드 입력이 바뀌었으면(해시 태그 이미지가 없으면) 빌드. Returns 이미지 이름:태그"""
     devc = ensure_devcontainer(project_dir)
-    info(f"이미지 빌드: {img}")
-    docker_check("build", "-t", img, "-f", str(devc / "Dockerfile"), str(devc))
-    ok(f"빌드 완료: {img}")
+    img = image_ref(devc)
+    if api().inspect_image(img) is None:
+        build_image(devc, img)
+    return img
+
+
+# ─── 컨테이너 스펙 ──────────────────────────────────────────
+
+def container_spec(project_dir: Path, name: str, img: str,
+                   api_key: str, oauth_token: str | None) -> dict:
+    """docker run -d 와 같은 설정 (Engine API 컨테이너 생성 스펙).
+    볼륨은 프로젝트 컨테이너 이름 기준이라 대기 컨테이너로 만들어도 그대로 넘겨받을 수 있음"""
+    spec = {
+        "Image": img,
+        "Labels": {
+            LABEL: "true",
+            f"{LABEL}.project": str(project_dir),
+            f"{LABEL}.auth": auth_fingerprint(api_key, oauth_token),
+        },
+        "Env": [
+            "CLAUDE_CONFIG_DIR=/home/node/.claude",
+            "NODE_OPTIONS=--max-old-space-size=4096",
+        ],
+        "HostConfig": {
+            "CapAdd": ["NET_ADMIN"],
+            "Binds": [f"{project_dir}:/workspace"],
+            "Mounts": [
+                volume_mount(f"claude-config-{name}", "/home/node/.claude", name),
+                volume_mount(f"claude-history-{name}", "/commandhistory", name),
+                # 방화벽 IP 캐시: node가 못 쓰는 root 전용 볼륨
+                volume_mount(f"claude-firewall-{name}", "/var/cache/firewall", name),
+            ],
+        },
+    }
+
+    if api_key:
+        spec["Env"].append(f"ANTHROPIC_API_KEY={api_key}")
+    elif oauth_token:
+        # 환경변수로 OAuth 토큰 주입 (interactive 모드 로그인 스킵)
+        spec["Env"].append(f"CLAUDE_CODE_OAUTH_TOKEN={oauth_token}")
+
+    spec["Cmd"] = [
+        "/usr/bin/bash", "-c",
+        f"echo \"start $EPOCHREALTIME\" > {TIMINGS_FILE}; "
+        "sudo /usr/local/bin/init-firewall.sh; "
+        f"echo \"firewall $EPOCHREALTIME\" >> {TIMINGS_FILE}; "
+        f"touch {READY_MARKER}; "
+        "exec sleep infinity",
+    ]
+    return spec
+
+
+def auth_fingerprint(api_key: str, oauth_token: str | None) -> str:
+    """컨테이너 환경변수에 들어간 인증 정보의 지문 (대기 컨테이너 재사용 판단용)"""
+    return hashlib.sha256(f"{api_key}\0{oauth_token or ''}".encode()).hexdigest()[:12]
+
+
+# ─── 대기 컨테이너 풀 ───────────────────────────────────────
+# 실행 중인 컨테이너에는 마운트를 추가할 수 없으므로 범용 컨테이너 대신
+# 최근 프로젝트마다 방화벽 초기화까지 끝난 컨테이너를 미리 띄워 두고,
+# run에서 이름만 바꿔 넘겨받는다.
+
+@functools.cache
+def pool_size() -> int:
+    """대기 컨테이너 수 (CLAUDE_POOL_SIZE). 기본 0(끔): 미리 띄운 컨테이너가
+    메모리와 인증 정보를 쥐고 있으므로 사용자가 켤 때만 채움"""
+    value = os.environ.get("CLAUDE_POOL_SIZE", "").strip()
+    if not value:
+        return 0
+    try:
+        size = int(value)
+    except ValueError:
+        size = -1
+    if size < 0:
+        warn(f"CLAUDE_POOL_SIZE={value!r} 무시 (0 이상의 정수여야 함), 풀 끔")
+        return 0
+    return size
+
+
+def standby_name(name: str) -> str:
+    return f"{name}{STANDBY_SUFFIX}"
+
+
+def is_standby(name: str) -> bool:
+    return name.endswith(STANDBY_SUFFIX)
+
+
+def load_recent() -> list[str]:
+    try:
+        return json.loads((STATE_DIR / "recent.json").read_text())
+    except (OSError, ValueError):
+        return []
+
+
+def record_recent(project_dir: Path):
+    """최근 사용 프로젝트 목록 맨 앞에 추가"""
+    recent = [str(project_dir)] + [p for p in load_recent() if p != str(project_dir)]
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    (STATE_DIR / "recent.json").write_text(json.dumps(recent[:MAX_RECENT]))
+
+
+def wait_ready(name: str, timeout: float = 60.0) -> bool:
+    """방화벽 초기화가 끝날 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while api().exec(name, ["test", "-f", READY_MARKER])[0] != 0:
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.2)
+    return True
+
+
+def standby_current(c: dict, img: str, fingerprint: str) -> bool:
+    """대기 컨테이너가 현재 이미지/인증 정보로 떠 있는지"""
+    return (c["State"]["Running"]
+            and c["Config"]["Image"] == img
+            and c["Config"]["Labels"].get(f"{LABEL}.auth") == fingerprint)
+
+
+def claim_standby(name: str, img: str, fingerprint: str) -> bool:
+    """프로젝트의 대기 컨테이너를 넘겨받음. 쓸 수 없으면 제거하고 False"""
+    standby = standby_name(name)
+    c = api().inspect_container(standby)
+    if c is None:
+        return False
+    if not (standby_current(c, img, fingerprint) and wait_ready(standby)):
+        api().remove_container(standby, force=True)
+        return False
+    api().rename_container(standby, name)
+    return True
+
+
+def fill_pool():
+    """최근 프로젝트 중 실행 중이 아닌 pool_size()개에 대기 컨테이너를 채움"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(STATE_DIR / "pool.lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return  # 다른 프로세스가 채우는 중
+
+        api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+        _, oauth_token = get_host_credentials()
+        fingerprint = auth_fingerprint(api_key, oauth_token)
+        existing = {c["Names"][0].lstrip("/")
+                    for c in api().containers(LABEL, include_stopped=True)}
+        running = set(running_containers())
+
+        wanted = []
+        for path in load_recent():
+            project_dir = Path(path)
+            name = container_name(project_dir)
+            if (project_dir / ".devcontainer").is_dir() and name not in running:
+                wanted.append((project_dir, name))
+            if len(wanted) >= pool_size():
+                break
+
+        # 목록에서 밀려난 대기 컨테이너 제거
+        keep = {standby_name(n) for _, n in wanted}
+        for n in existing:
+            if is_standby(n) and n not in keep:
+                api().remove_container(n, force=True)
+                ok(f"대기 컨테이너 제거: {n}")
+
+        for project_dir, name in wanted:
+            standby = standby_name(name)
+            img = image_ref(project_dir / ".devcontainer")
+            if api().inspect_image(img) is None:
+                continue  # 아직 빌드 전 (다음 run에서 빌드)
+            c = api().inspect_container(standby)
+            if c is not None and standby_current(c, img, fingerprint):
+                continue
+            api().remove_container(standby, force=True)
+            api().create_container(standby, container_spec(project_dir, name, img, api_key, oauth_token))
+            api().start_container(standby)
+            if wait_ready(standby):
+                ok(f"대기 컨테이너 준비: {standby} ({project_dir})")
+            else:
+                warn(f"대기 컨테이너 준비 시간 초과: {standby}")
+
+
+def refill_in_background():
+    """run을 막지 않도록 별도 프로세스로 풀을 채움 (로그: STATE_DIR/pool.log)"""
+    if pool_size() <= 0:
+        return
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(STATE_DIR / "pool.log", "ab") as log:
+        subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "pool", "fill"],
+                         stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                         start_new_session=True)
+
+
+# ─── 시작 타이밍 ────────────────────────────────────────────
+
+def timings_mode(flag: str = "") -> str:
+    """run --timings[=json] 또는 CLAUDE_TIMINGS=1|json. "" (끔) / "table" / "json" """
+    value = flag or os.environ.get("CLAUDE_TIMINGS", "")
+    if value in ("", "0"):
+        return ""
+    return "json" if value == "json" else "table"
+
+
+class Timeline:
+    """run 단계별 시작/끝 (run 시작 기준 초).
+    호스트 단계는 monotonic 시계로 재고, 컨테이너 단계는 엔트리포인트가 남긴
+    벽시계 시각을 호스트 기준으로 맞춤 (Docker Desktop VM과는 monotonic 시계가 달라서)"""
+
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.wall0 = time.time()
+        self.phases: list[tuple[str, str, float, float]] = []  # (위치, 단계, 시작, 끝)
+
+    def now(self) -> float:
+        return time.monotonic() - self.t0
+
+    @contextlib.contextmanager
+    def phase(self, label: str):
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.phases.append(("host", label, start, self.now()))
+
+    def add_container(self, markers: str):
+        """'단계 EPOCHREALTIME' 줄 목록 → 직전 마커부터 그 마커까지를 한 단계로"""
+        prev = None
+        for line in markers.splitlines():
+            try:
+                label, stamp = line.split()
+                at = float(stamp.replace(",", ".")) - self.wall0
+            except ValueError:
+                continue
+            if prev is not None:
+                self.phases.append(("container", label, prev, at))
+            prev = at
+
+    def report(self, mode: str, total: float, **meta):
+        # 한글 헤더는 글자당 두 칸이라 폭을 그만큼 줄임
+        print(f"  {'단계':<14}{'위치':<10}{'시작(s)':>7}{'소요(s)':>7}")
+        for where, label, start, end in sorted(self.phases, key=lambda p: p[2]):
+            print(f"  {label:<16}{where:<12}{start:>9.3f}{end - start:>9.3f}")
+        print(f"  {'total':<28}{'':>9}{total:>9.3f}")
+        if mode != "json":
+            return
+        record = {
+            "time": self.wall0, "total": round(total, 4), **meta,
+            "phases": [{"where": w, "phase": l, "start": round(s, 4), "duration": round(e - s, 4)}
+                       for w, l, s, e in self.phases],
+        }
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(STATE_DIR / "timings.jsonl", "a") as f:
+            f.write(json.dumps(record) + "\n")
+        info(f"타이밍 기록: {STATE_DIR / 'timings.jsonl'}")
 
 
 # ─── 커맨드 ─────────────────────────────────────────────────
 
-def cmd_run(project_path: str = ".", shell_mode: bool = False):
+def cmd_run(project_path: str = ".", shell_mode: bool = False, timings: str = ""):
+    timeline = Timeline()
+    mode = timings_mode(timings)
     project_dir = Path(project_path).resolve()
     if not project_dir.is_dir():
         err(f"경로 없음: {project_dir}")
@@ -319,47 +811,32 @@ def cmd_run(project_path: str = ".", shell_mode: bool = False):
         docker("exec", *tty_flags(), name, *exec_cmd)
         return
 
-    ensure_devcontainer(project_dir)
-    ensure_image(project_dir)
+    with timeline.phase("image"):
+        img = ensure_image(project_dir)
+    record_recent(project_dir)
 
     # 정지된 컨테이너 정리
-    docker("rm", "-f", name, capture_output=True)
+    with timeline.phase("cleanup"):
+        api().remove_container(name, force=True)
 
     api_key = os.environ.get("ANTHROPIC_API_KEY", "")
-    creds_json, oauth_token = get_host_credentials()
-
-    cmd = [
-        "docker", "run", "-d",
-        "--name", name,
-        "--label", f"{LABEL}=true",
-        "--cap-add", "NET_ADMIN",
-        "-v", f"{project_dir}:/workspace",
-        "-v", f"claude-config-{name}:/home/node/.claude",
-        "-v", f"claude-history-{name}:/commandhistory",
-        "-e", "CLAUDE_CONFIG_DIR=/home/node/.claude",
-        "-e", "NODE_OPTIONS=--max-old-space-size=4096",
-    ]
-
-    if api_key:
-        cmd += ["-e", f"ANTHROPIC_API_KEY={api_key}"]
-    elif oauth_token:
-        # 환경변수로 OAuth 토큰 주입 (interactive 모드 로그인 스킵)
-        cmd += ["-e", f"CLAUDE_CODE_OAUTH_TOKEN={oauth_token}"]
-
-    cmd += [
-        image_name(),
-        "/usr/bin/bash", "-c",
-        "sudo /usr/local/bin/init-firewall.sh; "
-        "[ -f /home/node/.zshrc ] || printf 'HISTFILE=/commandhistory/.zsh_history\\nHISTSIZE=10000\\nSAVEHIST=10000\\nsetopt appendhistory\\nautoload -Uz compinit && compinit\\n' > /home/node/.zshrc; "
-        "exec sleep infinity",
-    ]
-
-    docker_check(*cmd[1:], capture_output=True)
-
-    # .credentials.json 파일도 주입 (파일 기반 인증 fallback)
+    with timeline.phase("credentials"):
+        creds_json, oauth_token = get_host_credentials()
+
+    with timeline.phase("standby"):
+        claimed = claim_standby(name, img, auth_fingerprint(api_key, oauth_token))
+    if not claimed:
+        with timeline.phase("create"):
+            api().create_container(name, container_spec(project_dir, name, img, api_key, oauth_token))
+        with timeline.phase("start"):
+            api().start_container(name)
+
+    # .zshrc + .credentials.json 파일 (파일 기반 인증 fallback)을 한 번에 주입
+    with timeline.phase("provision"):
+        provision(name, creds_json)
     if creds_json:
-        inject_credentials_file(name, creds_json)
         ok("호스트 인증 정보 주입 완료")
+    to_prompt = timeline.now()
 
     print()
     ok(f"시작: \033[32m{name}\033[0m")
@@ -370,21 +847,34 @@ def cmd_run(project_path: str = ".", shell_mode: bool = False):
     print(f"  정지:   python3 claude.py stop {name}")
     print(f"  exit해도 컨테이너는 계속 실행됩니다")
     print()
-
+    info(f"프롬프트까지 {to_prompt:.2f}s "
+         f"({'대기 컨테이너 사용' if claimed else '콜드 스타트'})")
+
+    if mode:
+        # 방화벽은 접속과 동시에 진행되므로 컨테이너 단계가 끝날 때까지 기다렸다가 읽음
+        if not wait_ready(name):
+            warn("컨테이너 준비 시간 초과 — 끝난 단계만 표시")
+        timeline.add_container(api().exec(name, ["cat", TIMINGS_FILE])[1].decode())
+        if claimed:
+            print("  (대기 컨테이너: 컨테이너 단계는 run 이전에 끝남)")
+        timeline.report(mode, to_prompt, project=str(project_dir), container=name, standby=claimed)
+        print()
+
+    # 다른 최근 프로젝트의 대기 컨테이너는 백그라운드에서 채움
+    refill_in_background()
     docker("exec", *tty_flags(), name, *exec_cmd)
 
 
 def cmd_list():
-    r = docker(
-        "ps", "--filter", f"label={LABEL}=true",
-        "--format", "table {{.Names}}\t{{.Status}}\t{{.RunningFor}}",
-        capture_output=True, text=True,
-    )
-    out = r.stdout.strip()
-    if not out or out.count("\n") == 0:
+    rows = [(c["Names"][0].lstrip("/"), c["Status"])
+            for c in api().containers(LABEL) if not is_standby(c["Names"][0])]
+    if not rows:
         print("실행 중인 Claude 컨테이너 없음")
         return
-    print(out)
+    width = max(len("NAMES"), *(len(n) for n, _ in rows))
+    print(f"{'NAMES':<{width}}   STATUS")
+    for n, status in rows:
+        print(f"{n:<{width}}   {status}")
 
 
 def cmd_shell(name: str = ""):
@@ -413,30 +903,32 @@ def cmd_stop(name: str = ""):
         for c in containers:
             print(f"  {c}")
         sys.exit(1)
-    docker("stop", name, capture_output=True)
-    docker("rm", name, capture_output=True)
+    api().stop_container(name, stop_timeout())
+    api().remove_container(name)
     ok(f"정지 및 제거: {name}")
 
 
+def stop_and_remove(name: str):
+    api().stop_container(name, stop_timeout())
+    api().remove_container(name, force=True)
+
+
 def cmd_stopall():
-    containers = running_containers()
+    # 대기 컨테이너 포함
+    containers = [c["Names"][0].lstrip("/") for c in api().containers(LABEL)]
     if not containers:
         print("정지할 컨테이너 없음")
         return
-    for name in containers:
-        docker("stop", name, capture_output=True)
-        docker("rm", name, capture_output=True)
-        ok(f"정지: {name}")
+    if run_parallel(containers, stop_and_remove, "정지"):
+        sys.exit(1)
 
 
 def cmd_rm(name: str = ""):
     """정지된 컨테이너 + 볼륨 제거"""
     if not name:
         # 라벨 기준으로 전체 (실행 중 포함) 조회
-        r = docker("ps", "-a", "--filter", f"label={LABEL}=true",
-                   "--format", "{{.Names}}\t{{.Status}}",
-                   capture_output=True, text=True)
-        lines = [l for l in r.stdout.strip().splitlines() if l]
+        lines = [f"{c['Names'][0].lstrip('/')}\t{c['Status']}"
+                 for c in api().containers(LABEL, include_stopped=True)]
         if not lines:
             print("제거할 컨테이너 없음")
             return
@@ -445,63 +937,114 @@ def cmd_rm(name: str = ""):
             print(f"  {l}")
         sys.exit(1)
 
-    docker("stop", name, capture_output=True)
-    docker("rm", "-f", name, capture_output=True)
+    # 볼륨을 같이 쓰는 대기 컨테이너도 제거
+    stop_and_remove(name)
+    stop_and_remove(standby_name(name))
     # 연관 볼륨도 제거
-    for prefix in ("claude-config-", "claude-history-"):
-        docker("volume", "rm", f"{prefix}{name}", capture_output=True)
+    remove_volumes([f"{prefix}{name}" for prefix in VOLUME_PREFIXES],
+                   f"{LABEL}.container={name}")
     ok(f"제거: {name} (볼륨 포함)")
 
 
+def base_users() -> list[str]:
+    """기본 이미지 위에 빌드된 다른 이미지 태그 (라벨은 base.Dockerfile에서 상속)"""
+    return sorted(t for i in api().images(BASE_IMAGE) for t in i.get("RepoTags") or []
+                  if t.rsplit(":", 1)[0] not in (BASE_IMAGE, image_name()))
+
+
 def cmd_clean():
     """모든 Claude 컨테이너 + 볼륨 + 이미지 정리"""
-    r = docker("ps", "-a", "--filter", f"label={LABEL}=true",
-               "--format", "{{.Names}}", capture_output=True, text=True)
-    containers = [n for n in r.stdout.strip().splitlines() if n]
+    containers = [c["Names"][0].lstrip("/")
+                  for c in api().containers(LABEL, include_stopped=True)]
 
+    failed = 0
     if not containers:
         print("정리할 컨테이너 없음")
     else:
-        for name in containers:
-            docker("stop", name, capture_output=True)
-            docker("rm", "-f", name, capture_output=True)
-            for prefix in ("claude-config-", "claude-history-"):
-                docker("volume", "rm", f"{prefix}{name}", capture_output=True)
-            ok(f"제거: {name}")
-
-    # 이미지 제거
-    img = image_name()
-    r = docker("image", "inspect", img, capture_output=True)
-    if r.returncode == 0:
-        docker("rmi", img, capture_output=True)
-        ok(f"이미지 제거: {img}")
+        failed = run_parallel(containers, stop_and_remove, "제거")
+        remove_volumes([f"{prefix}{name}" for name in containers for prefix in VOLUME_PREFIXES],
+                       f"{LABEL}=true")
+
+    # 이미지 제거 (모든 내용 해시 태그). 태그만 지우면 Docker가 막지 않으므로
+    # 기본 이미지는 다른 도구(agent-browser-container)의 이미지가 남아 있으면 그대로 둠
+    for img in api().image_tags(image_name()):
+        if api().remove_image(img):
+            ok(f"이미지 제거: {img}")
+    if users := base_users():
+        info(f"기본 이미지 유지: {BASE_IMAGE} ({', '.join(users)}에서 사용 중)")
+    else:
+        for img in api().image_tags(BASE_IMAGE):
+            if api().remove_image(img):
+                ok(f"이미지 제거: {img}")
 
+    if failed:
+        sys.exit(1)
     ok("정리 완료")
 
 
-def cmd_build(project_path: str = "."):
+def cmd_pool(action: str = ""):
+    """대기 컨테이너 풀: 상태 / fill (지금 채움) / clear (모두 제거)"""
+    if action == "fill":
+        if pool_size() <= 0:
+            info("풀이 꺼져 있음 (CLAUDE_POOL_SIZE=N으로 켬), 남은 대기 컨테이너만 정리")
+        fill_pool()
+        return
+    standbys = [c for c in api().containers(LABEL, include_stopped=True)
+                if is_standby(c["Names"][0])]
+    if action == "clear":
+        if standbys and run_parallel([c["Names"][0].lstrip("/") for c in standbys],
+                                     stop_and_remove, "대기 컨테이너 제거"):
+            sys.exit(1)
+        return
+    if action:
+        err(f"알 수 없는 pool 명령: {action} (fill | clear)")
+        sys.exit(1)
+
+    print(f"풀 크기: {pool_size()} (CLAUDE_POOL_SIZE)")
+    if not standbys:
+        print("대기 컨테이너 없음")
+    for c in standbys:
+        print(f"  {c['Names'][0].lstrip('/')}  {c['Status']}  {c['Labels'].get(f'{LABEL}.project', '')}")
+
+
+def cmd_build(project_path: str = ".") -> str:
+    """캐시된 레이어를 재사용해 다시 빌드 (CLAUDE_CODE_VERSION=latest 갱신용)"""
     project_dir = Path(project_path).resolve()
     devc = ensure_devcontainer(project_dir)
-    img = image_name()
-    info(f"이미지 빌드: {img}")
-    docker_check("build", "-t", img, "-f", str(devc / "Dockerfile"), str(devc))
-    ok(f"빌드 완료: {img}")
+    img = image_ref(devc)
+    build_image(devc, img)
+    return img
+
+
+def cmd_build_all(project_path: str = "."):
+    """기본 이미지를 다시 빌드한 뒤, 그 위에 올라가는 서로 독립인 프로젝트 이미지
+    (이 프로젝트 + 최근 프로젝트, 같은 태그는 한 번)를 동시에 빌드"""
+    images: dict[str, Path] = {}
+    for p in [str(Path(project_path).resolve()), *load_recent()]:
+        if Path(p).is_dir():
+            devc = ensure_devcontainer(Path(p))
+            images.setdefault(image_ref(devc), devc)
+
+    build_base()
+    failed = run_parallel(list(images), lambda img: build_image(images[img], img, quiet=True),
+                          "빌드 완료")
+    if failed:
+        sys.exit(1)
 
 
 def cmd_push():
-    img = image_name()
-    if img == DEFAULT_IMAGE:
+    if image_name() == DEFAULT_IMAGE:
         err("CLAUDE_IMAGE를 레지스트리 경로로 설정하세요")
         print("  예: export CLAUDE_IMAGE=ghcr.io/your-org/claude-code-sandbox")
         sys.exit(1)
-    cmd_build()
+    img = cmd_build()
     info(f"푸시: {img}")
     docker_check("push", img)
-    ok("완료 — 팀원: CLAUDE_IMAGE={img} python3 claude.py pull && python3 claude.py run .")
+    ok(f"완료 — 팀원: CLAUDE_IMAGE={image_name()} python3 claude.py pull && python3 claude.py run .")
 
 
 def cmd_pull():
-    img = image_name()
+    img = image_ref()
     info(f"풀: {img}")
     docker_check("pull", img)
     ok("완료")
@@ -516,17 +1059,24 @@ def cmd_help():
         실행:
           run [경로]      프로젝트에서 Claude 시작 (기본: 현재 폴더)
           run -s [경로]   zsh 셸로 접속 (--shell / -s)
+          run --timings   시작 단계별 소요 시간 표 (=json: timings.jsonl에 기록 추가)
           list (ls)       실행 중인 컨테이너 목록
           shell (sh)      실행 중 컨테이너에 zsh 접속 (exit해도 유지)
 
+        대기 컨테이너 풀:
+          pool            대기 컨테이너 목록
+          pool fill       최근 프로젝트의 대기 컨테이너를 지금 채움
+          pool clear      대기 컨테이너 모두 제거
+
         정지/제거:
           stop <이름>     컨테이너 정지 + 제거
-          stopall         전체 정지 + 제거
+          stopall         전체 정지 + 제거 (동시 처리)
           rm <이름>       컨테이너 + 볼륨 제거
           clean           모든 컨테이너 + 볼륨 + 이미지 완전 삭제
 
         빌드/공유:
-          build [경로]    이미지 빌드만
+          build [경로]    이미지 (재)빌드 (바뀐 레이어만)
+          build --all     기본 이미지 + 최근 프로젝트 이미지 모두 (재)빌드 (동시 처리)
           push            레지스트리에 푸시 (팀 공유)
           pull            레지스트리에서 받기
 
@@ -536,17 +1086,32 @@ def cmd_help():
         환경변수:
           ANTHROPIC_API_KEY   Claude API 키
           CLAUDE_IMAGE        이미지 이름 (팀 공유 시 레지스트리 경로)
+          CLAUDE_STOP_TIMEOUT 정지 시 강제 종료까지 대기(초, 기본 10)
+          CLAUDE_POOL_SIZE    대기 컨테이너 수 (기본 0 = 끔, 예: 2로 켬)
+          CLAUDE_TIMINGS      1이면 run마다 --timings, json이면 --timings=json
     """))
 
 
 # ─── 메인 ───────────────────────────────────────────────────
 
 def _dispatch_run(rest: list[str]):
-    """Parse --shell/-s flag and dispatch to cmd_run."""
+    """Parse --shell/-s and --timings[=json] flags and dispatch to cmd_run."""
     shell_mode = "--shell" in rest or "-s" in rest
-    path_args = [a for a in rest if a not in ("--shell", "-s")]
+    timings = next((a.partition("=")[2] or "1" for a in rest
+                    if a == "--timings" or a.startswith("--timings=")), "")
+    path_args = [a for a in rest if a not in ("--shell", "-s") and not a.startswith("--timings")]
+    project_path = path_args[0] if path_args else "."
+    cmd_run(project_path, shell_mode=shell_mode, timings=timings)
+
+
+def _dispatch_build(rest: list[str]):
+    """Parse --all flag and dispatch to cmd_build / cmd_build_all."""
+    path_args = [a for a in rest if a != "--all"]
     project_path = path_args[0] if path_args else "."
-    cmd_run(project_path, shell_mode=shell_mode)
+    if "--all" in rest:
+        cmd_build_all(project_path)
+    else:
+        cmd_build(project_path)
 
 
 def main():
@@ -567,7 +1132,8 @@ def main():
         "rm":      lambda: cmd_rm(rest[0] if rest else ""),
         "remove":  lambda: cmd_rm(rest[0] if rest else ""),
         "clean":   cmd_clean,
-        "build":   lambda: cmd_build(rest[0] if rest else "."),
+        "pool":    lambda: cmd_pool(rest[0] if rest else ""),
+        "build":   lambda: _dispatch_build(rest),
         "push":    cmd_push,
         "pull":    cmd_pull,
         "help":    cmd_help,
@@ -576,16 +1142,19 @@ def main():
     }
 
     fn = commands.get(cmd)
-    if fn:
-        fn()
-    else:
+    if fn is None and Path(cmd).is_dir():
         # 인자가 경로면 run으로 취급
-        if Path(cmd).is_dir():
-            _dispatch_run([cmd] + rest)
-        else:
-            err(f"알 수 없는 명령: {cmd}")
-            cmd_help()
-            sys.exit(1)
+        fn = lambda: _dispatch_run([cmd] + rest)
+    if fn is None:
+        err(f"알 수 없는 명령: {cmd}")
+        cmd_help()
+        sys.exit(1)
+
+    try:
+        fn()
+    except DockerError as e:
+        err(str(e))
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,320 @@
+"""
+Docker Engine API client shared by claude-container and agent-browser-container.
+
+The docker CLI pays a process startup per call, so the managers only use it
+for interactive TTY attach and build/push/pull; everything else talks to the
+Engine API over the socket directly.
+
+agent-browser-container/scripts/docker_engine.py is a symlink to this file
+(plugin installs copy the target), so both managers run the same client.
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import socket
+import struct
+import subprocess
+import threading
+import urllib.parse
+from pathlib import Path
+
+# Searched in order when neither DOCKER_HOST nor a docker context names the
+# daemon (Docker Engine, Docker Desktop, rootless Docker, colima, OrbStack)
+DOCKER_SOCKETS = ("/var/run/docker.sock", "~/.docker/run/docker.sock",
+                  "$XDG_RUNTIME_DIR/docker.sock", "~/.colima/default/docker.sock",
+                  "~/.orbstack/run/docker.sock")
+# Bridges a connection to the current daemon over stdio, for endpoints that
+# are not a local unix socket (tcp://, ssh://)
+DIAL_STDIO = ("docker", "system", "dial-stdio")
+
+
+class DockerError(RuntimeError):
+    """Docker Engine API error (status: HTTP status, None if unreachable)."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+def connect(sock_path: str | None) -> socket.socket:
+    """Stream socket to the daemon: the unix socket, or with None one end of a
+    socket pair whose other end `docker system dial-stdio` bridges to it."""
+    if sock_path is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(sock_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    ours, theirs = socket.socketpair()
+    with theirs:
+        try:
+            subprocess.Popen(DIAL_STDIO, stdin=theirs, stdout=theirs,
+                             stderr=subprocess.DEVNULL, start_new_session=True)
+        except OSError:
+            ours.close()
+            raise
+    return ours
+
+
+class EngineConnection(http.client.HTTPConnection):
+    """HTTP/1.1 to the daemon (kept alive across requests)."""
+
+    def __init__(self, sock_path: str | None):
+        super().__init__("localhost", timeout=None)
+        self.sock_path = sock_path
+
+    def connect(self):
+        self.sock = connect(self.sock_path)
+
+
+def docker_config_dir() -> Path:
+    return Path(os.environ.get("DOCKER_CONFIG") or Path.home() / ".docker")
+
+
+def context_host() -> str | None:
+    """Host URL of the active docker context; None for the default context.
+
+    Read from the CLI's context store (contexts/meta/<sha256 of name>/meta.json),
+    the file `docker context inspect` reports, so no CLI process is spawned.
+    An unknown context returns "" and is left to the CLI to resolve.
+    """
+    name = os.environ.get("DOCKER_CONTEXT")
+    if not name:
+        try:
+            name = json.loads((docker_config_dir() / "config.json").read_text()).get("currentContext")
+        except (OSError, ValueError, AttributeError):
+            name = None
+    if not name or name == "default":
+        return None
+    meta = (docker_config_dir() / "contexts" / "meta"
+            / hashlib.sha256(name.encode()).hexdigest() / "meta.json")
+    try:
+        return json.loads(meta.read_text())["Endpoints"]["docker"]["Host"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return ""
+
+
+def docker_socket_path() -> str | None:
+    """Unix socket of the daemon the docker CLI would talk to.
+
+    DOCKER_HOST wins over the context, as in the CLI. None means the endpoint
+    is not a local unix socket (tcp://, ssh://, no socket found); requests
+    then go through `docker system dial-stdio`.
+    """
+    host = os.environ.get("DOCKER_HOST") or context_host()
+    if host is None:
+        for p in DOCKER_SOCKETS:
+            path = os.path.expanduser(os.path.expandvars(p))
+            if os.path.exists(path):
+                return path
+        return None
+    if host.startswith("unix://"):
+        return host[len("unix://"):]
+    return None
+
+
+def demux(data: bytes) -> tuple[bytes, bytes]:
+    """Split a non-TTY stream (8-byte header + payload frames) into (stdout, stderr)."""
+    out, errout = bytearray(), bytearray()
+    i = 0
+    while i + 8 <= len(data):
+        size = struct.unpack(">I", data[i + 4:i + 8])[0]
+        (errout if data[i] == 2 else out).extend(data[i + 8:i + 8 + size])
+        i += 8 + size
+    return bytes(out), bytes(errout)
+
+
+class DockerAPI:
+    """Minimal Engine API client, reusing one connection per thread."""
+
+    def __init__(self, sock_path: str | None = None):
+        self.sock_path = sock_path or docker_socket_path()
+        self._local = threading.local()
+        self._version: tuple[int, ...] | None = None
+
+    @property
+    def endpoint(self) -> str:
+        return self.sock_path or " ".join(DIAL_STDIO)
+
+    @property
+    def conn(self) -> EngineConnection:
+        # http.client connections cannot be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = EngineConnection(self.sock_path)
+        return conn
+
+    def request(self, method: str, path: str, body=None,
+                params: dict | None = None) -> tuple[int, bytes]:
+        if params:
+            path += "?" + urllib.parse.urlencode(params)
+        if isinstance(body, bytes):
+            data, headers = body, {"Content-Type": "application/x-tar"}
+        elif body is not None:
+            data, headers = json.dumps(body).encode(), {"Content-Type": "application/json"}
+        else:
+            data, headers = None, {}
+        for attempt in range(2):
+            try:
+                self.conn.request(method, path, data, headers)
+                r = self.conn.getresponse()
+                return r.status, r.read()
+            except OSError as e:
+                # Reconnect once if the idle keep-alive connection was dropped
+                self.conn.close()
+                if attempt or not isinstance(e, ConnectionError):
+                    raise DockerError(f"Cannot connect to the Docker daemon ({self.endpoint}): {e}") from e
+
+    def call(self, method: str, path: str, body=None, params: dict | None = None,
+             allow: tuple[int, ...] = ()):
+        """Send a request and return the JSON response; statuses in allow return None."""
+        status, data = self.request(method, path, body, params)
+        if status in allow:
+            return None
+        if status >= 400:
+            raise DockerError(error_message(data), status)
+        return json.loads(data) if data.strip() else {}
+
+    def version(self) -> tuple[int, ...]:
+        """Daemon API version, e.g. (1, 43)."""
+        if self._version is None:
+            api_version = self.call("GET", "/version")["ApiVersion"]
+            self._version = tuple(int(x) for x in api_version.split("."))
+        return self._version
+
+    # Containers
+    def containers(self, label: str, include_stopped: bool = False) -> list[dict]:
+        filters = json.dumps({"label": [f"{label}=true"]})
+        return self.call("GET", "/containers/json",
+                         params={"all": int(include_stopped), "filters": filters})
+
+    def inspect_container(self, name: str) -> dict | None:
+        return self.call("GET", f"/containers/{name}/json", allow=(404,))
+
+    def create_container(self, name: str, spec: dict) -> str:
+        return self.call("POST", "/containers/create", spec, {"name": name})["Id"]
+
+    def start_container(self, name: str):
+        self.call("POST", f"/containers/{name}/start", allow=(304,))
+
+    def rename_container(self, name: str, new_name: str):
+        self.call("POST", f"/containers/{name}/rename", params={"name": new_name})
+
+    def stop_container(self, name: str, timeout: int | None = None) -> bool:
+        """Stop a container; False if it is missing or already stopped."""
+        params = {"t": timeout} if timeout is not None else None
+        return self.call("POST", f"/containers/{name}/stop", params=params,
+                         allow=(304, 404)) is not None
+
+    def remove_container(self, name: str, force: bool = False) -> bool:
+        return self.call("DELETE", f"/containers/{name}", params={"force": int(force)},
+                         allow=(404,)) is not None
+
+    def logs(self, name: str) -> str:
+        status, data = self.request("GET", f"/containers/{name}/logs",
+                                    params={"stdout": 1, "stderr": 1})
+        if status >= 400:
+            raise DockerError(error_message(data), status)
+        out, errout = demux(data)
+        return (out + errout).decode(errors="replace")
+
+    def get_archive(self, name: str, path: str) -> bytes | None:
+        """Read a container path as a tar archive; None if it does not exist."""
+        status, data = self.request("GET", f"/containers/{name}/archive", params={"path": path})
+        if status == 404:
+            return None
+        if status >= 400:
+            raise DockerError(error_message(data), status)
+        return data
+
+    def put_archive(self, name: str, path: str, data: bytes):
+        """Extract a tar archive under the container directory path (owners/modes from the tar headers)."""
+        self.call("PUT", f"/containers/{name}/archive", data, {"path": path})
+
+    def exec(self, name: str, cmd: list[str], user: str = "",
+             stdin: bytes | None = None) -> tuple[int, bytes]:
+        """Run a command in a container (docker exec [-i]). Returns (exit code, stdout)."""
+        exec_id = self.call("POST", f"/containers/{name}/exec", {
+            "Cmd": cmd, "User": user, "AttachStdin": stdin is not None,
+            "AttachStdout": True, "AttachStderr": True,
+        })["Id"]
+        out, _ = demux(self._hijack(f"/exec/{exec_id}/start", {"Detach": False, "Tty": False}, stdin))
+        return self.call("GET", f"/exec/{exec_id}/json")["ExitCode"], out
+
+    def _hijack(self, path: str, body: dict, stdin: bytes | None) -> bytes:
+        """exec start hijacks the connection into a raw stream, so use a separate socket."""
+        payload = json.dumps(body).encode()
+        with connect(self.sock_path) as s:
+            s.sendall(
+                f"POST {path} HTTP/1.1\r\nHost: localhost\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                "Connection: Upgrade\r\nUpgrade: tcp\r\n\r\n".encode() + payload)
+            buf = b""
+            while b"\r\n\r\n" not in buf and (chunk := s.recv(65536)):
+                buf += chunk
+            head, _, rest = buf.partition(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            if status >= 400:
+                raise DockerError(error_message(rest), status)
+            if stdin is not None:
+                s.sendall(stdin)
+                s.shutdown(socket.SHUT_WR)
+            chunks = [rest]
+            while chunk := s.recv(65536):
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    # Images / volumes
+    def inspect_image(self, name: str) -> dict | None:
+        return self.call("GET", f"/images/{urllib.parse.quote(name, safe='/:@')}/json", allow=(404,))
+
+    def images(self, label: str) -> list[dict]:
+        """Local images carrying label (including ones that inherit it from a base)."""
+        return self.call("GET", "/images/json",
+                         params={"filters": json.dumps({"label": [label]})})
+
+    def image_tags(self, repo: str) -> list[str]:
+        """All local tags of repo (name:tag)."""
+        images = self.call("GET", "/images/json",
+                           params={"filters": json.dumps({"reference": [repo]})})
+        return [t for i in images for t in (i.get("RepoTags") or [])
+                if t.rsplit(":", 1)[0] == repo]
+
+    def remove_image(self, name: str) -> bool:
+        return self.call("DELETE", f"/images/{urllib.parse.quote(name, safe='/:@')}",
+                         allow=(404, 409)) is not None
+
+    def remove_volume(self, name: str) -> bool:
+        """Remove a volume; False if it is missing or in use."""
+        return self.call("DELETE", f"/volumes/{name}", allow=(404, 409)) is not None
+
+    def prune_volumes(self, label: str) -> list[str]:
+        """Remove all unused volumes carrying label in one call. Returns the removed names."""
+        filters = {"label": [label]}
+        if self.version() >= (1, 42):
+            # Since 1.42, prune only removes anonymous volumes by default
+            filters["all"] = ["true"]
+        r = self.call("POST", "/volumes/prune", params={"filters": json.dumps(filters)})
+        return r.get("VolumesDeleted") or []
+
+
+def error_message(data: bytes) -> str:
+    try:
+        return json.loads(data).get("message", "").strip()
+    except (ValueError, AttributeError):
+        return data.decode(errors="replace").strip()
+
+
+_api: DockerAPI | None = None
+
+
+def api() -> DockerAPI:
+    """Engine API client shared by the whole process."""
+    global _api
+    if _api is None:
+        _api = DockerAPI()
+    return _api
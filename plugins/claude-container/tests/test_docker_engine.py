@@ -0,0 +1,246 @@
+"""DockerAPI against canned Engine API responses on a temporary unix socket."""
+
+import hashlib
+import json
+import os
+import socketserver
+import struct
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+import pytest
+
+import docker_engine
+from docker_engine import DockerAPI, DockerError, demux
+
+SCRIPTS = Path(__file__).parent.parent / "scripts"
+BROWSER_SCRIPTS = Path(__file__).parent.parent.parent / "agent-browser-container" / "scripts"
+
+
+def frame(stream: int, data: bytes) -> bytes:
+    return struct.pack(">BxxxI", stream, len(data)) + data
+
+
+class FakeEngine(BaseHTTPRequestHandler):
+    """Canned daemon: one container "web", and an exec that echoes its stdin."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status: int, body=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def route(self):
+        state = self.server.state
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        state["requests"].append((self.command, self.path, body))
+        path = self.path.split("?")[0]
+
+        if path == "/containers/create":
+            if "web" in state["containers"]:
+                return self.reply(409, {"message": 'Conflict. The container name "/web" is already in use'})
+            state["containers"]["web"] = {"Config": json.loads(body), "State": {"Running": False}}
+            return self.reply(201, {"Id": "abc123", "Warnings": []})
+        if path == "/containers/web/start":
+            state["containers"]["web"]["State"]["Running"] = True
+            return self.reply(204)
+        if path == "/containers/web/json" and "web" in state["containers"]:
+            return self.reply(200, state["containers"]["web"])
+        if path == "/containers/web/exec":
+            return self.reply(201, {"Id": "e1"})
+        if path == "/exec/e1/start":
+            self.wfile.write(b"HTTP/1.1 101 UPGRADED\r\nContent-Type: application/vnd.docker.raw-stream\r\n"
+                             b"Connection: Upgrade\r\nUpgrade: tcp\r\n\r\n")
+            self.wfile.flush()
+            stdin = b""
+            while chunk := self.rfile.read1(65536):
+                stdin += chunk
+            self.wfile.write(frame(1, b"out:") + frame(2, b"warning\n") + frame(1, stdin))
+            self.close_connection = True
+            return
+        if path == "/exec/e1/json":
+            return self.reply(200, {"ExitCode": 3})
+        self.reply(404, {"message": f"No such container: {path.split('/')[2]}"})
+
+    do_GET = do_POST = do_DELETE = do_PUT = route
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def engine(tmp_path):
+    sock = str(tmp_path / "docker.sock")
+    server = Server(sock, FakeEngine)
+    server.state = {"containers": {}, "requests": []}
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield DockerAPI(sock), server.state
+    server.shutdown()
+    server.server_close()
+
+
+def test_create_start_inspect(engine):
+    client, state = engine
+    assert client.create_container("web", {"Image": "alpine", "Labels": {"x": "1"}}) == "abc123"
+    client.start_container("web")
+    c = client.inspect_container("web")
+    assert c["State"]["Running"] and c["Config"]["Labels"] == {"x": "1"}
+    method, path, body = state["requests"][0]
+    assert (method, path) == ("POST", "/containers/create?name=web")
+    assert json.loads(body)["Image"] == "alpine"
+
+
+def test_missing_container_is_none(engine):
+    client, _ = engine
+    assert client.inspect_container("nope") is None
+    assert client.remove_container("nope") is False
+
+
+def test_conflict_raises_docker_error(engine):
+    client, _ = engine
+    client.create_container("web", {"Image": "alpine"})
+    with pytest.raises(DockerError) as e:
+        client.create_container("web", {"Image": "alpine"})
+    assert e.value.status == 409
+    assert "already in use" in str(e.value)
+
+
+def test_exec_demuxes_stdout(engine):
+    client, _ = engine
+    client.create_container("web", {"Image": "alpine"})
+    assert client.exec("web", ["cat"], stdin=b"hello") == (3, b"out:hello")
+
+
+def test_requests_share_one_connection(engine):
+    client, _ = engine
+    client.inspect_container("web")
+    sock = client.conn.sock
+    client.inspect_container("web")
+    assert client.conn.sock is sock
+
+
+def test_unreachable_daemon(tmp_path):
+    with pytest.raises(DockerError) as e:
+        DockerAPI(str(tmp_path / "missing.sock")).inspect_container("web")
+    assert e.value.status is None
+
+
+def test_demux_splits_streams():
+    assert demux(frame(1, b"a") + frame(2, b"b") + frame(1, b"c")) == (b"ac", b"b")
+
+
+def test_browser_uses_the_same_client():
+    # The browser plugin links to this module instead of keeping a copy
+    assert (BROWSER_SCRIPTS / "docker_engine.py").resolve() == Path(docker_engine.__file__).resolve()
+
+
+# ─── Endpoint resolution ──────────────────────────────────
+
+@pytest.fixture
+def docker_env(tmp_path, monkeypatch):
+    """Empty DOCKER_CONFIG, no DOCKER_HOST/DOCKER_CONTEXT, no well-known sockets."""
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path / "docker-config"))
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+    monkeypatch.delenv("DOCKER_CONTEXT", raising=False)
+    monkeypatch.setattr(docker_engine, "DOCKER_SOCKETS", (str(tmp_path / "none.sock"),))
+    return tmp_path / "docker-config"
+
+
+def add_context(config_dir: Path, name: str, host: str, current: bool = True):
+    meta = config_dir / "contexts" / "meta" / hashlib.sha256(name.encode()).hexdigest()
+    meta.mkdir(parents=True)
+    (meta / "meta.json").write_text(json.dumps(
+        {"Name": name, "Metadata": {}, "Endpoints": {"docker": {"Host": host, "SkipTLSVerify": False}}}))
+    if current:
+        (config_dir / "config.json").write_text(json.dumps({"currentContext": name}))
+
+
+def test_context_socket(docker_env):
+    add_context(docker_env, "colima", "unix:///Users/me/.colima/default/docker.sock")
+    assert docker_engine.docker_socket_path() == "/Users/me/.colima/default/docker.sock"
+
+
+def test_docker_context_env_wins_over_config(docker_env, monkeypatch):
+    add_context(docker_env, "colima", "unix:///colima.sock")
+    add_context(docker_env, "orbstack", "unix:///orbstack.sock", current=False)
+    monkeypatch.setenv("DOCKER_CONTEXT", "orbstack")
+    assert docker_engine.docker_socket_path() == "/orbstack.sock"
+
+
+def test_docker_host_wins_over_context(docker_env, monkeypatch):
+    add_context(docker_env, "colima", "unix:///colima.sock")
+    monkeypatch.setenv("DOCKER_HOST", "unix:///host.sock")
+    assert docker_engine.docker_socket_path() == "/host.sock"
+
+
+@pytest.mark.parametrize("host", ["tcp://10.0.0.5:2376", "ssh://me@build-box"])
+def test_remote_endpoints_use_dial_stdio(docker_env, monkeypatch, host):
+    monkeypatch.setenv("DOCKER_HOST", host)
+    assert docker_engine.docker_socket_path() is None
+    assert DockerAPI().endpoint == "docker system dial-stdio"
+
+
+def test_remote_context_uses_dial_stdio(docker_env):
+    add_context(docker_env, "remote", "ssh://me@build-box")
+    assert docker_engine.docker_socket_path() is None
+
+
+def test_default_context_searches_well_known_sockets(docker_env, tmp_path, monkeypatch):
+    rootless = tmp_path / "run" / "docker.sock"
+    rootless.parent.mkdir()
+    rootless.touch()
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    monkeypatch.setattr(docker_engine, "DOCKER_SOCKETS",
+                        (str(tmp_path / "none.sock"), "$XDG_RUNTIME_DIR/docker.sock"))
+    assert docker_engine.docker_socket_path() == str(rootless)
+
+
+DIAL_STDIO_STUB = """
+import os, socket, sys, threading
+s = socket.socket(socket.AF_UNIX)
+s.connect(os.environ["FAKE_ENGINE_SOCK"])
+def pump():
+    while data := os.read(0, 65536):
+        s.sendall(data)
+    s.shutdown(socket.SHUT_WR)
+threading.Thread(target=pump, daemon=True).start()
+while data := s.recv(65536):
+    os.write(1, data)
+"""
+
+
+def test_dial_stdio_transport(engine, tmp_path, monkeypatch):
+    """Without a unix socket, requests (and exec hijacks) go through `docker system dial-stdio`."""
+    client, state = engine
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    stub = bin_dir / "docker"
+    stub.write_text(f"#!{sys.executable}\n{DIAL_STDIO_STUB}")
+    stub.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_ENGINE_SOCK", client.sock_path)
+    monkeypatch.setattr(docker_engine, "docker_socket_path", lambda: None)
+
+    remote = DockerAPI()
+    assert remote.sock_path is None
+    assert remote.create_container("web", {"Image": "alpine"}) == "abc123"
+    assert remote.inspect_container("web")["Config"]["Image"] == "alpine"
+    assert remote.exec("web", ["cat"], stdin=b"via cli") == (3, b"out:via cli")
+
+
+def test_dial_stdio_without_cli(monkeypatch):
+    monkeypatch.setattr(docker_engine, "DIAL_STDIO", ("no-such-docker-binary",))
+    monkeypatch.setattr(docker_engine, "docker_socket_path", lambda: None)
+    with pytest.raises(DockerError, match="Cannot connect"):
+        DockerAPI().inspect_container("web")
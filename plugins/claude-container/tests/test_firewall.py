@@ -0,0 +1,89 @@
+"""init-firewall.sh run against stub iptables/dig: the IP cache must not widen the allowlist."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from test_managers import PLUGINS, load
+
+pytestmark = pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+
+STUBS = {
+    # iptables -L succeeds; the restore input is what would be applied
+    "iptables-legacy": "#!/bin/sh\nexit 0\n",
+    "iptables-legacy-restore": '#!/bin/sh\ncat > "$RULES"\n',
+    "dig": '#!/bin/sh\nfor a; do case $a in github.com) echo 140.82.112.3; echo "cname.example.";; '
+           "*.*) echo 104.18.0.1;; esac; done\n",
+}
+
+
+@pytest.fixture(params=["claude-container/scripts/claude.py",
+                        "agent-browser-container/scripts/browser.py"], ids=["claude", "browser"])
+def firewall(request, tmp_path):
+    script = tmp_path / "init-firewall.sh"
+    script.write_text(load(PLUGINS / request.param).FIREWALL_SH)
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, body in STUBS.items():
+        (bin_dir / name).write_text(body)
+        (bin_dir / name).chmod(0o755)
+    cache_dir = tmp_path / "cache"
+    rules = tmp_path / "rules"
+    env = {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}",
+           "RULES": str(rules), "FIREWALL_CACHE_DIR": str(cache_dir)}
+
+    def run():
+        r = subprocess.run(["bash", str(script)], env=env, capture_output=True, text=True)
+        assert r.returncode == 0, r.stdout + r.stderr
+        return r.stdout, [line.split()[-3] for line in rules.read_text().splitlines()
+                          if line.startswith("-A OUTPUT -d ")]
+
+    return run, cache_dir
+
+
+def cache_file(cache_dir):
+    (path,) = cache_dir.glob(".firewall-ips-*")
+    return path
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="the cache is only used when root owns it")
+def test_poisoned_cache_is_discarded(firewall):
+    run, cache_dir = firewall
+    out, ips = run()
+    assert "from dns" in out
+    assert sorted(ips) == ["104.18.0.1", "140.82.112.3"]
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+    out, _ = run()
+    assert "from cache" in out
+
+    for poison in ["0.0.0.0/0", "140.82.112.3\n0.0.0.0/0", "1.2.3.4 -j ACCEPT", "256.1.1.1", "01.2.3.4"]:
+        cache_file(cache_dir).write_text(poison + "\n")
+        out, ips = run()
+        assert "from dns" in out
+        assert sorted(ips) == ["104.18.0.1", "140.82.112.3"]
+        assert cache_file(cache_dir).read_text().split() == ["104.18.0.1", "140.82.112.3"]
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="chown needs root")
+def test_cache_dir_writable_by_node_is_ignored(firewall):
+    run, cache_dir = firewall
+    cache_dir.mkdir(mode=0o755)
+    os.chown(cache_dir, 1000, 1000)
+    (cache_dir / "planted").write_text("0.0.0.0/0\n")
+    out, ips = run()
+    assert "from dns" in out and "0.0.0.0/0" not in ips
+    assert not list(cache_dir.glob(".firewall-ips-*"))
+    assert cache_dir.stat().st_mode & 0o777 == 0o755  # left alone, not chmod'ed
+
+
+def test_cache_dir_symlink_is_ignored(firewall, tmp_path):
+    run, cache_dir = firewall
+    target = tmp_path / "elsewhere"
+    target.mkdir()
+    cache_dir.symlink_to(target)
+    out, ips = run()
+    assert "from dns" in out
+    assert not list(target.iterdir())
@@ -0,0 +1,144 @@
+"""Helpers shared in shape by claude.py and agent-browser-container's browser.py."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from docker_engine import DockerError
+
+PLUGINS = Path(__file__).parent.parent.parent
+
+
+def load(path: Path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=[("claude-container/scripts/claude.py", "CLAUDE_STOP_TIMEOUT"),
+                        ("agent-browser-container/scripts/browser.py", "BROWSER_STOP_TIMEOUT")],
+                ids=["claude", "browser"])
+def manager(request):
+    path, env = request.param
+    module = load(PLUGINS / path)
+    return module, env
+
+
+@pytest.mark.parametrize("value,expected", [("", None), ("0", 0), (" 30 ", 30)])
+def test_stop_timeout(manager, monkeypatch, value, expected):
+    module, env = manager
+    monkeypatch.setenv(env, value)
+    assert module.stop_timeout() == expected
+
+
+@pytest.mark.parametrize("value", ["10s", "-5", "1.5"])
+def test_invalid_stop_timeout_warns_once(manager, monkeypatch, capsys, value):
+    module, env = manager
+    monkeypatch.setenv(env, value)
+    assert module.stop_timeout() is None
+    assert module.stop_timeout() is None
+    assert capsys.readouterr().out.count(env) == 1
+
+
+def test_run_parallel_counts_connection_errors(manager, capsys):
+    module, _ = manager
+
+    def action(name):
+        if name == "reset":
+            raise ConnectionResetError("connection reset by peer")
+        if name == "conflict":
+            raise DockerError("conflict", 409)
+
+    assert module.run_parallel(["a", "reset", "b", "conflict"], action, "stopped") == 2
+    out, errout = capsys.readouterr()
+    assert "stopped: a" in out and "stopped: b" in out
+    assert "reset" in errout and "conflict" in errout
+
+
+@pytest.mark.parametrize("value,expected", [(None, 0), ("", 0), ("3", 3), ("two", 0), ("-1", 0)])
+def test_pool_is_opt_in(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("CLAUDE_POOL_SIZE", raising=False)
+    else:
+        monkeypatch.setenv("CLAUDE_POOL_SIZE", value)
+    claude = load(PLUGINS / "claude-container/scripts/claude.py")
+    assert claude.pool_size() == expected
+
+
+def test_run_does_not_start_the_pool_by_default(monkeypatch):
+    monkeypatch.delenv("CLAUDE_POOL_SIZE", raising=False)
+    claude = load(PLUGINS / "claude-container/scripts/claude.py")
+    monkeypatch.setattr(claude.subprocess, "Popen", lambda *a, **kw: pytest.fail("pool refill started"))
+    claude.refill_in_background()
+
+
+# ─── Shared base image ────────────────────────────────────
+
+def test_base_is_one_file(manager):
+    module, _ = manager
+    path = Path(module.__file__).parent / "base.Dockerfile"
+    assert path.resolve() == (PLUGINS / "claude-container/scripts/base.Dockerfile").resolve()
+    assert module.BASE_DOCKERFILE == path.read_text()
+
+
+def test_generated_dockerfile_is_self_contained(manager):
+    """devcontainer builds must not need the locally built claude-code-base tag."""
+    module, _ = manager
+    dockerfile = module.DOCKERFILE
+    assert module.BASE_STAGE in dockerfile
+    instructions = [line for line in dockerfile.splitlines() if line and not line.startswith("#")]
+    assert instructions[0] == "ARG BASE=shared-base"
+    assert "FROM node:24-bookworm-slim AS shared-base" in instructions
+    assert not any(line.startswith(f"FROM {module.BASE_IMAGE}") for line in instructions)
+    assert module.base_args(dockerfile) == ["--build-arg", f"BASE={module.BASE_REF}"]
+
+
+def test_edited_base_stage_builds_inline(manager):
+    module, _ = manager
+    edited = module.DOCKERFILE.replace("zsh fzf ripgrep", "zsh fzf ripgrep htop")
+    assert module.base_args(edited) is None
+
+
+class FakeImages:
+    def __init__(self, tags):
+        self.tags = set(tags)
+
+    def images(self, label):
+        return [{"RepoTags": [t]} for t in sorted(self.tags)]
+
+    def image_tags(self, repo):
+        return [t for t in sorted(self.tags) if t.rsplit(":", 1)[0] == repo]
+
+    def remove_image(self, name):
+        self.tags.discard(name)
+        return True
+
+    def containers(self, label, include_stopped=False):
+        return []
+
+
+@pytest.mark.parametrize("other,kept", [("agent-browser-sandbox:abc", True), (None, False)])
+def test_clean_keeps_base_for_the_other_tool(monkeypatch, other, kept):
+    claude = load(PLUGINS / "claude-container/scripts/claude.py")
+    monkeypatch.delenv("CLAUDE_IMAGE", raising=False)
+    engine = FakeImages([claude.BASE_REF, "claude-code-sandbox:123"] + ([other] if other else []))
+    monkeypatch.setattr(claude, "api", lambda: engine)
+    claude.cmd_clean()
+    assert "claude-code-sandbox:123" not in engine.tags
+    assert (claude.BASE_REF in engine.tags) is kept
+
+
+def test_run_parallel_with_nothing_to_do(manager, capsys):
+    module, _ = manager
+    assert module.run_parallel([], lambda name: pytest.fail(name), "built") == 0
+
+
+@pytest.mark.parametrize("value,expected", [("", 60.0), ("2.5", 2.5), ("0", 0.0),
+                                            ("abc", 60.0), ("-1", 60.0), ("nan", 60.0), ("inf", 60.0)])
+def test_browser_ready_timeout(monkeypatch, capsys, value, expected):
+    monkeypatch.setenv("BROWSER_READY_TIMEOUT", value)
+    browser = load(PLUGINS / "agent-browser-container/scripts/browser.py")
+    assert browser.ready_timeout() == expected
+    assert ("BROWSER_READY_TIMEOUT" in capsys.readouterr().out) is (value not in ("", "2.5", "0"))
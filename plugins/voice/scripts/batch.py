@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Batch transcription for voice-assistant plugin.
+
+Splits long recordings into chunks at silence points and transcribes the
+chunks in parallel. With whisper-cpp, each worker is a whisper process
+given an even share of the CPU cores (--threads), which keeps all cores
+busy without oversubscribing them. Chunks already in the transcript
+cache (e.g. when re-running a batch) are not transcribed again.
+
+Usage:
+    python transcribe.py --batch meeting.wav
+    python transcribe.py --batch a.wav b.wav c.wav
+
+Output:
+    Prints timestamped chunk transcripts (per file) to stdout and the
+    real-time factor (processing time / audio duration) to stderr
+"""
+
+import os
+import sys
+import time
+import wave
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from transcribe import encode_wav, get_transcript_cache, transcribe
+from vad import FRAME_MS, SAMPLE_WIDTH, frame_features
+
+
+@dataclass
+class Chunk:
+    file_index: int
+    start: float  # seconds
+    end: float
+    wav: bytes
+    text: str = ""
+
+
+def batch_settings(config: dict) -> dict:
+    """Return stt.batch settings merged over defaults, with workers and
+    per-worker threads resolved from the core count.
+
+    A workers value that is not a positive integer is reported and
+    treated as "auto".
+    """
+    settings = {
+        "chunk_seconds": 60,
+        "search_seconds": 10,
+        "workers": "auto",
+        "threads_per_worker": 4,
+    }
+    settings.update(config.get('stt', {}).get('batch', {}))
+
+    cores = os.cpu_count() or 1
+    workers = settings['workers']
+    if workers != "auto":
+        try:
+            workers = int(workers)
+        except (TypeError, ValueError):
+            workers = 0
+        if workers < 1:
+            print(f"Warning: stt.batch.workers must be a positive integer or \"auto\", "
+                  f"got {settings['workers']!r}; using auto", file=sys.stderr)
+            workers = "auto"
+    if workers == "auto":
+        workers = max(1, cores // settings['threads_per_worker'])
+    settings['workers'] = workers
+    # Split all cores evenly across workers
+    settings['threads'] = max(1, cores // settings['workers'])
+    return settings
+
+
+def split_at_silence(pcm: bytes, sample_rate: int, channels: int,
+                     chunk_seconds: float, search_seconds: float) -> list[tuple[int, int]]:
+    """
+    Choose cut points near every chunk_seconds, at the quietest frame in
+    the search_seconds before each target.
+
+    Returns:
+        (start, end) byte offsets into pcm, frame aligned
+    """
+    frame_len = sample_rate * FRAME_MS // 1000
+    frame_bytes = frame_len * SAMPLE_WIDTH * channels
+    rms, _ = frame_features(pcm, frame_len, channels)
+
+    chunk_frames = max(1, int(chunk_seconds * 1000 // FRAME_MS))
+    search_frames = max(1, int(search_seconds * 1000 // FRAME_MS))
+
+    cuts = [0]
+    while len(rms) - cuts[-1] > chunk_frames + search_frames:
+        target = cuts[-1] + chunk_frames
+        window = rms[target - search_frames:target]
+        cuts.append(target - search_frames + int(np.argmin(window)))
+
+    offsets = [cut * frame_bytes for cut in cuts] + [len(pcm)]
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def load_chunks(files: list[str], settings: dict) -> Iterator[Chunk]:
+    """Split files into chunks, decoding one file at a time as chunks are taken."""
+    for index, path in enumerate(files):
+        with wave.open(path, 'rb') as f:
+            if f.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{path}: only 16-bit WAV is supported")
+            sample_rate = f.getframerate()
+            channels = f.getnchannels()
+            pcm = f.readframes(f.getnframes())
+
+        bytes_per_second = sample_rate * channels * SAMPLE_WIDTH
+        spans = split_at_silence(pcm, sample_rate, channels,
+                                 settings['chunk_seconds'], settings['search_seconds'])
+        for start, end in spans:
+            yield Chunk(
+                index,
+                start / bytes_per_second,
+                end / bytes_per_second,
+                encode_wav(pcm[start:end], sample_rate, channels),
+            )
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+
+
+def transcribe_batch(files: list[str], provider: str | None, config: dict,
+                     settings: dict | None = None) -> tuple[list[Chunk], float]:
+    """
+    Transcribe many files (or one long file) in parallel chunks.
+
+    Only a couple of chunks per worker are decoded ahead of the workers,
+    and a chunk's audio is dropped once it is transcribed, so memory does
+    not grow with the length of the batch.
+
+    Args:
+        files: WAV file paths
+        provider: STT provider override
+        config: Configuration dict
+        settings: batch_settings(config), if already resolved
+
+    Returns:
+        (chunks in file/time order with text filled in, total audio seconds)
+    """
+    if settings is None:
+        settings = batch_settings(config)
+
+    def run(chunk: Chunk) -> str:
+        return transcribe(chunk.wav, provider, config, threads=settings['threads'])
+
+    def finish(chunk: Chunk, future) -> None:
+        chunk.text = future.result().strip()
+        chunk.wav = b""
+
+    chunks = []
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=settings['workers']) as pool:
+        for chunk in load_chunks(files, settings):
+            if len(pending) >= 2 * settings['workers']:
+                finish(*pending.popleft())
+            chunks.append(chunk)
+            pending.append((chunk, pool.submit(run, chunk)))
+        while pending:
+            finish(*pending.popleft())
+    total = sum(chunk.end - chunk.start for chunk in chunks)
+    return chunks, total
+
+
+def run_batch(files: list[str], provider: str | None, config: dict) -> None:
+    """Transcribe files and print timestamped results plus the real-time factor."""
+    settings = batch_settings(config)
+    started = time.monotonic()
+    chunks, total = transcribe_batch(files, provider, config, settings)
+    elapsed = time.monotonic() - started
+
+    for index, path in enumerate(files):
+        if len(files) > 1:
+            print(f"# {path}")
+        for chunk in chunks:
+            if chunk.file_index == index and chunk.text:
+                print(f"[{format_timestamp(chunk.start)} --> {format_timestamp(chunk.end)}] {chunk.text}")
+        if len(files) > 1:
+            print()
+
+    rtf = elapsed / total if total else 0.0
+    cache = get_transcript_cache(config)
+    cached = f", {cache.hits} cached" if cache is not None and cache.hits else ""
+    print(f"Transcribed {total:.1f}s of audio in {elapsed:.1f}s "
+          f"({len(chunks)} chunk(s){cached}, {settings['workers']} worker(s) x {settings['threads']} thread(s)): "
+          f"RTF {rtf:.3f} ({1 / rtf if rtf else 0:.1f}x real time)", file=sys.stderr)
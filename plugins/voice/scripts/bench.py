@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark for voice-assistant plugin.
+
+Runs the real scripts against stand-in tools, so the pipeline can be
+measured without a microphone, whisper model, macOS or network:
+- rec / sox: stream speech-like PCM, then silence, in real time
+- whisper: waits --whisper-delay, then prints a fixed transcript
+- say: logs when playback starts, then "speaks" for --say-delay
+- claude_agent_sdk: query() streams a summary after --sdk-delay
+
+Stages:
+- ask: record.py --output - | transcribe.py - (speech + VAD stop + STT)
+- transcribe: transcribe.py on a saved WAV
+- hook_disabled: speak.py with tts.enabled false
+- hook_imports: import time of the disabled hook (-X importtime)
+- hook: speak.py summarizing and speaking a long response
+- first_audio: hook start until the first say call
+
+Usage:
+    python bench.py [--runs 5] [--speech 2.0] [--whisper-delay 0.8]
+                    [--sdk-delay 0.5] [--say-delay 0.5]
+                    [--budget 30] [--import-budget-ms 75]
+
+Output:
+    Prints p50/p95/p99 per stage and the hook's own phase telemetry.
+    Exits 1 if the hook p95 exceeds --budget seconds (the hook timeout)
+    or the disabled hook's imports exceed --import-budget-ms.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from config_loader import get_default_config
+from telemetry import percentile, phase_stats, read_records
+
+SCRIPTS_DIR = Path(__file__).parent
+
+# Import budget of the disabled hook (also enforced by tests/test_import_time.py)
+IMPORT_BUDGET_MS = 75.0
+
+STAGES = ("ask", "transcribe", "hook_disabled", "hook_imports", "hook", "first_audio")
+
+REC_STUB = '''
+import array, math, os, sys, time
+args = sys.argv[1:]
+rate = int(args[args.index("-r") + 1]) if "-r" in args else 16000
+frame = rate * 30 // 1000
+tone = array.array("h", (int(8000 * math.sin(2 * math.pi * 220 * i / rate)) for i in range(frame))).tobytes()
+silence = bytes(2 * frame)
+speech_frames = int(float(os.environ["BENCH_SPEECH"]) * 1000 / 30)
+out = sys.stdout.buffer
+start = time.monotonic()
+try:
+    for n in range(2000):
+        out.write(tone if n < speech_frames else silence)
+        out.flush()
+        time.sleep(max(0.0, start + (n + 1) * 0.03 - time.monotonic()))
+except (BrokenPipeError, KeyboardInterrupt):
+    pass
+'''
+
+SOX_STUB = '''
+import sys
+print("sox: SoX v14.4.2 (benchmark stand-in)")
+'''
+
+WHISPER_STUB = '''
+import os, sys, time
+if "-" in sys.argv:
+    sys.stdin.buffer.read()
+time.sleep(float(os.environ["BENCH_WHISPER_DELAY"]))
+print("배포 스크립트를 실행해줘 and show the logs")
+'''
+
+SAY_STUB = '''
+import os, sys, time
+with open(os.environ["BENCH_AUDIO_LOG"], "a") as f:
+    f.write(f"{time.time()}\\n")
+time.sleep(float(os.environ["BENCH_SAY_DELAY"]))
+'''
+
+SDK_INIT = '''
+import asyncio, os
+from dataclasses import dataclass, field
+from .types import StreamEvent
+
+@dataclass
+class TextBlock:
+    text: str
+
+@dataclass
+class AssistantMessage:
+    content: list
+
+@dataclass
+class ClaudeAgentOptions:
+    model: str = None
+    system_prompt: str = None
+    allowed_tools: list = field(default_factory=list)
+    max_turns: int = None
+    include_partial_messages: bool = False
+
+SUMMARY = ["빌드와 ", "테스트를 ", "모두 마쳤습니다. ", "Next, ", "review the ", "deploy plan."]
+
+async def query(prompt, options):
+    await asyncio.sleep(float(os.environ["BENCH_SDK_DELAY"]))
+    for text in SUMMARY:
+        await asyncio.sleep(0.03)
+        yield StreamEvent(event={"type": "content_block_delta",
+                                 "delta": {"type": "text_delta", "text": text}})
+    yield AssistantMessage(content=[TextBlock("".join(SUMMARY))])
+'''
+
+SDK_TYPES = '''
+from dataclasses import dataclass
+
+@dataclass
+class StreamEvent:
+    event: dict
+'''
+
+
+def write_stub(path: Path, source: str) -> None:
+    path.write_text(f"#!{sys.executable}\n{source.lstrip()}")
+    path.chmod(0o755)
+
+
+def make_sandbox(root: Path, args: argparse.Namespace) -> tuple[dict, Path, Path]:
+    """Create stand-in tools, a fake SDK, a transcript and configs under root.
+
+    Returns:
+        (environment, enabled config path, disabled config path)
+    """
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    write_stub(bin_dir / "rec", REC_STUB)
+    write_stub(bin_dir / "sox", SOX_STUB)
+    write_stub(bin_dir / "whisper", WHISPER_STUB)
+    write_stub(bin_dir / "say", SAY_STUB)
+
+    sdk_dir = root / "sdk" / "claude_agent_sdk"
+    sdk_dir.mkdir(parents=True)
+    (sdk_dir / "__init__.py").write_text(SDK_INIT.lstrip())
+    (sdk_dir / "types.py").write_text(SDK_TYPES.lstrip())
+
+    # Long mixed-language response, so the hook takes the summary path
+    sentences = [f"Step {i} of the build finished and the test suite passed." for i in range(8)]
+    sentences += ["배포 전에 변경 사항을 검토해 주세요."] * 3
+    transcript = root / "home" / ".claude" / "projects" / "bench" / "session.jsonl"
+    transcript.parent.mkdir(parents=True)
+    transcript.write_text(json.dumps({"message": {
+        "role": "assistant",
+        "content": [{"type": "text", "text": " ".join(sentences)}],
+    }}) + "\n")
+
+    model = root / "ggml-bench.bin"
+    model.write_bytes(b"\0")
+
+    config = get_default_config()
+    config['stt'].update({
+        "provider": "whisper-cpp",
+        "whisper_model": str(model),
+    })
+    config['stt']['routing']['enabled'] = False
+    config['stt']['cache']['enabled'] = False
+    config['recording']['output_path'] = str(root / "voice_input.wav")
+    config['tts'].update({"enabled": True, "backend": "say", "player": "auto"})
+    config['tts']['cache']['enabled'] = False
+
+    enabled_config = root / "config.json"
+    enabled_config.write_text(json.dumps(config))
+    config['tts']['enabled'] = False
+    disabled_config = root / "config-disabled.json"
+    disabled_config.write_text(json.dumps(config))
+
+    env = {
+        **os.environ,
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "PYTHONPATH": str(root / "sdk"),
+        "HOME": str(root / "home"),
+        "VOICE_ASSISTANT_CONFIG": str(enabled_config),
+        "VOICE_ASSISTANT_LOG": str(root / "hook.log"),
+        "VOICE_ASSISTANT_TELEMETRY": str(root / "telemetry.jsonl"),
+        "BENCH_SPEECH": str(args.speech),
+        "BENCH_WHISPER_DELAY": str(args.whisper_delay),
+        "BENCH_SDK_DELAY": str(args.sdk_delay),
+        "BENCH_SAY_DELAY": str(args.say_delay),
+        "BENCH_AUDIO_LOG": str(root / "audio.log"),
+    }
+    return env, enabled_config, disabled_config
+
+
+def script(name: str) -> list[str]:
+    return [sys.executable, str(SCRIPTS_DIR / name)]
+
+
+def run_ask(env: dict) -> float:
+    """record.py --output - | transcribe.py -; returns seconds."""
+    start = time.monotonic()
+    record = subprocess.Popen(script("record.py") + ["--output", "-"], env=env,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    result = subprocess.run(script("transcribe.py") + ["-"], env=env, stdin=record.stdout,
+                            capture_output=True, text=True)
+    record.stdout.close()
+    record.wait()
+    elapsed = time.monotonic() - start
+    if result.returncode != 0 or not result.stdout.strip():
+        raise RuntimeError(f"ask pipeline failed: {result.stderr.strip()}")
+    return elapsed
+
+
+def run_timed(cmd: list[str], env: dict, stdin: str = "") -> float:
+    start = time.monotonic()
+    result = subprocess.run(cmd, env=env, input=stdin, capture_output=True, text=True)
+    elapsed = time.monotonic() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{Path(cmd[1]).name} failed: {result.stderr.strip()}")
+    return elapsed
+
+
+def top_level_imports(cmd: list[str], env: dict, stdin: str = "") -> dict[str, int]:
+    """Cumulative import time (us) of each top-level import, from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *cmd],
+                            env=env, input=stdin, capture_output=True, text=True)
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are already inside their parent's cumulative time
+        if not name.startswith("  "):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def hook_import_ms(env: dict) -> float:
+    """Import time of the disabled hook, excluding interpreter startup."""
+    startup = top_level_imports(["-c", "pass"], env)
+    hook = top_level_imports([str(SCRIPTS_DIR / "speak.py")], env, '{"hook_event_name": "Benchmark"}')
+    return sum(us for name, us in hook.items() if name not in startup) / 1000
+
+
+def run_hook(env: dict, audio_log: Path) -> tuple[float, float | None]:
+    """Run the enabled hook; returns (seconds, seconds to first say call)."""
+    audio_log.unlink(missing_ok=True)
+    wall_start = time.time()
+    elapsed = run_timed(script("speak.py"), env, '{"hook_event_name": "Benchmark"}')
+    try:
+        first = float(audio_log.read_text().split()[0])
+    except (OSError, IndexError, ValueError):
+        return elapsed, None
+    return elapsed, first - wall_start
+
+
+def benchmark(args: argparse.Namespace) -> tuple[dict[str, list[float]], list[dict]]:
+    """Run every stage args.runs times; returns milliseconds per stage and
+    the hook's telemetry records from the sandbox."""
+    results: dict[str, list[float]] = {stage: [] for stage in STAGES}
+
+    with tempfile.TemporaryDirectory(prefix="voice-bench-") as tmp:
+        root = Path(tmp)
+        env, _, disabled_config = make_sandbox(root, args)
+        disabled_env = {**env, "VOICE_ASSISTANT_CONFIG": str(disabled_config)}
+        wav = root / "voice_input.wav"
+
+        # One saved recording for the transcribe-only stage
+        run_timed(script("record.py") + ["--output", str(wav)], env)
+
+        for i in range(args.runs):
+            results["ask"].append(run_ask(env) * 1000)
+            results["transcribe"].append(run_timed(script("transcribe.py") + [str(wav)], env) * 1000)
+            results["hook_disabled"].append(
+                run_timed(script("speak.py"), disabled_env, '{"hook_event_name": "Benchmark"}') * 1000)
+            results["hook_imports"].append(hook_import_ms(disabled_env))
+            hook_s, first_audio_s = run_hook(env, root / "audio.log")
+            results["hook"].append(hook_s * 1000)
+            if first_audio_s is not None:
+                results["first_audio"].append(first_audio_s * 1000)
+            print(f"run {i + 1}/{args.runs} done", file=sys.stderr)
+
+        records = [r for r in read_records(0, Path(env["VOICE_ASSISTANT_TELEMETRY"]))
+                   if r.get("event") == "Benchmark"]
+    return results, records
+
+
+def print_results(results: dict[str, list[float]]) -> None:
+    print(f"{'stage':<18} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, values in results.items():
+        if not values:
+            continue
+        vals = sorted(values)
+        print(f"{stage:<18} {len(vals):>6} {percentile(vals, 50):>9.1f} "
+              f"{percentile(vals, 95):>9.1f} {percentile(vals, 99):>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voice pipeline latency benchmark")
+    parser.add_argument('--runs', '-n', type=int, default=5, help='Runs per stage (default: 5)')
+    parser.add_argument('--speech', type=float, default=2.0,
+                        help='Seconds of speech the fake rec produces (default: 2.0)')
+    parser.add_argument('--whisper-delay', type=float, default=0.8,
+                        help='Fake whisper processing time in seconds (default: 0.8)')
+    parser.add_argument('--sdk-delay', type=float, default=0.5,
+                        help='Fake Haiku time to first token in seconds (default: 0.5)')
+    parser.add_argument('--say-delay', type=float, default=0.5,
+                        help='Fake playback time per sentence in seconds (default: 0.5)')
+    parser.add_argument('--budget', type=float, default=30.0,
+                        help='Fail if hook p95 exceeds this many seconds (default: 30, the hook timeout)')
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help=f'Fail if disabled-hook imports p95 exceed this (default: {IMPORT_BUDGET_MS:.0f})')
+
+    args = parser.parse_args()
+
+    try:
+        results, records = benchmark(args)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_results(results)
+
+    # The hook writes its own per-phase telemetry; show the benchmark events
+    if records:
+        print()
+        print("hook phases (telemetry)")
+        for name, s in phase_stats(records).items():
+            print(f"{name:<18} {s['count']:>6} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f}")
+
+    failures = []
+    hook_p95 = percentile(sorted(results["hook"]), 95) / 1000
+    if hook_p95 > args.budget:
+        failures.append(f"hook p95 {hook_p95:.1f}s exceeds {args.budget:.1f}s budget")
+    imports_p95 = percentile(sorted(results["hook_imports"]), 95)
+    if imports_p95 > args.import_budget_ms:
+        failures.append(f"disabled-hook imports p95 {imports_p95:.1f} ms exceed "
+                        f"{args.import_budget_ms:.1f} ms budget")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL: {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
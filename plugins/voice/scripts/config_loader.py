@@ -13,8 +13,13 @@ def get_plugin_dir() -> Path:
 
 
 def load_config() -> dict[str, Any]:
-    """Load configuration from config.json."""
-    config_path = get_plugin_dir() / "config.json"
+    """Load configuration from config.json.
+
+    VOICE_ASSISTANT_CONFIG may point to another config file (used by
+    bench.py to run the scripts against stand-in tools).
+    """
+    override = os.environ.get("VOICE_ASSISTANT_CONFIG")
+    config_path = Path(override) if override else get_plugin_dir() / "config.json"
 
     if not config_path.exists():
         return get_default_config()
@@ -29,20 +34,78 @@ def get_default_config() -> dict[str, Any]:
         "stt": {
             "provider": "whisper-cpp",
             "whisper_model": "~/.whisper/ggml-large-v3-turbo.bin",
-            "openai_model": "whisper-1"
+            "openai_model": "whisper-1",
+            "parallel_segments": 2,
+            "openai": {
+                "upload_format": "flac",
+                "base_url": None,
+                "timeout": 30,
+                "max_retries": 3
+            },
+            "server": {
+                "binary": "whisper-server",
+                "host": "127.0.0.1",
+                "port": 8178,
+                "threads": 4,
+                "auto_start": True
+            },
+            "routing": {
+                "enabled": True,
+                "short_model": "~/.whisper/ggml-base.bin",
+                "short_max_seconds": 5.0,
+                "min_confidence": 0.5,
+                "short_port": 8179
+            },
+            "cache": {
+                "enabled": True,
+                "dir": "~/.cache/voice-assistant/stt",
+                "max_entries": 2000,
+                "memory_entries": 256
+            },
+            "batch": {
+                "chunk_seconds": 60,
+                "search_seconds": 10,
+                "workers": "auto",
+                "threads_per_worker": 4
+            }
         },
         "tts": {
             "enabled": True,
             "mode": "summary",
+            "streaming": True,
+            "summarizer": "haiku",
+            "summary_deadline": 8.0,
             "voice_ko": "Yuna",
             "voice_en": "Samantha",
-            "rate": 190
+            "rate": 190,
+            "split_languages": True,
+            "backend": "auto",
+            "player": "auto",
+            "backends": {
+                "espeak-ng": {"voice_ko": "ko", "voice_en": "en-us"},
+                "piper": {"voice_en": "~/.piper/en_US-lessac-medium.onnx"}
+            },
+            "cache": {
+                "enabled": True,
+                "dir": "~/.cache/voice-assistant/tts",
+                "max_mb": 50,
+                "max_text_chars": 80
+            }
         },
         "recording": {
             "sample_rate": 16000,
             "channels": 1,
             "max_duration": 30,
-            "output_path": "/tmp/voice_input.wav"
+            "output_path": "/tmp/voice_input.wav",
+            "streaming": False,
+            "vad": True,
+            "silence_threshold": 500,
+            "zcr_threshold": 0.25,
+            "trailing_silence_ms": 1200,
+            "trim_padding_ms": 150,
+            "segment_pause_ms": 300,
+            "min_segment_ms": 1000,
+            "max_segment_ms": 10000
         }
     }
 
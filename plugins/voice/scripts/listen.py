@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Streaming record + transcribe for voice-assistant plugin.
+
+Reads raw PCM from sox while the user speaks, cuts it into segments at
+short pauses and transcribes each segment concurrently, so the final
+transcript is ready moments after the user stops talking. Recording stops
+on its own after the VAD trailing-silence window.
+
+Usage:
+    python listen.py [--duration SECONDS] [--provider PROVIDER]
+
+Output:
+    Prints transcribed text to stdout
+    (the full recording is also saved to the configured output path)
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from config_loader import expand_path, load_config
+from record import check_sox_installed
+from transcribe import encode_wav, get_transcript_cache, transcribe
+from vad import FRAME_MS, EnergyVAD
+
+
+class PauseSegmenter:
+    """Cut a 16-bit mono PCM stream into segments at short pauses.
+
+    A segment is emitted once it is at least min_segment_ms long and has
+    been followed by pause_ms of silence, or when it reaches
+    max_segment_ms. Segments without any speech are dropped.
+    """
+
+    def __init__(self, pause_ms: int = 300, min_segment_ms: int = 1000,
+                 max_segment_ms: int = 10000) -> None:
+        self.pause_frames = max(1, pause_ms // FRAME_MS)
+        self.min_frames = min_segment_ms // FRAME_MS
+        self.max_frames = max_segment_ms // FRAME_MS
+        self._frames: list[bytes] = []
+        self._silent_run = 0
+        self._has_speech = False
+
+    def feed(self, frame: bytes, speech: bool) -> bytes | None:
+        """Add one frame classified by the VAD; returns a completed segment
+        if this frame ended one."""
+        self._frames.append(frame)
+        if speech:
+            self._has_speech = True
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+
+        n = len(self._frames)
+        paused = self._silent_run >= self.pause_frames and n >= self.min_frames
+        if paused or n >= self.max_frames:
+            return self.flush()
+        return None
+
+    def flush(self) -> bytes | None:
+        """Return the pending segment (if it contains speech) and reset."""
+        segment = b"".join(self._frames) if self._has_speech else None
+        self._frames = []
+        self._silent_run = 0
+        self._has_speech = False
+        return segment
+
+
+def transcribe_segment(pcm: bytes, sample_rate: int, provider: str | None,
+                       config: dict) -> str:
+    """Transcribe one PCM segment, passed to the backend in memory."""
+    return transcribe(encode_wav(pcm, sample_rate), provider, config)
+
+
+def listen(config: dict, duration: int, provider: str | None = None) -> str:
+    """
+    Record from the microphone and transcribe segments while recording.
+
+    Args:
+        config: Configuration dict
+        duration: Maximum recording duration in seconds
+        provider: STT provider override
+
+    Returns:
+        Transcribed text, segments joined in order
+    """
+    recording_config = config.get('recording', {})
+    sample_rate = recording_config.get('sample_rate', 16000)
+    # Segments are mono; the channels setting only applies to record.py
+    vad = EnergyVAD.from_config({**recording_config, 'channels': 1})
+    segmenter = PauseSegmenter(
+        pause_ms=recording_config.get('segment_pause_ms', 300),
+        min_segment_ms=recording_config.get('min_segment_ms', 1000),
+        max_segment_ms=recording_config.get('max_segment_ms', 10000),
+    )
+    workers = config.get('stt', {}).get('parallel_segments', 2)
+
+    # rec -q -t raw -r 16000 -c 1 -b 16 -e signed-integer - trim 0 30
+    cmd = [
+        'rec', '-q',
+        '-t', 'raw',
+        '-r', str(sample_rate),
+        '-c', '1',
+        '-b', '16',
+        '-e', 'signed-integer',
+        '-',
+        'trim', '0', str(duration)
+    ]
+
+    recorded = bytearray()
+    futures: list[Future] = []
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit(segment: bytes | None) -> None:
+            if segment:
+                futures.append(pool.submit(
+                    transcribe_segment, segment, sample_rate, provider, config))
+
+        try:
+            while frame := proc.stdout.read(vad.frame_bytes):
+                recorded.extend(frame)
+                stop = vad.update(frame)
+                submit(segmenter.feed(frame, vad.last_speech))
+                if stop and recording_config.get('vad', True):
+                    print("Silence detected, recording stopped.", file=sys.stderr)
+                    break
+        except KeyboardInterrupt:
+            print("\nRecording stopped by user.", file=sys.stderr)
+        finally:
+            proc.terminate()
+            proc.wait()
+        stopped = time.monotonic()
+        submit(segmenter.flush())
+
+        texts = [f.result() for f in futures]
+
+    cache = get_transcript_cache(config)
+    cached = f", {cache.hits} cached" if cache is not None and cache.hits else ""
+    print(f"Transcript ready {(time.monotonic() - stopped) * 1000:.0f} ms after recording stopped "
+          f"({len(futures)} segment(s){cached})", file=sys.stderr)
+
+    # Keep the full recording for debugging/re-transcription (off the hot path)
+    output_path = expand_path(recording_config.get('output_path', '/tmp/voice_input.wav'))
+    Path(output_path).write_bytes(encode_wav(bytes(recorded), sample_rate))
+
+    return " ".join(t.strip() for t in texts if t.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and transcribe concurrently")
+    parser.add_argument(
+        '--duration', '-d',
+        type=int,
+        help='Maximum recording duration in seconds'
+    )
+    parser.add_argument(
+        '--provider', '-p',
+        choices=['whisper-cpp', 'whisper-server', 'openai'],
+        help='STT provider (default: from config)'
+    )
+
+    args = parser.parse_args()
+
+    if not check_sox_installed():
+        print("Error: sox is not installed. Please run: brew install sox", file=sys.stderr)
+        sys.exit(1)
+
+    # Load config
+    config = load_config()
+    duration = args.duration or config.get('recording', {}).get('max_duration', 30)
+
+    print(f"Recording... Press Ctrl+C to stop (max {duration}s)", file=sys.stderr)
+    print("Speak now!", file=sys.stderr)
+
+    try:
+        text = listen(config, duration, args.provider)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,23 @@
 """
 Recording script for voice-assistant plugin.
 
-Uses sox to record audio from microphone.
+Uses sox to record audio from microphone. With voice activity detection
+(recording.vad), recording stops automatically after a trailing-silence
+window and leading/trailing silence is trimmed from the saved audio.
 
 Usage:
-    python record.py [--duration SECONDS]
+    python record.py [--duration SECONDS] [--no-vad]
+    python record.py --output - | python transcribe.py -   # in-memory, no temp files
 
 Output:
-    Writes WAV file to configured path (default: /tmp/voice_input.wav)
+    Writes WAV file to configured path (default: /tmp/voice_input.wav),
+    or to stdout with --output -
 """
 
 import argparse
 import subprocess
 import sys
+import wave
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -89,6 +94,87 @@ def record_audio(output_path: str, duration: int, sample_rate: int = 16000, chan
         return False
 
 
+def record_stream(output_path: str, duration: int, vad=None, sample_rate: int = 16000,
+                  channels: int = 1) -> bool:
+    """
+    Record raw PCM from sox's stdout and write it as WAV.
+
+    With a VAD, recording stops after trailing silence and silence is
+    trimmed. An output_path of "-" writes the WAV to stdout (status
+    messages go to stderr) so it can be piped into transcribe.py.
+
+    Args:
+        output_path: Path to save the WAV file, or "-" for stdout
+        duration: Maximum recording duration in seconds
+        vad: EnergyVAD instance, or None to record until Ctrl+C/max duration
+        sample_rate: Sample rate in Hz
+        channels: Number of channels
+
+    Returns:
+        True if recording was successful, False otherwise
+    """
+    if not check_sox_installed():
+        print("Error: sox is not installed. Please run: brew install sox", file=sys.stderr)
+        return False
+
+    # rec -q -t raw -r 16000 -c 1 -b 16 -e signed-integer - trim 0 30
+    cmd = [
+        'rec', '-q',
+        '-t', 'raw',
+        '-r', str(sample_rate),
+        '-c', str(channels),
+        '-b', '16',
+        '-e', 'signed-integer',
+        '-',
+        'trim', '0', str(duration)
+    ]
+
+    to_stdout = output_path == '-'
+    status = sys.stderr if to_stdout else sys.stdout
+
+    if vad is not None:
+        print(f"Recording... stops after a pause, or press Ctrl+C (max {duration}s)", file=status)
+    else:
+        print(f"Recording... Press Ctrl+C to stop (max {duration}s)", file=status)
+    print("Speak now!", file=status)
+
+    pcm = bytearray()
+    chunk_bytes = vad.frame_bytes if vad is not None else 4096
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while frame := proc.stdout.read(chunk_bytes):
+            pcm.extend(frame)
+            if vad is not None and vad.update(frame):
+                print("\nSilence detected, recording stopped.", file=status)
+                break
+    except KeyboardInterrupt:
+        print("\nRecording stopped by user.", file=status)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    if not pcm:
+        print("Recording failed: no audio captured", file=sys.stderr)
+        return False
+
+    audio = bytes(pcm)
+    if vad is not None:
+        if vad.heard_speech:
+            audio = vad.trim(audio)
+        else:
+            print("Warning: no speech detected (check recording.silence_threshold)", file=sys.stderr)
+
+    with wave.open(sys.stdout.buffer if to_stdout else output_path, 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(audio)
+
+    seconds = len(audio) / (sample_rate * channels * 2)
+    print(f"Recording saved to: {'stdout' if to_stdout else output_path} ({seconds:.1f}s)", file=status)
+    return True
+
+
 def main():
     parser = argparse.ArgumentParser(description="Record audio for voice input")
     parser.add_argument(
@@ -99,7 +185,12 @@ def main():
     parser.add_argument(
         '--output', '-o',
         type=str,
-        help='Output file path'
+        help='Output file path, or - to write WAV to stdout'
+    )
+    parser.add_argument(
+        '--no-vad',
+        action='store_true',
+        help='Disable silence auto-stop (record until Ctrl+C or max duration)'
     )
 
     args = parser.parse_args()
@@ -111,15 +202,23 @@ def main():
     # Get parameters (CLI args override config)
     duration = args.duration or recording_config.get('max_duration', 30)
     output_path = args.output or recording_config.get('output_path', '/tmp/voice_input.wav')
-    output_path = expand_path(output_path)
+    if output_path != '-':
+        output_path = expand_path(output_path)
     sample_rate = recording_config.get('sample_rate', 16000)
     channels = recording_config.get('channels', 1)
 
     # Record
-    success = record_audio(output_path, duration, sample_rate, channels)
+    if recording_config.get('vad', True) and not args.no_vad:
+        from vad import EnergyVAD
+        vad = EnergyVAD.from_config(recording_config)
+        success = record_stream(output_path, duration, vad, sample_rate, channels)
+    elif output_path == '-':
+        success = record_stream(output_path, duration, None, sample_rate, channels)
+    else:
+        success = record_audio(output_path, duration, sample_rate, channels)
 
     # Print output path on success for piping to transcribe
-    if success:
+    if success and output_path != '-':
         print(output_path)
 
     sys.exit(0 if success else 1)
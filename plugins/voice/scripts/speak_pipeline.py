@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+TTS hook pipeline: Summarizes and speaks the last Claude response.
+
+Based on say-summary plugin from team-attention.
+
+- Extracts the last assistant message from transcript
+- Uses Claude Agent SDK (Haiku) to summarize in 20-30 words
+- Streams the summary and speaks each sentence as soon as it completes
+- Speaks via the configured TTS backend
+
+Imported by speak.py only once TTS is known to be enabled; the Agent SDK
+is imported only when a Haiku summary is actually requested.
+"""
+
+import asyncio
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator
+from contextlib import nullcontext
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from summarizer import SentenceSplitter, extractive_summary, split_sentences
+from telemetry import EventTimer, get_logger
+from tts import TTSEngine
+
+# Seconds Haiku may take before the local extractive summary is used instead
+DEFAULT_SUMMARY_DEADLINE = 8.0
+
+
+logger = get_logger()
+
+
+def log(message: str) -> None:
+    """Write message to the buffered hook log."""
+    logger.info(message)
+
+
+def get_latest_transcript() -> Path | None:
+    """Find the most recently modified transcript file across all projects.
+
+    Since hooks run from plugin cache directory (not project directory),
+    we search all project directories for the latest transcript.
+    """
+    projects_dir = Path.home() / ".claude" / "projects"
+    if not projects_dir.is_dir():
+        return None
+
+    # Find all transcript files across all projects
+    all_transcripts = list(projects_dir.glob("*/*.jsonl"))
+    if not all_transcripts:
+        return None
+
+    # Return the most recently modified one
+    return max(all_transcripts, key=lambda f: f.stat().st_mtime)
+
+
+def extract_last_assistant_message(transcript_path: Path) -> str | None:
+    """Extract last assistant message from transcript."""
+    try:
+        with open(transcript_path, "r") as f:
+            lines = f.readlines()
+
+        # Search in reverse order
+        for line in reversed(lines):
+            try:
+                data = json.loads(line)
+                message = data.get("message", {})
+
+                if message and message.get("role") == "assistant":
+                    content = message.get("content", [])
+
+                    # Extract text type items
+                    text_parts = [
+                        item.get("text", "")
+                        for item in content
+                        if isinstance(item, dict) and item.get("type") == "text"
+                    ]
+
+                    full_text = "".join(text_parts)
+                    if full_text:
+                        return full_text
+
+            except json.JSONDecodeError:
+                continue
+
+    except Exception as e:
+        log(f"Error reading transcript: {e}")
+
+    return None
+
+
+async def stream_summary_with_haiku(text: str) -> AsyncIterator[str]:
+    """Stream a 20-30 word summary from Claude Haiku as text deltas."""
+    # Imported here: the SDK is by far the slowest import of the hook
+    from claude_agent_sdk import (AssistantMessage, ClaudeAgentOptions,
+                                  TextBlock, query)
+    from claude_agent_sdk.types import StreamEvent
+
+    # Truncate for faster processing
+    truncated = text[:1000] if len(text) > 1000 else text
+
+    system_prompt = "You are a summarizer. Output ONLY a 20-30 word summary. No questions. No commentary. No offers to help. Just the summary. If the text contains both English and Korean, write the summary in Korean."
+
+    options = ClaudeAgentOptions(
+        model="haiku",
+        system_prompt=system_prompt,
+        allowed_tools=[],
+        max_turns=1,
+        include_partial_messages=True
+    )
+
+    streamed = False
+    async for message in query(prompt=f"요약할 텍스트: {truncated}", options=options):
+        if isinstance(message, StreamEvent):
+            event = message.event
+            if event.get("type") != "content_block_delta":
+                continue
+            delta = event.get("delta", {})
+            if delta.get("type") == "text_delta" and delta.get("text"):
+                streamed = True
+                yield delta["text"]
+        elif isinstance(message, AssistantMessage) and not streamed:
+            # CLI without partial message support: fall back to the full message
+            for block in message.content:
+                if isinstance(block, TextBlock):
+                    yield block.text
+
+
+def summary_settings(config: dict) -> tuple[str, float]:
+    """Return (summarizer, deadline) from the tts config.
+
+    summarizer is "haiku" (model raced against the local summary) or
+    "extractive" (fully offline).
+    """
+    tts_config = config.get('tts', {})
+    summarizer = tts_config.get('summarizer', 'haiku')
+    deadline = float(tts_config.get('summary_deadline', DEFAULT_SUMMARY_DEADLINE))
+    return summarizer, deadline
+
+
+async def summarize_with_haiku(text: str, deadline: float = DEFAULT_SUMMARY_DEADLINE) -> str:
+    """Summarize message to 30 words or less using Claude Haiku.
+
+    Falls back to the local extractive summary if Haiku fails or does not
+    finish within deadline seconds.
+    """
+    # Return as-is if already 30 words or less
+    if len(text.split()) <= 30:
+        return text.strip()
+
+    response_text = ""
+
+    async def collect() -> None:
+        nonlocal response_text
+        async for delta in stream_summary_with_haiku(text):
+            response_text += delta
+
+    try:
+        await asyncio.wait_for(collect(), timeout=deadline)
+    except asyncio.TimeoutError:
+        log(f"Haiku missed {deadline:.1f}s deadline, using extractive summary")
+        return extractive_summary(text)
+    except Exception as e:
+        log(f"Haiku summarization failed: {e}")
+        return extractive_summary(text)
+
+    return response_text.strip() or extractive_summary(text)
+
+
+async def summarize(text: str, config: dict) -> str:
+    """Summarize text with the summarizer configured in tts settings."""
+    summarizer, deadline = summary_settings(config)
+    if summarizer == 'extractive':
+        return extractive_summary(text)
+    return await summarize_with_haiku(text, deadline)
+
+
+async def _next_delta(stream: AsyncIterator[str]) -> str | None:
+    try:
+        return await anext(stream)
+    except StopAsyncIteration:
+        return None
+
+
+def speak(text: str, config: dict) -> None:
+    """Speak text via the configured TTS backend (background)."""
+    engine = TTSEngine(config)
+    cmd = engine.command(text)
+    if cmd is None:
+        log("No TTS backend or audio player available")
+        return
+    subprocess.Popen(
+        ["nohup", *cmd],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    engine.prune_cache()
+
+
+class SpeechPipeline:
+    """Speak sentences in order through one detached player shell.
+
+    Each sentence's command is written to the stdin of an `sh` started in
+    its own session, which runs the commands one after another as they
+    arrive, so playback overlaps with summary generation. close() only
+    ends the queue: playback continues after the hook process exits.
+    """
+
+    def __init__(self, config: dict, timer: EventTimer | None = None) -> None:
+        self.engine = TTSEngine(config)
+        self._timer = timer
+        self._player: subprocess.Popen | None = None
+        self.first_audio_at: float | None = None
+        self.sentences = 0
+
+    def put(self, sentence: str) -> None:
+        self.sentences += 1
+        cmd = self.engine.command(sentence, self._timer)
+        if cmd is None:
+            log("No TTS backend or audio player available")
+            return
+        t0 = time.perf_counter()
+        try:
+            if self._player is None:
+                self._player = subprocess.Popen(
+                    ["sh"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
+            self._player.stdin.write(f"{shlex.join(cmd)}\n".encode("utf-8"))
+            self._player.stdin.flush()
+        except OSError as e:
+            log(f"TTS failed: {e}")
+            return
+        finally:
+            if self._timer:
+                self._timer.add("tts_spawn", (time.perf_counter() - t0) * 1000)
+        if self.first_audio_at is None:
+            self.first_audio_at = time.monotonic()
+
+    def close(self) -> None:
+        """End the queue; the player exits after the last queued sentence."""
+        if self._player is None:
+            return
+        try:
+            self._player.stdin.close()
+        except OSError:
+            pass
+
+
+async def speak_streaming(text: str, config: dict, timer: EventTimer | None = None) -> float | None:
+    """Summarize and speak sentence by sentence while the summary streams.
+
+    Haiku has summary_deadline seconds to finish; if it fails or runs out
+    of time before producing a sentence, the extractive summary is spoken
+    instead. Returns the monotonic time the first sentence was handed to
+    the player.
+    """
+    summarizer, deadline = summary_settings(config)
+    pipeline = SpeechPipeline(config, timer)
+
+    try:
+        if len(text.split()) <= 30:
+            for sentence in split_sentences(text):
+                pipeline.put(sentence)
+        elif summarizer == 'extractive':
+            with timer.phase("summarization") if timer else nullcontext():
+                summary = extractive_summary(text)
+            log(f"Summary (extractive): {summary}")
+            for sentence in split_sentences(summary):
+                pipeline.put(sentence)
+        else:
+            with timer.phase("summarization") if timer else nullcontext():
+                await _speak_haiku_stream(text, deadline, pipeline)
+    finally:
+        pipeline.close()
+
+    engine = pipeline.engine
+    engine.prune_cache()
+    if timer:
+        timer.set("tts_backend", engine.backend.name if engine.backend else None)
+        timer.set("tts_cache", {"hits": engine.cache_hits, "misses": engine.cache_misses})
+    log(f"Spoke {pipeline.sentences} sentence(s)")
+    return pipeline.first_audio_at
+
+
+async def _speak_haiku_stream(text: str, deadline: float, pipeline: "SpeechPipeline") -> None:
+    splitter = SentenceSplitter()
+    stream = stream_summary_with_haiku(text)
+    deadline_at = time.monotonic() + deadline
+    spoken = ""
+
+    try:
+        while True:
+            remaining = max(deadline_at - time.monotonic(), 0)
+            delta = await asyncio.wait_for(_next_delta(stream), timeout=remaining)
+            if delta is None:
+                break
+            spoken += delta
+            for sentence in splitter.feed(delta):
+                pipeline.put(sentence)
+        for sentence in splitter.flush():
+            pipeline.put(sentence)
+    except asyncio.TimeoutError:
+        log(f"Haiku missed {deadline:.1f}s deadline")
+    except Exception as e:
+        log(f"Haiku summarization failed: {e}")
+    finally:
+        await stream.aclose()
+
+    if pipeline.sentences:
+        log(f"Summary: {spoken.strip()}")
+        return
+
+    summary = extractive_summary(text)
+    log(f"Summary (extractive): {summary}")
+    for sentence in split_sentences(summary):
+        pipeline.put(sentence)
+
+
+async def async_main(config: dict, timer: EventTimer) -> None:
+    """Run the hook for an enabled config and write its telemetry record."""
+    try:
+        await run_hook(config, timer)
+    finally:
+        timer.write()
+
+    log("=== HOOK END ===")
+
+
+async def run_hook(config: dict, timer: EventTimer) -> None:
+    tts_config = config.get('tts', {})
+
+    # 1. Find latest transcript file (across all projects)
+    with timer.phase("transcript_lookup"):
+        transcript_path = get_latest_transcript()
+    if not transcript_path:
+        log("No transcript file found")
+        return
+    log(f"Transcript: {transcript_path}")
+
+    # 2. Extract last assistant message
+    with timer.phase("extraction"):
+        last_message = extract_last_assistant_message(transcript_path)
+    if not last_message:
+        log("No assistant message found")
+        return
+    log(f"Found message ({len(last_message)} chars)")
+
+    # 3. Summarize with Haiku (if mode is summary) and speak
+    mode = tts_config.get('mode', 'summary')
+    if mode == 'summary' and tts_config.get('streaming', True):
+        # Speak each sentence as soon as the streamed summary completes it
+        first_audio_at = await speak_streaming(last_message, config, timer)
+        path = "streaming"
+    else:
+        with timer.phase("summarization"):
+            if mode == 'summary':
+                summary = await summarize(last_message, config)
+            else:
+                # Full mode: limit to first 500 chars
+                summary = last_message[:500]
+        log(f"Summary: {summary}")
+
+        # 4. Speak summary
+        with timer.phase("tts_spawn"):
+            speak(summary, config)
+        first_audio_at = time.monotonic()
+        path = "batch"
+
+    timer.set("path", path)
+    if first_audio_at is not None:
+        timer.mark("first_audio", first_audio_at)
+        log(f"Time to first audio: {(first_audio_at - timer.started) * 1000:.0f} ms ({path})")
+
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Local text utilities for the voice-assistant TTS hook.
+
+- Sentence splitting (Korean/English punctuation aware, streaming capable)
+- Extractive summarization used when Haiku is slow, failing or disabled
+
+Stdlib only, so the hook can summarize fully offline.
+"""
+
+import math
+import re
+from collections import Counter
+
+MAX_SUMMARY_WORDS = 30
+
+# Sentence end: English/Korean terminal punctuation followed by whitespace
+# (digits excluded so "1." list markers and "3.5" stay intact), CJK
+# full-width punctuation, or a line break.
+SENTENCE_END_RE = re.compile(
+    r"(?<!\d)[.!?…]+[\"'”’)\]]*(?=\s)|[。！？]+|\n"
+)
+
+# Markdown that reads badly aloud
+CODE_BLOCK_RE = re.compile(r"```.*?(```|$)", re.DOTALL)
+LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+MARKUP_RE = re.compile(r"^\s*(#{1,6}\s+|[-*+]\s+|>\s*|\|)|[`*|]", re.MULTILINE)
+
+LATIN_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9_'-]*")
+HANGUL_WORD_RE = re.compile(r"[가-힣]+")
+
+STOPWORDS_EN = frozenset("""
+    a an the and or but if then so of to in on at by for with from as is are was
+    were be been being it its this that these those i you we they he she my your
+    our their me us them do does did done have has had not no yes can could will
+    would should may might just also here there now all any some which what when
+    where who how than too very into out up about over more most such only own
+""".split())
+
+# Frequent Korean function words and endings that carry no topic signal
+STOPWORDS_KO = frozenset("""
+    그리고 그러나 하지만 그래서 또는 또한 이 그 저 것 수 등 및 때 더 좀 잘 이제
+    다음 있습니다 합니다 했습니다 됩니다 입니다 있어요 해요 했어요 돼요 이에요 예요
+""".split())
+
+# Common particles stripped from the end of Hangul tokens before counting
+KO_PARTICLES = ("에서는", "으로는", "에서", "으로", "에게", "까지", "부터", "처럼",
+                "보다", "은", "는", "이", "가", "을", "를", "에", "의", "도",
+                "로", "와", "과", "만")
+
+
+def clean_markdown(text: str) -> str:
+    """Strip markdown syntax and code blocks so the text reads naturally."""
+    text = CODE_BLOCK_RE.sub(" ", text)
+    text = LINK_RE.sub(r"\1", text)
+    return MARKUP_RE.sub("", text)
+
+
+class SentenceSplitter:
+    """Incrementally split streamed text at sentence boundaries."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add a chunk and return the sentences it completed."""
+        self._buffer += chunk
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_RE.finditer(self._buffer):
+            sentence = self._buffer[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> list[str]:
+        """Return the trailing partial sentence, if any."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split complete text into sentences."""
+    splitter = SentenceSplitter()
+    return splitter.feed(text) + splitter.flush()
+
+
+def _terms(sentence: str) -> list[str]:
+    """Content terms of a sentence.
+
+    Hangul tokens have trailing particles removed so "플러그인은" and
+    "플러그인을" count as the same term.
+    """
+    terms = [w.lower() for w in LATIN_WORD_RE.findall(sentence)
+             if w.lower() not in STOPWORDS_EN and len(w) > 1]
+    for word in HANGUL_WORD_RE.findall(sentence):
+        if word in STOPWORDS_KO:
+            continue
+        for particle in KO_PARTICLES:
+            if len(word) > len(particle) + 1 and word.endswith(particle):
+                word = word[:-len(particle)]
+                break
+        if len(word) > 1:
+            terms.append(word)
+    return terms
+
+
+def truncate_words(text: str, max_words: int) -> str:
+    """Cut text to max_words at a word boundary."""
+    words = text.split()
+    if len(words) <= max_words:
+        return text.strip()
+    return " ".join(words[:max_words]).rstrip(",;:") + "…"
+
+
+def extractive_summary(text: str, max_words: int = MAX_SUMMARY_WORDS) -> str:
+    """Pick the most representative sentences within a word budget.
+
+    Sentences are scored by the document frequency of their content terms,
+    normalized by length, with a bonus for the opening sentence (responses
+    usually lead with the outcome). Selected sentences keep their original
+    order.
+    """
+    # dict.fromkeys drops repeated sentences while keeping order
+    sentences = [s for s in dict.fromkeys(split_sentences(clean_markdown(text)))
+                 if _terms(s)]
+    if not sentences:
+        return truncate_words(clean_markdown(text), max_words)
+
+    sentence_terms = [_terms(s) for s in sentences]
+    freq = Counter(t for terms in sentence_terms for t in set(terms))
+
+    scores = []
+    for i, terms in enumerate(sentence_terms):
+        score = sum(freq[t] for t in terms) / math.sqrt(len(terms))
+        if i == 0:
+            score *= 1.5
+        scores.append(score)
+
+    ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+    chosen: list[int] = []
+    used = 0
+    for i in ranked:
+        n = len(sentences[i].split())
+        if used + n <= max_words:
+            chosen.append(i)
+            used += n
+
+    if not chosen:
+        return truncate_words(sentences[ranked[0]], max_words)
+    return " ".join(sentences[i] for i in sorted(chosen))
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Telemetry for voice-assistant hooks.
+
+- Buffered, size-rotated text log (replaces per-line file appends)
+- One JSON-lines record per hook event with per-phase durations (ms)
+- Stats report: p50/p95/p99 per phase over a time window
+
+Usage:
+    python telemetry.py [--window 24h] [--event Stop]
+
+Output:
+    Prints a per-phase latency table to stdout
+"""
+
+import argparse
+import json
+import logging
+import logging.handlers
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+# VOICE_ASSISTANT_LOG / VOICE_ASSISTANT_TELEMETRY move them (bench.py uses its sandbox)
+LOG_FILE = Path(os.environ.get("VOICE_ASSISTANT_LOG") or "/tmp/voice-assistant-hook.log")
+TELEMETRY_FILE = Path(os.environ.get("VOICE_ASSISTANT_TELEMETRY") or "/tmp/voice-assistant-telemetry.jsonl")
+MAX_BYTES = 1_000_000
+BACKUP_COUNT = 3
+# Lines held in memory before a write; everything is flushed at exit
+BUFFER_LINES = 200
+
+# Phases in hook order, used for report ordering
+PHASES = (
+    "transcript_lookup",
+    "extraction",
+    "summarization",
+    "cache_lookup",
+    "tts_spawn",
+    "first_audio",
+    "total",
+)
+
+
+def _buffered_handler(path: Path, fmt: str) -> logging.Handler:
+    target = logging.handlers.RotatingFileHandler(
+        path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"
+    )
+    target.setFormatter(logging.Formatter(fmt, datefmt="%Y-%m-%d %H:%M:%S"))
+    return logging.handlers.MemoryHandler(
+        BUFFER_LINES, flushLevel=logging.ERROR, target=target
+    )
+
+
+def get_logger(name: str = "voice-assistant") -> logging.Logger:
+    """Text logger writing to LOG_FILE through a memory buffer."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(_buffered_handler(LOG_FILE, "[%(asctime)s] %(message)s"))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def _telemetry_logger() -> logging.Logger:
+    logger = logging.getLogger("voice-assistant.telemetry")
+    if not logger.handlers:
+        logger.addHandler(_buffered_handler(TELEMETRY_FILE, "%(message)s"))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class EventTimer:
+    """Collect per-phase durations for a single hook event."""
+
+    def __init__(self, event: str) -> None:
+        self.started = time.monotonic()
+        self.record: dict[str, Any] = {
+            "ts": round(time.time(), 3),
+            "event": event,
+            "phases": {},
+        }
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block; repeated phases accumulate."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - t0) * 1000)
+
+    def add(self, name: str, ms: float) -> None:
+        phases = self.record["phases"]
+        phases[name] = round(phases.get(name, 0.0) + ms, 2)
+
+    def mark(self, name: str, at: float) -> None:
+        """Record a monotonic timestamp as ms since the event started."""
+        self.record["phases"][name] = round((at - self.started) * 1000, 2)
+
+    def set(self, key: str, value: Any) -> None:
+        self.record[key] = value
+
+    def write(self) -> None:
+        """Append the record (with total duration) to the telemetry log."""
+        self.mark("total", time.monotonic())
+        _telemetry_logger().info(json.dumps(self.record, ensure_ascii=False))
+
+
+# ─── Stats report ───────────────────────────────────────────
+
+WINDOW_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+WINDOW_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_window(window: str) -> float:
+    """Parse "90s", "30m", "24h", "7d" into seconds."""
+    match = WINDOW_RE.match(window.strip())
+    if not match:
+        raise ValueError(f"Invalid window: {window} (use e.g. 30m, 24h, 7d)")
+    return float(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+
+def read_records(since: float, path: Path = TELEMETRY_FILE) -> list[dict]:
+    """Read telemetry records newer than since (epoch seconds), rotated files included."""
+    files = [Path(f"{path}.{i}") for i in range(BACKUP_COUNT, 0, -1)] + [path]
+    records = []
+    for file in files:
+        if not file.exists():
+            continue
+        with open(file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("ts", 0) >= since:
+                    records.append(record)
+    return records
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def phase_stats(records: list[dict]) -> dict[str, dict[str, float]]:
+    """Compute count/p50/p95/p99 (ms) per phase."""
+    values: dict[str, list[float]] = {}
+    for record in records:
+        for name, ms in record.get("phases", {}).items():
+            values.setdefault(name, []).append(ms)
+
+    order = {name: i for i, name in enumerate(PHASES)}
+    stats = {}
+    for name in sorted(values, key=lambda n: (order.get(n, len(order)), n)):
+        vals = sorted(values[name])
+        stats[name] = {
+            "count": len(vals),
+            "p50": percentile(vals, 50),
+            "p95": percentile(vals, 95),
+            "p99": percentile(vals, 99),
+        }
+    return stats
+
+
+def print_stats(records: list[dict], window: str) -> None:
+    if not records:
+        print(f"No voice hook events in the last {window}")
+        return
+
+    events = Counter(record.get("event", "?") for record in records)
+    summary = ", ".join(f"{name} {count}" for name, count in sorted(events.items()))
+    print(f"Voice hook events in the last {window}: {len(records)} ({summary})")
+    print()
+    print(f"{'phase':<18} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, s in phase_stats(records).items():
+        print(f"{name:<18} {s['count']:>6} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voice hook latency stats")
+    parser.add_argument(
+        '--window', '-w',
+        default='24h',
+        help='Time window, e.g. 30m, 24h, 7d (default: 24h)'
+    )
+    parser.add_argument(
+        '--event', '-e',
+        help='Only include one hook event (Stop, Notification, PostToolUse)'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        since = time.time() - parse_window(args.window)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    records = read_records(since)
+    if args.event:
+        records = [r for r in records if r.get("event") == args.event]
+    print_stats(records, args.window)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,191 @@
 """
 STT (Speech-to-Text) script for voice-assistant plugin.
 
-Supports two providers:
+Supports three providers:
 - whisper-cpp: Local transcription using whisper.cpp
+- whisper-server: Local whisper.cpp server with the model kept resident
 - openai: OpenAI Whisper API
 
+Whisper providers route by audio length (stt.routing): short clips go to
+a small model, longer ones to the large model. With whisper-server, a
+low-confidence small-model result is escalated to the large model.
+
+Transcripts are cached by audio content hash, provider and model
+(stt.cache), so a retried hook or skill gets the same text instantly.
+
 Usage:
     python transcribe.py [audio_file]
     python transcribe.py --provider openai audio.wav
+    python record.py --output - | python transcribe.py -   # in-memory, no temp files
+    python transcribe.py --batch meeting.wav [more.wav ...]   # parallel, see batch.py
 
 Output:
     Prints transcribed text to stdout
 """
 
 import argparse
+import hashlib
+import io
+import os
 import subprocess
 import sys
-import tempfile
+import threading
+import wave
+from collections import OrderedDict
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from config_loader import load_config, expand_path
+from whisper_server import (ServerUnavailable, routing_settings, server_pool,
+                            server_settings, short_model_settings, start_server,
+                            transcribe_with_confidence, transcribe_with_server)
+
+
+def encode_wav(pcm: bytes, sample_rate: int, channels: int = 1) -> bytes:
+    """Wrap 16-bit PCM in an in-memory WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def audio_duration(audio: str | bytes) -> float | None:
+    """Duration of WAV audio in seconds, or None if it is not a readable WAV."""
+    try:
+        with wave.open(io.BytesIO(audio) if isinstance(audio, bytes) else audio, 'rb') as f:
+            return f.getnframes() / f.getframerate()
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def route_short_model(audio: str | bytes, config: dict) -> dict | None:
+    """Server settings of the small model if audio is short enough for it.
+
+    Returns None (use the main model) when routing is off, the small model
+    is not downloaded, or the duration is unknown or above
+    stt.routing.short_max_seconds.
+    """
+    short = short_model_settings(config)
+    if short is None:
+        return None
+    duration = audio_duration(audio)
+    if duration is None or duration > routing_settings(config)['short_max_seconds']:
+        return None
+    return short
+
+
+class TranscriptCache:
+    """Transcripts keyed by audio content hash, provider and model.
+
+    An in-memory LRU front serves repeats inside long-lived processes
+    (listen.py, --batch); the on-disk store serves retries across
+    processes and keeps the max_entries most recently used transcripts.
+    Entries are written to a temp file and renamed, so an interrupted run
+    never leaves a partial transcript behind.
+    """
+
+    def __init__(self, directory: str, max_entries: int, memory_entries: int = 256) -> None:
+        self.dir = Path(expand_path(directory))
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(audio: bytes, *parts: str) -> str:
+        digest = hashlib.sha256(audio)
+        digest.update("\0".join(parts).encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def _remember(self, key: str, text: str) -> None:
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return text
+
+        path = self.dir / f"{key}.txt"
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        self._remember(key, text)
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        tmp = self.dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.dir / f"{key}.txt")
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return
+        self.prune()
+
+    def prune(self) -> int:
+        """Evict least recently used transcripts; returns the number removed."""
+        try:
+            entries = sorted(self.dir.glob("*.txt"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return 0
+        removed = 0
+        for path in entries[:max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+_transcript_cache: TranscriptCache | None = None
+
+
+def get_transcript_cache(config: dict) -> TranscriptCache | None:
+    """Return the process-wide transcript cache, or None if disabled."""
+    global _transcript_cache
+    cache_config = config.get('stt', {}).get('cache', {})
+    if not cache_config.get('enabled', True):
+        return None
+    if _transcript_cache is None:
+        _transcript_cache = TranscriptCache(
+            cache_config.get('dir', '~/.cache/voice-assistant/stt'),
+            int(cache_config.get('max_entries', 2000)),
+            int(cache_config.get('memory_entries', 256)),
+        )
+    return _transcript_cache
+
+
+def model_id(provider: str, config: dict) -> str:
+    """Models that can produce a transcript for provider, for cache keys."""
+    stt_config = config.get('stt', {})
+    if provider == 'openai':
+        return openai_settings(config)['model']
+    models = [stt_config.get('whisper_model', '~/.whisper/ggml-large-v3-turbo.bin')]
+    short = short_model_settings(config)
+    if short is not None:
+        routing = routing_settings(config)
+        models += [short['model'], str(routing['short_max_seconds']), str(routing['min_confidence'])]
+    return "|".join(models)
 
 
 def check_whisper_cpp_installed() -> bool:
@@ -38,13 +202,18 @@ def check_whisper_cpp_installed() -> bool:
         return False
 
 
-def transcribe_with_whisper_cpp(audio_path: str, model_path: str) -> str:
+def transcribe_with_whisper_cpp(audio: str | bytes, model_path: str,
+                                threads: int | None = None) -> str:
     """
     Transcribe audio using whisper.cpp.
 
+    WAV bytes are piped to whisper's stdin and the transcript is read from
+    its stdout, so nothing is written to disk.
+
     Args:
-        audio_path: Path to audio file (WAV)
+        audio: Path to audio file (WAV), or WAV bytes
         model_path: Path to whisper model file
+        threads: whisper --threads (default: whisper's own)
 
     Returns:
         Transcribed text
@@ -66,61 +235,130 @@ def transcribe_with_whisper_cpp(audio_path: str, model_path: str) -> str:
             "    https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-large-v3-turbo.bin"
         )
 
-    # Create temp file for output
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-        output_base = f.name[:-4]  # Remove .txt extension
+    from_stdin = isinstance(audio, bytes)
+
+    # Run whisper-cpp
+    # whisper --model <model> --file <audio|-> --no-timestamps
+    cmd = [
+        'whisper',
+        '--model', model_path,
+        '--file', '-' if from_stdin else audio,
+        '--no-timestamps',  # Plain text on stdout
+        '--no-prints'  # Suppress progress output
+    ]
+    if threads:
+        cmd += ['--threads', str(threads)]
+
+    result = subprocess.run(
+        cmd,
+        input=audio if from_stdin else None,
+        capture_output=True
+    )
 
-    try:
-        # Run whisper-cpp
-        # whisper --model <model> --file <audio> --output-txt
-        cmd = [
-            'whisper',
-            '--model', model_path,
-            '--file', audio_path,
-            '--output-file', output_base,
-            '--output-txt',
-            '--no-prints'  # Suppress progress output
-        ]
+    if result.returncode != 0:
+        raise RuntimeError(f"whisper-cpp failed: {result.stderr.decode('utf-8', errors='replace')}")
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True
-        )
+    lines = result.stdout.decode('utf-8', errors='replace').splitlines()
+    return " ".join(line.strip() for line in lines if line.strip())
 
-        if result.returncode != 0:
-            raise RuntimeError(f"whisper-cpp failed: {result.stderr}")
-
-        # Read output file
-        output_file = f"{output_base}.txt"
-        if Path(output_file).exists():
-            with open(output_file, 'r', encoding='utf-8') as f:
-                text = f.read().strip()
-            # Clean up
-            Path(output_file).unlink()
-            return text
-        else:
-            raise RuntimeError("whisper-cpp did not produce output file")
-
-    finally:
-        # Cleanup temp files
-        for ext in ['.txt', '.srt', '.vtt']:
-            temp_file = f"{output_base}{ext}"
-            if Path(temp_file).exists():
-                Path(temp_file).unlink()
-
-
-def transcribe_with_openai(audio_path: str, model: str = "whisper-1") -> str:
+
+def transcribe_with_whisper_server(audio: str | bytes, config: dict) -> str:
     """
-    Transcribe audio using OpenAI Whisper API.
+    Transcribe audio using the warm whisper.cpp server.
+
+    Short clips go to the small-model server first; results below
+    stt.routing.min_confidence are re-run on the main model. Falls back to
+    the whisper CLI when a server is down. With stt.server.auto_start, the
+    server pool is started in the background so the next utterance hits a
+    warm model.
 
     Args:
-        audio_path: Path to audio file
-        model: OpenAI model name (default: whisper-1)
+        audio: Path to audio file (WAV), or WAV bytes
+        config: Configuration dict
 
     Returns:
         Transcribed text
     """
+    settings = server_settings(config)
+    short = route_short_model(audio, config)
+    try:
+        if short is not None:
+            text, confidence = transcribe_with_confidence(audio, short)
+            min_confidence = routing_settings(config)['min_confidence']
+            if confidence is None or confidence >= min_confidence:
+                return text
+            print(f"Low confidence ({confidence:.2f}) from {Path(short['model']).name}, "
+                  f"retrying with {Path(settings['model']).name}", file=sys.stderr)
+            short = None
+        return transcribe_with_server(audio, settings)
+    except ServerUnavailable as e:
+        print(f"Warning: {e} -- falling back to whisper CLI", file=sys.stderr)
+
+    if settings['auto_start']:
+        for pooled in server_pool(config):
+            try:
+                start_server(pooled, wait=False)
+            except Exception as e:
+                print(f"Warning: could not start whisper-server: {e}", file=sys.stderr)
+
+    return transcribe_with_whisper_cpp(audio, (short or settings)['model'])
+
+
+def openai_settings(config: dict) -> dict:
+    """Return stt.openai settings merged over defaults."""
+    stt_config = config.get('stt', {})
+    settings = {
+        "model": stt_config.get('openai_model', 'whisper-1'),
+        "upload_format": "flac",
+        "base_url": None,
+        "timeout": 30,
+        "max_retries": 3,
+    }
+    settings.update(stt_config.get('openai', {}))
+    return settings
+
+
+# Upload encoders: format -> (command reading WAV on stdin, upload filename)
+UPLOAD_ENCODERS = {
+    "flac": (['sox', '-q', '-t', 'wav', '-', '-t', 'flac', '-'], "audio.flac"),
+    "opus": (['ffmpeg', '-loglevel', 'error', '-f', 'wav', '-i', 'pipe:0',
+              '-c:a', 'libopus', '-b:a', '24k', '-application', 'voip',
+              '-f', 'ogg', 'pipe:1'], "audio.ogg"),
+}
+
+
+def compress_audio(wav: bytes, upload_format: str) -> tuple[str, bytes]:
+    """
+    Encode WAV bytes for upload.
+
+    FLAC (sox) is lossless and roughly halves speech; Opus (ffmpeg) at
+    24 kbps is several times smaller again. Falls back to WAV when the
+    encoder is missing or fails.
+
+    Returns:
+        (upload filename, encoded bytes)
+    """
+    if upload_format not in UPLOAD_ENCODERS:
+        return "audio.wav", wav
+
+    cmd, filename = UPLOAD_ENCODERS[upload_format]
+    try:
+        result = subprocess.run(cmd, input=wav, capture_output=True)
+    except FileNotFoundError:
+        print(f"Warning: {cmd[0]} not found, uploading WAV", file=sys.stderr)
+        return "audio.wav", wav
+    if result.returncode != 0 or not result.stdout:
+        print(f"Warning: {upload_format} encoding failed, uploading WAV", file=sys.stderr)
+        return "audio.wav", wav
+    return filename, result.stdout
+
+
+# Clients are reused across calls so the HTTP connection pool stays warm
+_openai_clients: dict[tuple, object] = {}
+
+
+def get_openai_client(settings: dict):
+    """Return a shared openai.OpenAI client for these settings."""
     try:
         import openai
     except ImportError:
@@ -129,25 +367,63 @@ def transcribe_with_openai(audio_path: str, model: str = "whisper-1") -> str:
             "  pip install openai"
         )
 
-    client = openai.OpenAI()
-
-    with open(audio_path, 'rb') as audio_file:
-        response = client.audio.transcriptions.create(
-            model=model,
-            file=audio_file
+    key = (settings['base_url'], settings['timeout'], settings['max_retries'])
+    client = _openai_clients.get(key)
+    if client is None:
+        # max_retries: the SDK retries connection errors, 408/409/429 and 5xx
+        # with exponential backoff and jitter, honoring Retry-After
+        client = openai.OpenAI(
+            base_url=settings['base_url'],
+            timeout=settings['timeout'],
+            max_retries=settings['max_retries']
         )
+        _openai_clients[key] = client
+    return client
+
+
+def transcribe_with_openai(audio: str | bytes, config: dict) -> str:
+    """
+    Transcribe audio using OpenAI Whisper API.
+
+    Audio is compressed per stt.openai.upload_format before upload.
+    Set stt.openai.base_url (or OPENAI_BASE_URL) to use a compatible or
+    local stand-in endpoint.
+
+    Args:
+        audio: Path to audio file, or WAV bytes
+        config: Configuration dict
+
+    Returns:
+        Transcribed text
+    """
+    settings = openai_settings(config)
+    client = get_openai_client(settings)
+
+    if isinstance(audio, bytes):
+        filename, data = compress_audio(audio, settings['upload_format'])
+    elif Path(audio).suffix.lower() == '.wav':
+        filename, data = compress_audio(Path(audio).read_bytes(), settings['upload_format'])
+    else:
+        # Already-compressed formats (mp3, m4a, ...) are uploaded as is
+        filename, data = Path(audio).name, Path(audio).read_bytes()
 
+    response = client.audio.transcriptions.create(
+        model=settings['model'],
+        file=(filename, data)
+    )
     return response.text
 
 
-def transcribe(audio_path: str, provider: str = None, config: dict = None) -> str:
+def transcribe(audio: str | bytes, provider: str = None, config: dict = None,
+               threads: int | None = None) -> str:
     """
-    Transcribe audio file to text.
+    Transcribe audio to text.
 
     Args:
-        audio_path: Path to audio file
-        provider: STT provider ('whisper-cpp' or 'openai')
+        audio: Path to audio file, or WAV bytes
+        provider: STT provider ('whisper-cpp', 'whisper-server' or 'openai')
         config: Configuration dict (optional, will load if not provided)
+        threads: whisper --threads for the whisper-cpp provider
 
     Returns:
         Transcribed text
@@ -155,15 +431,36 @@ def transcribe(audio_path: str, provider: str = None, config: dict = None) -> st
     if config is None:
         config = load_config()
 
+    provider = provider or config.get('stt', {}).get('provider', 'whisper-cpp')
+
+    cache = get_transcript_cache(config)
+    if cache is None:
+        return _transcribe_uncached(audio, provider, config, threads)
+
+    data = audio if isinstance(audio, bytes) else Path(audio).read_bytes()
+    key = cache.key(data, provider, model_id(provider, config))
+    text = cache.get(key)
+    if text is None:
+        text = _transcribe_uncached(audio, provider, config, threads)
+        # Empty results are often a failed capture; let a retry re-run them
+        if text.strip():
+            cache.put(key, text)
+    return text
+
+
+def _transcribe_uncached(audio: str | bytes, provider: str, config: dict,
+                         threads: int | None) -> str:
     stt_config = config.get('stt', {})
-    provider = provider or stt_config.get('provider', 'whisper-cpp')
 
     if provider == 'whisper-cpp':
-        model_path = stt_config.get('whisper_model', '~/.whisper/ggml-large-v3-turbo.bin')
-        return transcribe_with_whisper_cpp(audio_path, model_path)
+        short = route_short_model(audio, config)
+        model_path = short['model'] if short else stt_config.get(
+            'whisper_model', '~/.whisper/ggml-large-v3-turbo.bin')
+        return transcribe_with_whisper_cpp(audio, model_path, threads)
+    elif provider == 'whisper-server':
+        return transcribe_with_whisper_server(audio, config)
     elif provider == 'openai':
-        model = stt_config.get('openai_model', 'whisper-1')
-        return transcribe_with_openai(audio_path, model)
+        return transcribe_with_openai(audio, config)
     else:
         raise ValueError(f"Unknown STT provider: {provider}")
 
@@ -172,33 +469,62 @@ def main():
     parser = argparse.ArgumentParser(description="Transcribe audio to text")
     parser.add_argument(
         'audio_file',
-        nargs='?',
-        help='Path to audio file (default: from config)'
+        nargs='*',
+        help='Path to audio file, or - to read WAV from stdin (default: from config)'
     )
     parser.add_argument(
         '--provider', '-p',
-        choices=['whisper-cpp', 'openai'],
+        choices=['whisper-cpp', 'whisper-server', 'openai'],
         help='STT provider (default: from config)'
     )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Transcribe many files or one long file in parallel chunks'
+    )
 
     args = parser.parse_args()
+    if len(args.audio_file) > 1 and not args.batch:
+        parser.error("multiple audio files require --batch")
 
     # Load config
     config = load_config()
 
+    if args.batch:
+        from batch import run_batch
+        files = args.audio_file or [expand_path(
+            config.get('recording', {}).get('output_path', '/tmp/voice_input.wav'))]
+        missing = [f for f in files if not Path(f).exists()]
+        if missing:
+            print(f"Error: Audio file not found: {', '.join(missing)}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            run_batch(files, args.provider, config)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     # Get audio file path
-    audio_path = args.audio_file
+    audio_path = args.audio_file[0] if args.audio_file else None
     if not audio_path:
         audio_path = config.get('recording', {}).get('output_path', '/tmp/voice_input.wav')
         audio_path = expand_path(audio_path)
 
-    if not Path(audio_path).exists():
+    if audio_path == '-':
+        audio = sys.stdin.buffer.read()
+        if not audio:
+            print("Error: No audio on stdin", file=sys.stderr)
+            sys.exit(1)
+    elif not Path(audio_path).exists():
         print(f"Error: Audio file not found: {audio_path}", file=sys.stderr)
         print("Run record.py first to record audio.", file=sys.stderr)
         sys.exit(1)
+    else:
+        audio = audio_path
 
     try:
-        text = transcribe(audio_path, args.provider, config)
+        text = transcribe(audio, args.provider, config)
         print(text)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
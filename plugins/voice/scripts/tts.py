@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+TTS backends for voice-assistant plugin.
+
+Supports three command backends:
+- say: macOS built-in speech
+- espeak-ng: Linux/container speech (apt install espeak-ng)
+- piper: Local neural TTS (https://github.com/rhasspy/piper)
+
+Short utterances are cached as WAV keyed by (backend, voice, rate, text),
+so repeated phrases ("작업 완료", "Waiting for input") play without any
+synthesis. The cache is size-bounded with least-recently-used eviction.
+
+Mixed Korean/English text is split into Hangul and Latin runs, each
+spoken with the matching voice. Runs are synthesized concurrently and
+played back to back, so there is no gap between voices. A language the
+configured backend has no voice for (piper has no Korean model) is
+spoken by the first other installed backend that has one.
+
+Usage:
+    python tts.py "text to speak"
+
+Output:
+    Speaks the text with the configured backend
+"""
+
+import hashlib
+import itertools
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from config_loader import expand_path, load_config
+from telemetry import get_logger
+
+logger = get_logger()
+
+# WAV players in preference order
+PLAYERS = (
+    ["afplay"],
+    ["paplay"],
+    ["pw-play"],
+    ["aplay", "-q"],
+    ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"],
+)
+
+
+# 한글 음절, 자모, 호환용 자모
+HANGUL_RE = re.compile(r"[\uac00-\ud7a3\u1100-\u11ff\u3130-\u318f]")
+# Latin words of 3+ chars (code terms included) joined by spaces, e.g. "pull request",
+# "v2.5"; shorter ones ("CI", "OK") read fine in the Korean voice and stay in its run
+LATIN_RUN_RE = re.compile(r"[A-Za-z][\w.+#'/-]+[A-Za-z0-9](?:[ \t]+[A-Za-z][\w.+#'/-]+[A-Za-z0-9])*")
+
+
+def detect_korean(text: str) -> bool:
+    """Check if text contains Korean characters."""
+    return HANGUL_RE.search(text) is not None
+
+
+def segment_runs(text: str) -> list[tuple[str, str]]:
+    """Split text into ("ko" | "en", run) pieces in one regex pass.
+
+    Text without Hangul is a single "en" run. Otherwise Latin word runs
+    become "en" and everything between them "ko"; digits, spaces and
+    punctuation stay with the run they follow.
+    """
+    if not detect_korean(text):
+        return [("en", text)]
+
+    runs: list[tuple[str, str]] = []
+
+    def add(lang: str, piece: str) -> None:
+        if not piece:
+            return
+        if runs and (runs[-1][0] == lang or not piece.strip(" \t,.!?;:")
+                     or (lang == "ko" and not detect_korean(piece))):
+            runs[-1] = (runs[-1][0], runs[-1][1] + piece)
+        else:
+            runs.append((lang, piece))
+
+    pos = 0
+    for match in LATIN_RUN_RE.finditer(text):
+        add("ko", text[pos:match.start()])
+        add("en", match.group())
+        pos = match.end()
+    add("ko", text[pos:])
+    return [(lang, run) for lang, run in runs if run.strip()]
+
+
+class TTSBackend(ABC):
+    """A TTS command line tool.
+
+    Subclasses build a command that plays text directly and/or one that
+    writes a WAV file. An empty voice means the backend cannot speak
+    that language.
+    """
+
+    name = ""
+    binary = ""
+    default_voices = {"ko": "", "en": ""}
+
+    def __init__(self, options: dict | None = None) -> None:
+        self.options = options or {}
+
+    def available(self) -> bool:
+        return shutil.which(self.binary) is not None
+
+    def voice(self, lang: str, tts_config: dict) -> str:
+        return self.options.get(f"voice_{lang}", self.default_voices[lang])
+
+    def speak_command(self, text: str, voice: str, rate: int) -> list[str] | None:
+        """Command that plays text directly, or None if synthesis-only."""
+        return None
+
+    @abstractmethod
+    def synth_command(self, text: str, voice: str, rate: int, out_path: str) -> str:
+        """Shell command that writes text as WAV to out_path."""
+
+
+class SayBackend(TTSBackend):
+    name = "say"
+    binary = "say"
+    default_voices = {"ko": "Yuna", "en": "Samantha"}
+
+    def voice(self, lang: str, tts_config: dict) -> str:
+        # Top-level voice_ko/voice_en predate backends and name say voices
+        return tts_config.get(f"voice_{lang}", self.default_voices[lang])
+
+    def speak_command(self, text: str, voice: str, rate: int) -> list[str]:
+        return ["say", "-r", str(rate), "-v", voice, text]
+
+    def synth_command(self, text: str, voice: str, rate: int, out_path: str) -> str:
+        return shlex.join(["say", "-r", str(rate), "-v", voice,
+                           "--file-format=WAVE", "--data-format=LEI16@22050",
+                           "-o", out_path, text])
+
+
+class EspeakBackend(TTSBackend):
+    name = "espeak-ng"
+    binary = "espeak-ng"
+    default_voices = {"ko": "ko", "en": "en-us"}
+
+    def speak_command(self, text: str, voice: str, rate: int) -> list[str]:
+        return [self.binary, "-v", voice, "-s", str(rate), text]
+
+    def synth_command(self, text: str, voice: str, rate: int, out_path: str) -> str:
+        return shlex.join([self.binary, "-v", voice, "-s", str(rate),
+                           "-w", out_path, text])
+
+
+class PiperBackend(TTSBackend):
+    name = "piper"
+    binary = "piper"
+    # No Korean voice is published for piper; set voice_ko to a Korean
+    # model to keep Korean runs on piper
+    default_voices = {"ko": "", "en": "~/.piper/en_US-lessac-medium.onnx"}
+
+    def synth_command(self, text: str, voice: str, rate: int, out_path: str) -> str:
+        # piper speaks at roughly 175 wpm with length_scale 1.0
+        length_scale = round(175 / max(rate, 1), 2)
+        piper = shlex.join(["piper", "--model", expand_path(voice),
+                            "--length_scale", str(length_scale),
+                            "--output_file", out_path])
+        return f"printf '%s' {shlex.quote(text)} | {piper}"
+
+
+BACKENDS = {cls.name: cls for cls in (SayBackend, EspeakBackend, PiperBackend)}
+
+
+class ClipCache:
+    """Size-bounded on-disk cache of synthesized WAV clips.
+
+    Hits refresh the file mtime; prune() removes the least recently used
+    clips until the cache fits in max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.dir = Path(expand_path(directory))
+        self.max_bytes = max_bytes
+
+    def path_for(self, *key: str) -> Path:
+        digest = hashlib.sha256("\0".join(key).encode("utf-8")).hexdigest()
+        return self.dir / f"{digest[:32]}.wav"
+
+    def get(self, path: Path) -> Path | None:
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def prune(self) -> int:
+        """Evict least recently used clips; returns the number removed."""
+        try:
+            clips = [(p, p.stat()) for p in self.dir.glob("*.wav")]
+        except OSError:
+            return 0
+        total = sum(st.st_size for _, st in clips)
+        removed = 0
+        for path, st in sorted(clips, key=lambda c: c[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= st.st_size
+            removed += 1
+        return removed
+
+
+def find_player(preferred: str = "auto") -> list[str] | None:
+    """Return a WAV player command prefix."""
+    if preferred != "auto":
+        return shlex.split(preferred)
+    for player in PLAYERS:
+        if shutil.which(player[0]):
+            return player
+    return None
+
+
+def select_backend(tts_config: dict) -> TTSBackend | None:
+    """Instantiate the configured backend ("auto" picks the first installed).
+
+    An unknown backend name is logged and treated as "auto".
+    """
+    name = tts_config.get("backend", "auto")
+    options = tts_config.get("backends", {})
+    if name != "auto":
+        cls = BACKENDS.get(name)
+        if cls is not None:
+            return cls(options.get(name))
+        logger.warning(f"Unknown TTS backend {name!r}, using auto "
+                       f"(choices: {', '.join(BACKENDS)})")
+    for cls in BACKENDS.values():
+        backend = cls(options.get(cls.name))
+        if backend.available():
+            return backend
+    return None
+
+
+class TTSEngine:
+    """Turn text into a single playback command for the configured backend."""
+
+    def __init__(self, config: dict) -> None:
+        self.tts_config = config.get("tts", {})
+        self.rate = int(self.tts_config.get("rate", 190))
+        self.backend = select_backend(self.tts_config)
+        self.player = find_player(self.tts_config.get("player", "auto"))
+
+        cache_config = self.tts_config.get("cache", {})
+        self.cache = None
+        if cache_config.get("enabled", True):
+            self.cache = ClipCache(
+                cache_config.get("dir", "~/.cache/voice-assistant/tts"),
+                int(cache_config.get("max_mb", 50)) * 1024 * 1024,
+            )
+        self.cache_max_chars = int(cache_config.get("max_text_chars", 80))
+        self.split_languages = self.tts_config.get("split_languages", True)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._scratch = itertools.count()
+        self._speakers: dict[str, tuple[TTSBackend, str]] = {}
+
+    def prune_cache(self) -> None:
+        if self.cache is not None:
+            self.cache.prune()
+
+    def speaker(self, lang: str) -> tuple[TTSBackend, str]:
+        """(backend, voice) for lang: the configured backend if it has a voice
+        for lang, else the first other installed backend that does."""
+        if lang not in self._speakers:
+            speaker = (self.backend, self.backend.voice(lang, self.tts_config))
+            if not speaker[1]:
+                options = self.tts_config.get("backends", {})
+                for cls in BACKENDS.values():
+                    other = cls(options.get(cls.name))
+                    voice = other.voice(lang, self.tts_config)
+                    if cls.name != self.backend.name and voice and other.available():
+                        speaker = (other, voice)
+                        break
+                else:
+                    # Nothing else installed: read it with the other voice
+                    logger.warning(f"No {lang} voice for {self.backend.name} and no other backend has one")
+                    speaker = (self.backend, self.backend.voice("en" if lang == "ko" else "ko",
+                                                                self.tts_config))
+            self._speakers[lang] = speaker
+        return self._speakers[lang]
+
+    def speaker_for(self, text: str) -> tuple[TTSBackend, str]:
+        return self.speaker("ko" if detect_korean(text) else "en")
+
+    def command(self, text: str, timer=None) -> list[str] | None:
+        """Build one command that speaks text.
+
+        Cached clips are played directly. Short uncached text is synthesized
+        into the cache and then played; longer text is spoken directly when
+        the backend can, to avoid a synthesis round-trip. Mixed-language
+        text is spoken run by run with per-run voices (see _runs_command).
+        """
+        if self.backend is None:
+            return None
+        runs = segment_runs(text) if self.split_languages else []
+        if len(runs) > 1:
+            return self._runs_command(runs, timer)
+        return self._single_command(text, *self.speaker_for(text), timer)
+
+    def _single_command(self, text: str, backend: TTSBackend, voice: str,
+                        timer=None) -> list[str] | None:
+        direct = backend.speak_command(text, voice, self.rate)
+
+        cacheable = (self.cache is not None and self.player is not None
+                     and len(text) <= self.cache_max_chars)
+        if not cacheable:
+            if direct is not None:
+                return direct
+            if self.player is None:
+                return None
+            out = f"/tmp/voice-tts-{os.getpid()}-{next(self._scratch)}.wav"
+            synth = backend.synth_command(text, voice, self.rate, out)
+            play = shlex.join([*self.player, out])
+            return ["sh", "-c", f"{synth} && {play}; rm -f {shlex.quote(out)}"]
+
+        with timer.phase("cache_lookup") if timer else nullcontext():
+            path = self.cache.path_for(backend.name, voice, str(self.rate), text)
+            clip = self.cache.get(path)
+        if clip is not None:
+            self.cache_hits += 1
+            return [*self.player, str(clip)]
+
+        self.cache_misses += 1
+        self.cache.dir.mkdir(parents=True, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        synth = backend.synth_command(text, voice, self.rate, tmp)
+        play = shlex.join([*self.player, str(path)])
+        return ["sh", "-c", f"{synth} && mv {shlex.quote(tmp)} {shlex.quote(str(path))} && {play}"
+                            f"; rm -f {shlex.quote(tmp)}"]
+
+    def _runs_command(self, runs: list[tuple[str, str]], timer=None) -> list[str] | None:
+        """Speak language runs back to back with per-run voices.
+
+        Every uncached run is synthesized in the background at once; run N
+        plays as soon as its own synthesis is done, while later runs are
+        still synthesizing. Short runs go through the clip cache; a run
+        repeated within the utterance is synthesized once.
+        """
+        voices = [(*self.speaker(lang), run) for lang, run in runs]
+        if self.player is None:
+            # No player for WAV files: speak each run directly, in order
+            cmds = [backend.speak_command(run, voice, self.rate) for backend, voice, run in voices]
+            if any(cmd is None for cmd in cmds):
+                return None
+            return ["sh", "-c", "; ".join(shlex.join(cmd) for cmd in cmds)]
+
+        background, playback, cleanup = [], [], []
+        scheduled: set[Path] = set()
+        for i, (backend, voice, run) in enumerate(voices):
+            run = run.strip()
+            path = None
+            if self.cache is not None and len(run) <= self.cache_max_chars:
+                with timer.phase("cache_lookup") if timer else nullcontext():
+                    path = self.cache.path_for(backend.name, voice, str(self.rate), run)
+                    clip = self.cache.get(path)
+                if path in scheduled:
+                    # Same run earlier in this utterance: its job has been waited for by now
+                    playback.append(f"test -f {shlex.quote(str(path))}"
+                                    f" && {shlex.join([*self.player, str(path)])}")
+                    continue
+                if clip is not None:
+                    self.cache_hits += 1
+                    playback.append(shlex.join([*self.player, str(clip)]))
+                    continue
+                self.cache_misses += 1
+                scheduled.add(path)
+                self.cache.dir.mkdir(parents=True, exist_ok=True)
+                out = f"{path}.{os.getpid()}.tmp"
+                synth = (f"{backend.synth_command(run, voice, self.rate, out)}"
+                         f" && mv {shlex.quote(out)} {shlex.quote(str(path))}")
+            else:
+                out = f"/tmp/voice-tts-{os.getpid()}-{next(self._scratch)}.wav"
+                synth = backend.synth_command(run, voice, self.rate, out)
+            target = str(path) if path is not None else out
+            background.append(f"({synth}) & p{i}=$!")
+            playback.append(f"wait $p{i} && {shlex.join([*self.player, target])}")
+            cleanup.append(shlex.quote(out))
+
+        script = "; ".join(background + playback)
+        if cleanup:
+            script += f"; rm -f {' '.join(cleanup)}"
+        return ["sh", "-c", script]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python tts.py \"text to speak\"", file=sys.stderr)
+        sys.exit(1)
+
+    engine = TTSEngine(load_config())
+    if engine.backend is None:
+        print("Error: no TTS backend found (install espeak-ng or piper)", file=sys.stderr)
+        sys.exit(1)
+
+    cmd = engine.command(" ".join(sys.argv[1:]))
+    if cmd is None:
+        print("Error: no audio player found (install alsa-utils or pulseaudio-utils)", file=sys.stderr)
+        sys.exit(1)
+    print(f"Backend: {engine.backend.name} (cache {'hit' if engine.cache_hits else 'miss'})")
+    sys.exit(subprocess.run(cmd).returncode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Energy-based voice activity detection for voice-assistant plugin.
+
+Classifies 16-bit PCM frames as speech or silence from frame RMS and
+zero-crossing rate (ZCR):
+- speech if RMS >= silence_threshold
+- or if RMS >= silence_threshold / 2 and ZCR >= zcr_threshold
+  (quiet unvoiced consonants such as "s" or "ㅅ" cross zero often)
+
+Used to stop recording after a trailing-silence window and to trim
+leading/trailing silence from the saved audio.
+"""
+
+import numpy as np
+
+FRAME_MS = 30
+SAMPLE_WIDTH = 2  # 16-bit
+
+
+def frame_features(pcm: bytes, frame_len: int, channels: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame RMS and zero-crossing rate of interleaved 16-bit PCM.
+
+    Returns two arrays with one value per complete frame.
+    """
+    samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % (SAMPLE_WIDTH * channels)], dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    n_frames = len(samples) // frame_len
+    frames = samples[:n_frames * frame_len].astype(np.float32).reshape(n_frames, frame_len)
+
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return rms, zcr
+
+
+class EnergyVAD:
+    """Streaming speech/silence detector with trailing-silence auto-stop."""
+
+    def __init__(self, sample_rate: int, channels: int = 1,
+                 silence_threshold: float = 500, zcr_threshold: float = 0.25,
+                 trailing_silence_ms: int = 1200, trim_padding_ms: int = 150) -> None:
+        self.channels = channels
+        self.frame_len = sample_rate * FRAME_MS // 1000
+        self.frame_bytes = self.frame_len * SAMPLE_WIDTH * channels
+        self.silence_threshold = silence_threshold
+        self.zcr_threshold = zcr_threshold
+        self.trailing_frames = max(1, trailing_silence_ms // FRAME_MS)
+        self.padding_frames = trim_padding_ms // FRAME_MS
+        self.heard_speech = False
+        self.last_speech = False
+        self._silent_run = 0
+
+    @classmethod
+    def from_config(cls, recording_config: dict) -> "EnergyVAD":
+        return cls(
+            recording_config.get('sample_rate', 16000),
+            channels=recording_config.get('channels', 1),
+            silence_threshold=recording_config.get('silence_threshold', 500),
+            zcr_threshold=recording_config.get('zcr_threshold', 0.25),
+            trailing_silence_ms=recording_config.get('trailing_silence_ms', 1200),
+            trim_padding_ms=recording_config.get('trim_padding_ms', 150),
+        )
+
+    def speech_mask(self, pcm: bytes) -> np.ndarray:
+        """Boolean speech flag per complete frame of pcm."""
+        rms, zcr = frame_features(pcm, self.frame_len, self.channels)
+        loud = rms >= self.silence_threshold
+        fricative = (rms >= self.silence_threshold / 2) & (zcr >= self.zcr_threshold)
+        return loud | fricative
+
+    def is_speech(self, frame: bytes) -> bool:
+        mask = self.speech_mask(frame)
+        return bool(mask.any())
+
+    def update(self, frame: bytes) -> bool:
+        """Feed one frame; returns True once speech has been followed by
+        the trailing-silence window (time to stop recording)."""
+        self.last_speech = self.is_speech(frame)
+        if self.last_speech:
+            self.heard_speech = True
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+        return self.heard_speech and self._silent_run >= self.trailing_frames
+
+    def trim(self, pcm: bytes) -> bytes:
+        """Cut leading and trailing silence, keeping trim_padding_ms around
+        speech. Returns pcm unchanged if no speech is found."""
+        speech = np.flatnonzero(self.speech_mask(pcm))
+        if len(speech) == 0:
+            return pcm
+        first = max(0, speech[0] - self.padding_frames)
+        last = speech[-1] + 1 + self.padding_frames
+        return pcm[first * self.frame_bytes:last * self.frame_bytes]
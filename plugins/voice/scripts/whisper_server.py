@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Warm whisper.cpp server for voice-assistant plugin.
+
+Keeps whisper models resident in local `whisper-server` processes so
+each utterance skips the model load that dominates CLI latency. With
+stt.routing enabled, the small model for short clips gets its own
+server next to the large one (the warm model pool).
+
+Usage:
+    python whisper_server.py start     # Start the pool in background and wait until ready
+    python whisper_server.py stop
+    python whisper_server.py status
+
+Audio is sent to the server's /inference endpoint over HTTP on localhost.
+"""
+
+import argparse
+import fcntl
+import json
+import math
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from config_loader import expand_path, load_config
+
+# Per-user pid/log directory (not shared /tmp, where other users could plant pid files)
+RUN_DIR = (Path(os.environ["XDG_RUNTIME_DIR"]) / "voice-assistant"
+           if os.environ.get("XDG_RUNTIME_DIR")
+           else Path.home() / ".cache" / "voice-assistant" / "run")
+
+# Servers started by this process, by port (polled to reap early exits)
+_launched: dict[int, subprocess.Popen] = {}
+
+
+class ServerUnavailable(RuntimeError):
+    """The whisper server is not running or did not answer."""
+
+
+def server_settings(config: dict) -> dict:
+    """Return stt.server settings merged over defaults."""
+    stt_config = config.get('stt', {})
+    settings = {
+        "binary": "whisper-server",
+        "host": "127.0.0.1",
+        "port": 8178,
+        "threads": 4,
+        "auto_start": True,
+        "start_timeout": 60,
+        "request_timeout": 60,
+        "model": stt_config.get('whisper_model', '~/.whisper/ggml-large-v3-turbo.bin'),
+    }
+    settings.update(stt_config.get('server', {}))
+    return settings
+
+
+def routing_settings(config: dict) -> dict:
+    """Return stt.routing settings merged over defaults."""
+    settings = {
+        "enabled": True,
+        "short_model": "~/.whisper/ggml-base.bin",
+        "short_max_seconds": 5.0,
+        "min_confidence": 0.5,
+        "short_port": 8179,
+    }
+    settings.update(config.get('stt', {}).get('routing', {}))
+    return settings
+
+
+def short_model_settings(config: dict) -> dict | None:
+    """Server settings for the routed short-clip model, or None if routing
+    is off or the model has not been downloaded."""
+    routing = routing_settings(config)
+    if not routing['enabled'] or not Path(expand_path(routing['short_model'])).exists():
+        return None
+    return {**server_settings(config), "model": routing['short_model'],
+            "port": routing['short_port']}
+
+
+def server_pool(config: dict) -> list[dict]:
+    """Settings for every resident server: the short model (if routed) and the main model."""
+    short = short_model_settings(config)
+    return ([short] if short else []) + [server_settings(config)]
+
+
+def base_url(settings: dict) -> str:
+    return f"http://{settings['host']}:{settings['port']}"
+
+
+def pid_file(settings: dict) -> Path:
+    return RUN_DIR / f"voice-whisper-server-{settings['port']}.pid"
+
+
+def log_file(settings: dict) -> Path:
+    return RUN_DIR / f"voice-whisper-server-{settings['port']}.log"
+
+
+def lock_file(settings: dict) -> Path:
+    return RUN_DIR / f"voice-whisper-server-{settings['port']}.lock"
+
+
+def command_line(pid: int) -> str | None:
+    """Command line of a running process (/proc on Linux, ps elsewhere)."""
+    try:
+        return Path(f"/proc/{pid}/cmdline").read_bytes().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        pass
+    try:
+        result = subprocess.run(["ps", "-p", str(pid), "-o", "command="],
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def read_pid(settings: dict) -> int | None:
+    """Pid from the pid file if that process is still this port's whisper-server.
+
+    A pid file left by a crashed server may name an unrelated process that
+    reused the pid; such a file is removed instead of trusted.
+    """
+    path = pid_file(settings)
+    try:
+        pid = int(path.read_text().strip())
+    except (OSError, ValueError):
+        return None
+    cmd = command_line(pid)
+    if (cmd is None or Path(settings['binary']).name not in cmd
+            or f"--port {settings['port']}" not in cmd):
+        path.unlink(missing_ok=True)
+        return None
+    return pid
+
+
+def is_listening(settings: dict, timeout: float = 0.2) -> bool:
+    """Check whether the server port accepts connections."""
+    try:
+        with socket.create_connection((settings['host'], settings['port']), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def start_server(settings: dict, wait: bool = True) -> int | None:
+    """Start the server in the background; returns its pid, or None if a
+    server this tool did not launch already listens on the port.
+
+    With wait=True, blocks until the port accepts connections (the model is
+    loaded before whisper-server starts listening), also when the server
+    was already launched without waiting.
+    """
+    pid = read_pid(settings)
+    if pid is None:
+        pid = _launch(settings)
+    if wait:
+        wait_ready(settings)
+    return pid
+
+
+def _launch(settings: dict) -> int | None:
+    """Launch whisper-server unless one already runs on the port.
+
+    Hooks auto-start servers concurrently, so the check and the launch happen
+    under an exclusive lock: the first launcher wins and the others find its
+    pid file (or a server started outside this tool) instead of starting a
+    second server on the same port.
+    """
+    RUN_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    with open(lock_file(settings), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        pid = read_pid(settings)
+        if pid is not None:
+            return pid
+        if is_listening(settings):
+            return None
+
+        binary = shutil.which(settings['binary'])
+        if binary is None:
+            raise RuntimeError(
+                f"{settings['binary']} not found. It ships with whisper.cpp:\n"
+                "  brew install whisper-cpp"
+            )
+
+        model_path = expand_path(settings['model'])
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"Whisper model not found at: {model_path}")
+
+        cmd = [
+            binary,
+            '--model', model_path,
+            '--host', settings['host'],
+            '--port', str(settings['port']),
+            '--threads', str(settings['threads']),
+        ]
+        with open(log_file(settings), "ab") as log:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True
+            )
+        # Written whole before the lock is released, so readers never see a partial pid
+        tmp = pid_file(settings).with_suffix(".tmp")
+        tmp.write_text(str(proc.pid))
+        tmp.replace(pid_file(settings))
+        _launched[settings['port']] = proc
+        return proc.pid
+
+
+def wait_ready(settings: dict) -> None:
+    """Block until the server accepts connections."""
+    deadline = time.monotonic() + settings['start_timeout']
+    proc = _launched.get(settings['port'])
+    while not is_listening(settings):
+        if (proc.poll() is not None) if proc else read_pid(settings) is None:
+            pid_file(settings).unlink(missing_ok=True)
+            raise RuntimeError(f"whisper-server exited during startup (see {log_file(settings)})")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"whisper-server not ready after {settings['start_timeout']}s")
+        time.sleep(0.1)
+
+
+def stop_server(settings: dict) -> bool:
+    """Stop the background server; returns False if it was not running."""
+    pid = read_pid(settings)
+    pid_file(settings).unlink(missing_ok=True)
+    if pid is None:
+        return False
+    os.kill(pid, signal.SIGTERM)
+    return True
+
+
+def _multipart(fields: dict[str, str], file_field: str, filename: str,
+               data: bytes) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            f'{value}\r\n'.encode()
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+        f'filename="{filename}"\r\nContent-Type: audio/wav\r\n\r\n'.encode()
+    )
+    parts.append(data)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _inference(audio: str | bytes, settings: dict, response_format: str) -> dict:
+    if isinstance(audio, bytes):
+        filename, data = "audio.wav", audio
+    else:
+        filename, data = Path(audio).name, Path(audio).read_bytes()
+
+    body, content_type = _multipart(
+        {"response_format": response_format, "temperature": "0.0"},
+        "file", filename, data
+    )
+    request = urllib.request.Request(
+        f"{base_url(settings)}/inference",
+        data=body,
+        headers={"Content-Type": content_type},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=settings['request_timeout']) as response:
+            payload = json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(f"whisper-server failed: HTTP {e.code}") from e
+    except (urllib.error.URLError, ConnectionError, socket.timeout) as e:
+        raise ServerUnavailable(f"whisper-server unavailable at {base_url(settings)}: {e}") from e
+
+    if "error" in payload:
+        raise RuntimeError(f"whisper-server failed: {payload['error']}")
+    return payload
+
+
+def transcribe_with_server(audio: str | bytes, settings: dict) -> str:
+    """
+    Transcribe audio via a running whisper server.
+
+    Args:
+        audio: Path to audio file (WAV), or WAV bytes
+        settings: Server settings from server_settings()
+
+    Returns:
+        Transcribed text
+
+    Raises:
+        ServerUnavailable: If the server is not reachable
+    """
+    return _inference(audio, settings, "json").get("text", "").strip()
+
+
+def transcribe_with_confidence(audio: str | bytes, settings: dict) -> tuple[str, float | None]:
+    """
+    Transcribe audio via a running whisper server and score the result.
+
+    Confidence is exp(mean segment avg_logprob) from the verbose_json
+    response, in 0..1; None if the server does not report log-probs.
+
+    Args:
+        audio: Path to audio file (WAV), or WAV bytes
+        settings: Server settings from server_settings()
+
+    Returns:
+        (transcribed text, confidence)
+
+    Raises:
+        ServerUnavailable: If the server is not reachable
+    """
+    payload = _inference(audio, settings, "verbose_json")
+    logprobs = [seg["avg_logprob"] for seg in payload.get("segments", [])
+                if "avg_logprob" in seg]
+    confidence = math.exp(sum(logprobs) / len(logprobs)) if logprobs else None
+    return payload.get("text", "").strip(), confidence
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the warm whisper server")
+    parser.add_argument('action', choices=['start', 'stop', 'status'])
+
+    args = parser.parse_args()
+    pool = server_pool(load_config())
+
+    try:
+        if args.action == 'start':
+            # Launch every model first, then wait, so the loads overlap
+            for settings in pool:
+                start_server(settings, wait=False)
+            for settings in pool:
+                pid = start_server(settings)
+                if pid is None:
+                    print(f"whisper-server already running at {base_url(settings)} "
+                          "(not started by this tool)")
+                    continue
+                print(f"whisper-server running (pid {pid}) at {base_url(settings)} "
+                      f"[{Path(settings['model']).name}]")
+        elif args.action == 'stop':
+            for settings in pool:
+                if stop_server(settings):
+                    print(f"whisper-server stopped at {base_url(settings)}")
+                else:
+                    print(f"whisper-server is not running at {base_url(settings)}")
+        else:
+            running = 0
+            for settings in pool:
+                pid = read_pid(settings)
+                if pid is None:
+                    if is_listening(settings):
+                        running += 1
+                        print(f"whisper-server ready at {base_url(settings)} "
+                              "(not started by this tool)")
+                    else:
+                        print(f"whisper-server is not running at {base_url(settings)}")
+                    continue
+                running += 1
+                state = "ready" if is_listening(settings) else "loading model"
+                print(f"whisper-server {state} (pid {pid}) at {base_url(settings)} "
+                      f"[{Path(settings['model']).name}]")
+            if running == 0:
+                sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Silence-aligned chunking, batch settings and lazy chunk loading on synthetic PCM."""
+
+import wave
+
+import numpy as np
+import pytest
+
+import batch
+
+RATE = 16000
+FRAME_BYTES = RATE * batch.FRAME_MS // 1000 * batch.SAMPLE_WIDTH
+
+
+def tone(seconds, channels=1, amplitude=8000):
+    t = np.arange(int(seconds * RATE)) / RATE
+    samples = (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    return np.repeat(samples, channels).tobytes()
+
+
+def silence(seconds, channels=1):
+    return b"\0\0" * int(seconds * RATE) * channels
+
+
+def write_wav(path, pcm, channels=1):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(batch.SAMPLE_WIDTH)
+        f.setframerate(RATE)
+        f.writeframes(pcm)
+    return str(path)
+
+
+# ─── split_at_silence ──────────────────────────────────────
+
+@pytest.mark.parametrize("channels", [1, 2])
+def test_cuts_in_the_pause_before_the_target(channels):
+    pcm = tone(3.9, channels) + silence(0.3, channels) + tone(4.8, channels)
+    spans = batch.split_at_silence(pcm, RATE, channels, chunk_seconds=5, search_seconds=2)
+    assert spans == [(0, 130 * FRAME_BYTES * channels), (130 * FRAME_BYTES * channels, len(pcm))]
+
+
+def test_spans_cover_the_audio_at_frame_boundaries():
+    pcm = b"".join(tone(2.5) + silence(0.5) for _ in range(6))
+    spans = batch.split_at_silence(pcm, RATE, 1, chunk_seconds=4, search_seconds=2)
+    assert len(spans) > 2
+    assert spans[0][0] == 0 and spans[-1][1] == len(pcm)
+    assert all(end == start for (_, end), (start, _) in zip(spans, spans[1:]))
+    assert all(start % FRAME_BYTES == 0 for start, _ in spans)
+    for start, _ in spans[1:]:
+        # Every cut lands in a pause (3 s period, the last 0.5 s silent)
+        assert (start / (RATE * 2)) % 3 >= 2.5
+
+
+@pytest.mark.parametrize("seconds", [0, 4, 6.9])
+def test_short_audio_is_one_span(seconds):
+    # Up to chunk_seconds + search_seconds stays whole
+    pcm = tone(seconds)
+    assert batch.split_at_silence(pcm, RATE, 1, chunk_seconds=5, search_seconds=2) == [(0, len(pcm))]
+
+
+# ─── batch_settings ────────────────────────────────────────
+
+@pytest.mark.parametrize("workers,expected,warns", [
+    ("auto", 2, False), (3, 3, False), ("3", 3, False),
+    ("two", 2, True), (0, 2, True), (-1, 2, True), (None, 2, True),
+])
+def test_workers(monkeypatch, capsys, workers, expected, warns):
+    monkeypatch.setattr(batch.os, "cpu_count", lambda: 8)
+    settings = batch.batch_settings({"stt": {"batch": {"workers": workers}}})
+    assert settings["workers"] == expected
+    assert settings["threads"] == 8 // expected
+    assert ("stt.batch.workers" in capsys.readouterr().err) is warns
+
+
+# ─── load_chunks / transcribe_batch ────────────────────────
+
+def test_files_are_decoded_as_chunks_are_taken(tmp_path, monkeypatch):
+    files = [write_wav(tmp_path / f"{i}.wav", tone(1) + silence(0.5) + tone(1.5)) for i in range(3)]
+    opened = []
+    real_open = batch.wave.open
+
+    def tracking_open(f, mode):
+        if isinstance(f, str):  # encode_wav writes to BytesIO
+            opened.append(f)
+        return real_open(f, mode)
+
+    monkeypatch.setattr(batch.wave, "open", tracking_open)
+
+    chunks = batch.load_chunks(files, {"chunk_seconds": 1.5, "search_seconds": 1})
+    first = next(chunks)
+    assert opened == files[:1]
+    assert (first.file_index, first.start) == (0, 0.0)
+
+    rest = list(chunks)
+    assert opened == files
+    assert [c.file_index for c in [first, *rest]] == [0, 0, 1, 1, 2, 2]
+
+
+def test_transcribe_batch(tmp_path, monkeypatch):
+    files = [write_wav(tmp_path / "a.wav", tone(2) + silence(0.6) + tone(2)),
+             write_wav(tmp_path / "b.wav", tone(1.5, 2), channels=2)]
+    monkeypatch.setattr(batch, "transcribe",
+                        lambda wav, provider, config, threads: f" {len(wav)} ")
+    config = {"stt": {"batch": {"chunk_seconds": 2.5, "search_seconds": 1, "workers": 2}}}
+
+    chunks, total = batch.transcribe_batch(files, None, config)
+    assert total == pytest.approx(6.1)
+    assert [c.file_index for c in chunks] == [0, 0, 1]
+    assert all(c.text.isdigit() and c.wav == b"" for c in chunks)
+    assert chunks[0].end == chunks[1].start
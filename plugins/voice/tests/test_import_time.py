@@ -0,0 +1,45 @@
+"""The disabled hook stays on the stdlib-only path (python -X importtime)."""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+from bench import IMPORT_BUDGET_MS, SCRIPTS_DIR, hook_import_ms
+from config_loader import get_default_config
+
+HEAVY = ("asyncio", "claude_agent_sdk", "numpy")
+HOOK_INPUT = '{"hook_event_name": "Test"}'
+
+
+@pytest.fixture
+def env(tmp_path):
+    config = get_default_config()
+    config['tts']['enabled'] = False
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config))
+    return {**os.environ, "HOME": str(tmp_path), "VOICE_ASSISTANT_CONFIG": str(path)}
+
+
+def imported_modules(env: dict) -> list[str]:
+    result = subprocess.run([sys.executable, "-X", "importtime", str(SCRIPTS_DIR / "speak.py")],
+                            env=env, input=HOOK_INPUT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return [line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "cumulative" not in line]
+
+
+def test_disabled_hook_skips_heavy_imports(env):
+    modules = imported_modules(env)
+    assert "config_loader" in modules
+    heavy = [m for m in modules if m.split(".")[0] in HEAVY]
+    assert not heavy, f"disabled hook imported {heavy}"
+
+
+def test_disabled_hook_import_budget(env):
+    # Median of a few runs, so one slow start on a busy machine does not fail it
+    ms = statistics.median(hook_import_ms(env) for _ in range(3))
+    assert ms <= IMPORT_BUDGET_MS, f"disabled-hook imports took {ms:.1f} ms"
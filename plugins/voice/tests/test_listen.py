@@ -0,0 +1,66 @@
+"""PauseSegmenter fed by EnergyVAD on synthetic PCM."""
+
+import numpy as np
+import pytest
+
+from listen import PauseSegmenter
+from vad import FRAME_MS, EnergyVAD
+
+RATE = 16000
+FRAME_BYTES = RATE * FRAME_MS // 1000 * 2
+
+
+def tone(ms, amplitude=8000):
+    t = np.arange(RATE * ms // 1000) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+
+
+def silence(ms):
+    return b"\0\0" * (RATE * ms // 1000)
+
+
+def segments(pcm, segmenter):
+    """Feed pcm frame by frame, like listen() does; the last segment comes from flush()."""
+    vad = EnergyVAD(RATE)
+    out = []
+    for offset in range(0, len(pcm) - FRAME_BYTES + 1, FRAME_BYTES):
+        frame = pcm[offset:offset + FRAME_BYTES]
+        segment = segmenter.feed(frame, vad.is_speech(frame))
+        if segment is not None:
+            out.append(segment)
+    tail = segmenter.flush()
+    return out + ([tail] if tail is not None else [])
+
+
+def test_cuts_after_a_pause():
+    pcm = tone(1500) + silence(600) + tone(1500) + silence(600)
+    first, second = segments(pcm, PauseSegmenter(pause_ms=300))
+    # The first segment ends with the pause that closed it; the rest of the pause leads the second
+    assert first == pcm[:len(tone(1500) + silence(300))]
+    assert first + second == pcm[:-len(silence(300))]  # the trailing pause holds no speech
+
+
+def test_short_speech_waits_for_min_segment():
+    pcm = tone(300) + silence(450) + tone(900) + silence(600)
+    (segment,) = segments(pcm, PauseSegmenter(pause_ms=300, min_segment_ms=1000))
+    assert segment.startswith(tone(300) + silence(450) + tone(900))
+
+
+def test_long_speech_is_cut_at_max_segment():
+    pcm = tone(7000)
+    cut = segments(pcm, PauseSegmenter(max_segment_ms=3000))
+    assert [len(s) // FRAME_BYTES for s in cut] == [100, 100, 33]
+    assert b"".join(cut) == pcm[:len(pcm) // FRAME_BYTES * FRAME_BYTES]
+
+
+@pytest.mark.parametrize("pcm", [silence(3000), tone(3000, amplitude=100)], ids=["silence", "hum"])
+def test_segments_without_speech_are_dropped(pcm):
+    assert segments(pcm, PauseSegmenter()) == []
+
+
+def test_silence_between_utterances_is_dropped():
+    pcm = tone(1200) + silence(2100) + tone(1200) + silence(300)
+    first, second = segments(pcm, PauseSegmenter(pause_ms=300, min_segment_ms=1000))
+    assert first == tone(1200) + silence(300)
+    # min_segment_ms (33 frames) of the gap went out as a speechless segment; the rest leads the next
+    assert second == silence(810) + tone(1200) + silence(300)
@@ -0,0 +1,122 @@
+"""The OpenAI STT provider against a stand-in /v1/audio/transcriptions server."""
+
+import http.server
+import json
+import re
+import threading
+
+import pytest
+
+import transcribe
+from transcribe import encode_wav
+
+pytest.importorskip("openai")
+
+WAV = encode_wav(b"\0\0" * 16000, 16000)  # 1 s of silence
+
+
+class FakeTranscriptions(http.server.BaseHTTPRequestHandler):
+    """Answers the first self.server.failures requests with 503, then with a transcript."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.requests.append((self.path, body))
+            fail = len(server.requests) <= server.failures
+        if fail:
+            payload, status = b'{"error": {"message": "overloaded"}}', 503
+        else:
+            payload, status = json.dumps({"text": "hello there"}).encode(), 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("retry-after-ms", "10")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(transcribe, "_openai_clients", {})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeTranscriptions)
+    server.lock = threading.Lock()
+    server.connections, server.requests, server.failures = set(), [], 0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def openai_config(server, upload_format="wav", max_retries=3):
+    return {"stt": {"openai": {"base_url": f"http://127.0.0.1:{server.server_port}/v1",
+                               "upload_format": upload_format, "max_retries": max_retries,
+                               "timeout": 5}}}
+
+
+def uploaded_filename(body: bytes) -> str:
+    return re.search(rb'name="file"; filename="([^"]+)"', body).group(1).decode()
+
+
+def test_transcribes_through_the_api(api):
+    assert transcribe.transcribe_with_openai(WAV, openai_config(api)) == "hello there"
+    [(path, body)] = api.requests
+    assert path == "/v1/audio/transcriptions"
+    assert b'name="model"\r\n\r\nwhisper-1' in body
+    assert WAV in body
+
+
+def test_retries_after_503(api):
+    api.failures = 2
+    assert transcribe.transcribe_with_openai(WAV, openai_config(api)) == "hello there"
+    assert len(api.requests) == 3
+
+
+def test_gives_up_after_max_retries(api):
+    import openai
+
+    api.failures = 10
+    with pytest.raises(openai.InternalServerError):
+        transcribe.transcribe_with_openai(WAV, openai_config(api, max_retries=1))
+    assert len(api.requests) == 2
+
+
+def test_one_pooled_client_and_connection(api):
+    config = openai_config(api)
+    for _ in range(3):
+        assert transcribe.transcribe_with_openai(WAV, config) == "hello there"
+    assert len(transcribe._openai_clients) == 1
+    assert len(api.requests) == 3
+    assert len(api.connections) == 1
+
+
+def test_missing_encoder_uploads_wav(api, monkeypatch, capsys):
+    monkeypatch.setitem(transcribe.UPLOAD_ENCODERS, "flac",
+                        (["no-such-flac-encoder", "-"], "audio.flac"))
+    assert transcribe.transcribe_with_openai(WAV, openai_config(api, "flac")) == "hello there"
+    [(_, body)] = api.requests
+    assert uploaded_filename(body) == "audio.wav"
+    assert WAV in body
+    assert "no-such-flac-encoder not found" in capsys.readouterr().err
+
+
+def test_failing_encoder_uploads_wav(api, monkeypatch):
+    monkeypatch.setitem(transcribe.UPLOAD_ENCODERS, "flac", (["false"], "audio.flac"))
+    transcribe.transcribe_with_openai(WAV, openai_config(api, "flac"))
+    [(_, body)] = api.requests
+    assert uploaded_filename(body) == "audio.wav"
+
+
+def test_encoder_output_is_uploaded(api, monkeypatch):
+    # `cat` stands in for the encoder: its output is what gets uploaded, under the encoder's name
+    monkeypatch.setitem(transcribe.UPLOAD_ENCODERS, "flac", (["cat"], "audio.flac"))
+    transcribe.transcribe_with_openai(WAV, openai_config(api, "flac"))
+    [(_, body)] = api.requests
+    assert uploaded_filename(body) == "audio.flac"
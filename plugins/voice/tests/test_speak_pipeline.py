@@ -0,0 +1,111 @@
+"""Streamed Haiku summary vs. extractive fallback, with the Agent SDK stubbed."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import speak_pipeline
+from summarizer import extractive_summary, split_sentences
+
+LONG_TEXT = (
+    "I refactored the deployment script so that it reads the target "
+    "environment from the config file. The tests for the staging and "
+    "production paths now pass. I also removed the unused helper functions "
+    "and updated the README with the new flags."
+)
+EXTRACTIVE = split_sentences(extractive_summary(LONG_TEXT))
+
+
+class RecordingPipeline:
+    """Stands in for SpeechPipeline: records sentences instead of speaking."""
+
+    instances: list["RecordingPipeline"] = []
+
+    def __init__(self, config, timer=None):
+        self.spoken: list[str] = []
+        self.sentences = 0
+        self.first_audio_at = None
+        self.closed = False
+        self.engine = SimpleNamespace(prune_cache=lambda: None, backend=None,
+                                      cache_hits=0, cache_misses=0)
+        RecordingPipeline.instances.append(self)
+
+    def put(self, sentence):
+        self.sentences += 1
+        self.spoken.append(sentence)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def spoken(monkeypatch):
+    RecordingPipeline.instances = []
+    monkeypatch.setattr(speak_pipeline, "SpeechPipeline", RecordingPipeline)
+
+    def run(config):
+        asyncio.run(speak_pipeline.speak_streaming(LONG_TEXT, config))
+        [pipeline] = RecordingPipeline.instances
+        assert pipeline.closed
+        return pipeline.spoken
+    return run
+
+
+def stub_stream(monkeypatch, *deltas, delay=0.0, error=None):
+    async def fake_stream(text):
+        for delta in deltas:
+            await asyncio.sleep(delay)
+            yield delta
+        if error is not None:
+            raise error
+    monkeypatch.setattr(speak_pipeline, "stream_summary_with_haiku", fake_stream)
+
+
+def config(**tts):
+    return {"tts": {"summarizer": "haiku", "summary_deadline": 1.0, **tts}}
+
+
+def test_streamed_haiku_sentences_are_spoken_in_order(monkeypatch, spoken):
+    stub_stream(monkeypatch, "Deploy script now ", "reads the config. ",
+                "Tests pass", " and the README is updated.")
+    assert spoken(config()) == ["Deploy script now reads the config.",
+                                "Tests pass and the README is updated."]
+
+
+def test_deadline_falls_back_to_extractive_summary(monkeypatch, spoken):
+    stub_stream(monkeypatch, "Too late.", delay=1.0)
+    assert EXTRACTIVE
+    assert spoken(config(summary_deadline=0.05)) == EXTRACTIVE
+
+
+def test_sdk_error_falls_back_to_extractive_summary(monkeypatch, spoken):
+    stub_stream(monkeypatch, error=RuntimeError("CLI not found"))
+    assert spoken(config()) == EXTRACTIVE
+
+
+def test_partial_stream_before_deadline_is_kept(monkeypatch, spoken):
+    # A sentence already spoken is not repeated by the fallback
+    async def fake_stream(text):
+        yield "Deploy script now reads the config. "
+        await asyncio.sleep(1.0)
+        yield "Never spoken."
+    monkeypatch.setattr(speak_pipeline, "stream_summary_with_haiku", fake_stream)
+    assert spoken(config(summary_deadline=0.1)) == ["Deploy script now reads the config."]
+
+
+def test_extractive_summarizer_skips_the_sdk(monkeypatch, spoken):
+    def no_sdk(text):
+        raise AssertionError("Haiku must not be called")
+    monkeypatch.setattr(speak_pipeline, "stream_summary_with_haiku", no_sdk)
+    assert spoken(config(summarizer="extractive")) == EXTRACTIVE
+
+
+def test_summarize_with_haiku_deadline(monkeypatch):
+    stub_stream(monkeypatch, "Too late.", delay=1.0)
+    assert asyncio.run(speak_pipeline.summarize_with_haiku(LONG_TEXT, 0.05)) == extractive_summary(LONG_TEXT)
+
+
+def test_summarize_with_haiku_collects_stream(monkeypatch):
+    stub_stream(monkeypatch, "Deploy script ", "updated.")
+    assert asyncio.run(speak_pipeline.summarize_with_haiku(LONG_TEXT, 1.0)) == "Deploy script updated."
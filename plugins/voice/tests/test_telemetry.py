@@ -0,0 +1,20 @@
+"""Log and telemetry file locations."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS = Path(__file__).parent.parent / "scripts"
+
+
+def test_paths_follow_the_environment(tmp_path):
+    env = {"VOICE_ASSISTANT_LOG": str(tmp_path / "hook.log"),
+           "VOICE_ASSISTANT_TELEMETRY": str(tmp_path / "telemetry.jsonl")}
+    code = ("import telemetry\n"
+            "telemetry.get_logger().info('hello')\n"
+            "telemetry.EventTimer('Test').write()\n")
+    subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS, env=env, check=True)
+    assert "hello" in (tmp_path / "hook.log").read_text()
+    [record] = map(json.loads, (tmp_path / "telemetry.jsonl").read_text().splitlines())
+    assert record["event"] == "Test"
@@ -0,0 +1,91 @@
+"""TranscriptCache: in-memory LRU, disk hits across instances, pruning; keyed on synthetic PCM."""
+
+import os
+
+import numpy as np
+import pytest
+
+import transcribe
+from transcribe import TranscriptCache, encode_wav
+
+
+def clip(hz, seconds=0.5, rate=16000):
+    t = np.arange(int(seconds * rate)) / rate
+    return encode_wav((8000 * np.sin(2 * np.pi * hz * t)).astype(np.int16).tobytes(), rate)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "stt"
+
+
+def test_key_depends_on_audio_provider_and_model():
+    a, b = clip(220), clip(440)
+    keys = {TranscriptCache.key(a, "whisper-cpp", "base"), TranscriptCache.key(b, "whisper-cpp", "base"),
+            TranscriptCache.key(a, "openai", "base"), TranscriptCache.key(a, "whisper-cpp", "small")}
+    assert len(keys) == 4
+    assert TranscriptCache.key(a, "whisper-cpp", "base") == TranscriptCache.key(clip(220), "whisper-cpp", "base")
+
+
+def test_memory_lru_evicts_the_least_recently_used(cache_dir):
+    cache = TranscriptCache(str(cache_dir), max_entries=10, memory_entries=2)
+    k1, k2, k3 = (TranscriptCache.key(clip(hz)) for hz in (220, 330, 440))
+    cache.put(k1, "one")
+    cache.put(k2, "two")
+    assert cache.get(k1) == "one"          # k1 is now the most recent
+    cache.put(k3, "three")                 # evicts k2 from memory
+    assert list(cache._memory) == [k1, k3]
+
+    # k2 is still on disk: a hit that moves it back into memory
+    assert cache.get(k2) == "two"
+    assert list(cache._memory) == [k3, k2]
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_disk_hit_from_another_instance(cache_dir):
+    key = TranscriptCache.key(clip(220), "whisper-cpp", "base")
+    TranscriptCache(str(cache_dir), max_entries=10).put(key, "hello")
+
+    cache = TranscriptCache(str(cache_dir), max_entries=10)
+    assert cache.get(TranscriptCache.key(clip(440), "whisper-cpp", "base")) is None
+    assert cache.get(key) == "hello"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not list(cache_dir.glob("*.tmp"))
+
+
+def test_disk_keeps_the_most_recently_used(cache_dir):
+    writer = TranscriptCache(str(cache_dir), max_entries=2, memory_entries=0)
+    keys = [TranscriptCache.key(clip(hz)) for hz in (220, 330, 440)]
+    for age, key in enumerate(keys[:2]):
+        writer.put(key, key)
+        os.utime(cache_dir / f"{key}.txt", (1000 + age, 1000 + age))
+    assert writer.get(keys[0]) == keys[0]  # refreshes its mtime
+    writer.put(keys[2], keys[2])
+    assert sorted(p.stem for p in cache_dir.glob("*.txt")) == sorted([keys[0], keys[2]])
+
+
+def test_transcribe_runs_each_clip_once(cache_dir, monkeypatch):
+    monkeypatch.setattr(transcribe, "_transcript_cache", None)
+    calls = []
+    monkeypatch.setattr(transcribe, "_transcribe_uncached",
+                        lambda audio, provider, config, threads: calls.append(audio) or f"{len(calls)}")
+    config = {"stt": {"provider": "whisper-server", "cache": {"dir": str(cache_dir)}}}
+
+    assert [transcribe.transcribe(clip(hz), config=config) for hz in (220, 440, 220)] == ["1", "2", "1"]
+    assert calls == [clip(220), clip(440)]
+
+    # A new process starts with an empty memory cache but finds the disk entry
+    monkeypatch.setattr(transcribe, "_transcript_cache", None)
+    assert transcribe.transcribe(clip(440), config=config) == "2"
+    assert len(calls) == 2
+
+
+def test_empty_transcripts_are_not_cached(cache_dir, monkeypatch):
+    monkeypatch.setattr(transcribe, "_transcript_cache", None)
+    calls = []
+    monkeypatch.setattr(transcribe, "_transcribe_uncached",
+                        lambda audio, provider, config, threads: calls.append(audio) or " ")
+    config = {"stt": {"provider": "whisper-server", "cache": {"dir": str(cache_dir)}}}
+    transcribe.transcribe(clip(220), config=config)
+    transcribe.transcribe(clip(220), config=config)
+    assert len(calls) == 2
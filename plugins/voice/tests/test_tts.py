@@ -0,0 +1,124 @@
+"""Backend selection and per-language voice fallback."""
+
+import logging
+
+import pytest
+
+import tts
+
+
+@pytest.fixture
+def installed(monkeypatch):
+    """Pretend only the given binaries are on PATH."""
+    def install(*binaries):
+        monkeypatch.setattr(tts.shutil, "which",
+                            lambda name: f"/usr/bin/{name}" if name in binaries else None)
+    return install
+
+
+def engine(**tts_config):
+    return tts.TTSEngine({"tts": {"cache": {"enabled": False}, **tts_config}})
+
+
+def test_backend_must_implement_synth_command():
+    class Incomplete(tts.TTSBackend):
+        name = binary = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_unknown_backend_warns_and_uses_auto(installed, caplog):
+    installed("espeak-ng", "aplay")
+    with caplog.at_level(logging.WARNING, logger="voice-assistant"):
+        assert engine(backend="espeek").backend.name == "espeak-ng"
+    assert "Unknown TTS backend 'espeek'" in caplog.text
+
+
+def test_piper_korean_falls_back_to_espeak(installed):
+    installed("piper", "espeak-ng", "aplay")
+    e = engine(backend="piper")
+    assert e.speaker("en") == (e.backend, "~/.piper/en_US-lessac-medium.onnx")
+    backend, voice = e.speaker("ko")
+    assert (backend.name, voice) == ("espeak-ng", "ko")
+    assert e.command("빌드가 끝났습니다")[:3] == ["espeak-ng", "-v", "ko"]
+
+
+def test_piper_korean_voice_when_configured(installed):
+    installed("piper", "espeak-ng", "aplay")
+    e = engine(backend="piper", backends={"piper": {"voice_ko": "~/.piper/ko.onnx"}})
+    assert e.speaker("ko") == (e.backend, "~/.piper/ko.onnx")
+
+
+def test_no_korean_backend_uses_other_voice(installed):
+    installed("piper", "aplay")
+    e = engine(backend="piper")
+    assert e.speaker("ko") == (e.backend, "~/.piper/en_US-lessac-medium.onnx")
+
+
+# ─── Language runs ─────────────────────────────────────────
+
+@pytest.mark.parametrize("text,runs", [
+    ("", [("en", "")]),
+    ("   ", [("en", "   ")]),
+    ("Build finished", [("en", "Build finished")]),
+    ("빌드가 끝났습니다", [("ko", "빌드가 끝났습니다")]),
+    ("git push 완료", [("en", "git push"), ("ko", " 완료")]),
+    ("안녕 hello world 안녕", [("ko", "안녕 "), ("en", "hello world"), ("ko", " 안녕")]),
+    ("pytest 3개 실패, npm install 다시!",
+     [("en", "pytest"), ("ko", " 3개 실패, "), ("en", "npm install"), ("ko", " 다시!")]),
+    ("버전 v1.2.3 배포", [("ko", "버전 "), ("en", "v1.2.3"), ("ko", " 배포")]),
+    # Short Latin words and symbols stay in the Korean run
+    ("C++ 빌드, OK?", [("ko", "C++ 빌드, OK?")]),
+    ("빌드 123 완료", [("ko", "빌드 123 완료")]),
+    # Punctuation between Latin runs joins them into one
+    ("빌드: npm test, make all 완료", [("ko", "빌드: "), ("en", "npm test, make all"), ("ko", " 완료")]),
+])
+def test_segment_runs(text, runs):
+    assert tts.segment_runs(text) == runs
+
+
+@pytest.mark.parametrize("text,korean", [
+    ("안녕", True), ("ㅋㅋ", True), ("ᄀ", True), ("abc 123", False), ("", False), ("こんにちは", False),
+])
+def test_hangul_re(text, korean):
+    assert tts.detect_korean(text) is korean
+
+
+@pytest.mark.parametrize("text,matches", [
+    ("run npm install now", ["run npm install now"]),
+    ("OK go", []),
+    ("C++ and c#", ["and"]),
+    ("v1.2.3, foo-bar", ["v1.2.3", "foo-bar"]),
+    ("don't stop", ["don't stop"]),
+    ("123 abc", ["abc"]),
+])
+def test_latin_run_re(text, matches):
+    assert tts.LATIN_RUN_RE.findall(text) == matches
+
+
+@pytest.fixture
+def stub_tts(tmp_path, monkeypatch, installed):
+    """espeak-ng and aplay stubs on PATH; aplay logs what it plays."""
+    installed("espeak-ng", "aplay")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    stubs = {"espeak-ng": 'while [ "$1" != -w ]; do shift; done; echo "$3" > "$2"\n'
+                          'echo "$3" >> "$TTS_LOG.synth"\n',
+             "aplay": 'for clip; do :; done; cat "$clip" >> "$TTS_LOG"\n'}
+    for name, body in stubs.items():
+        (bin_dir / name).write_text("#!/bin/sh\n" + body)
+        (bin_dir / name).chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{tts.os.environ['PATH']}")
+    monkeypatch.setenv("TTS_LOG", str(tmp_path / "played"))
+    return tmp_path
+
+
+def test_repeated_run_is_synthesized_once(stub_tts):
+    e = tts.TTSEngine({"tts": {"backend": "espeak-ng", "cache": {"dir": str(stub_tts / "cache")}}})
+    cmd = e.command("API 호출 중 API 오류")
+    assert e.cache_misses == 3 and e.cache_hits == 0
+    tts.subprocess.run(cmd, check=True)
+    assert (stub_tts / "played").read_text().split() == ["API", "호출", "중", "API", "오류"]
+    assert sorted((stub_tts / "played.synth").read_text().split()) == sorted(["API", "호출", "중", "오류"])
+    assert not list((stub_tts / "cache").glob("*.tmp"))
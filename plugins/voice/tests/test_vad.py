@@ -0,0 +1,90 @@
+"""frame_features and EnergyVAD on synthetic PCM."""
+
+import numpy as np
+import pytest
+
+from vad import FRAME_MS, EnergyVAD, frame_features
+
+RATE = 16000
+FRAME_LEN = RATE * FRAME_MS // 1000
+FRAME_BYTES = FRAME_LEN * 2
+
+
+def pcm(samples):
+    return np.asarray(samples, dtype=np.int16).tobytes()
+
+
+def tone(ms, amplitude=8000, hz=220):
+    t = np.arange(RATE * ms // 1000) / RATE
+    return pcm(amplitude * np.sin(2 * np.pi * hz * t))
+
+
+def silence(ms):
+    return b"\0\0" * (RATE * ms // 1000)
+
+
+# ─── frame_features ────────────────────────────────────────
+
+def test_rms_and_zcr_per_frame():
+    frames = pcm([1000] * FRAME_LEN + [1000, -1000] * (FRAME_LEN // 2) + [0] * FRAME_LEN)
+    rms, zcr = frame_features(frames, FRAME_LEN)
+    np.testing.assert_allclose(rms, [1000, 1000, 0])
+    np.testing.assert_allclose(zcr, [0, 1, 0])
+
+
+def test_incomplete_frames_are_ignored():
+    rms, zcr = frame_features(pcm([500] * (FRAME_LEN * 2 + 7)) + b"\1", FRAME_LEN)
+    assert len(rms) == len(zcr) == 2
+
+
+def test_stereo_is_averaged_to_mono():
+    # Opposite channels cancel out, equal channels do not
+    cancel = pcm([2000, -2000] * FRAME_LEN)
+    same = pcm([2000, 2000] * FRAME_LEN)
+    assert frame_features(cancel, FRAME_LEN, channels=2)[0].tolist() == [0]
+    assert frame_features(same, FRAME_LEN, channels=2)[0].tolist() == [2000]
+
+
+def test_empty_pcm():
+    rms, zcr = frame_features(b"", FRAME_LEN)
+    assert len(rms) == len(zcr) == 0
+
+
+# ─── EnergyVAD ─────────────────────────────────────────────
+
+@pytest.mark.parametrize("frame,speech", [
+    (tone(FRAME_MS), True),                               # loud and voiced
+    (silence(FRAME_MS), False),
+    (tone(FRAME_MS, amplitude=500), False),               # rms ~350: quiet hum
+    (tone(FRAME_MS, amplitude=500, hz=3000), True),       # same level, crosses zero often: "s"
+    (tone(FRAME_MS, amplitude=300, hz=3000), False),      # below half the threshold
+])
+def test_is_speech(frame, speech):
+    assert EnergyVAD(RATE).is_speech(frame) is speech
+
+
+def test_stops_after_trailing_silence():
+    vad = EnergyVAD(RATE, trailing_silence_ms=300)
+    audio = silence(600) + tone(300) + silence(600)
+    stops = [vad.update(audio[i:i + FRAME_BYTES]) for i in range(0, len(audio), FRAME_BYTES)]
+    # Leading silence never stops recording; 10 silent frames after speech do
+    assert stops.index(True) == 20 + 10 + 9
+    assert vad.heard_speech and not vad.last_speech
+
+
+def test_trim_keeps_padding_around_speech():
+    vad = EnergyVAD(RATE, trim_padding_ms=150)
+    audio = silence(900) + tone(600) + silence(900)
+    assert vad.trim(audio) == silence(150) + tone(600) + silence(150)
+
+
+def test_trim_without_speech_is_unchanged():
+    audio = silence(900) + tone(900, amplitude=100)
+    assert EnergyVAD(RATE).trim(audio) == audio
+
+
+def test_from_config():
+    vad = EnergyVAD.from_config({"sample_rate": 8000, "channels": 2,
+                                 "silence_threshold": 800, "trailing_silence_ms": 600})
+    assert (vad.frame_len, vad.frame_bytes) == (240, 960)
+    assert (vad.silence_threshold, vad.trailing_frames) == (800, 20)
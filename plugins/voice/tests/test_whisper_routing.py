@@ -0,0 +1,114 @@
+"""The whisper-server /inference client and short-clip model routing, against stand-in servers."""
+
+import http.server
+import json
+import socket
+import threading
+
+import pytest
+
+import transcribe
+from transcribe import encode_wav
+
+
+class FakeInference(http.server.BaseHTTPRequestHandler):
+    """/inference stand-in: records each upload and answers with self.server.reply."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.uploads.append((self.path, self.headers["Content-Type"], body))
+        fmt = "verbose_json" if b'name="response_format"\r\n\r\nverbose_json' in body else "json"
+        payload = json.dumps(self.server.reply[fmt]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(text, avg_logprob=None):
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeInference)
+        server.uploads = []
+        segments = [] if avg_logprob is None else [{"text": text, "avg_logprob": avg_logprob}]
+        server.reply = {"json": {"text": f" {text}\n"},
+                        "verbose_json": {"text": f" {text}\n", "segments": segments}}
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def stt_config(tmp_path, port, short_port=None, auto_start=False):
+    short_model = tmp_path / "ggml-base.bin"
+    short_model.touch()
+    return {"stt": {
+        "whisper_model": str(tmp_path / "ggml-large.bin"),
+        "server": {"port": port, "auto_start": auto_start, "request_timeout": 5},
+        "routing": {"enabled": short_port is not None, "short_model": str(short_model),
+                    "short_port": short_port or 0, "short_max_seconds": 5.0,
+                    "min_confidence": 0.5},
+    }}
+
+
+WAV = encode_wav(b"\0\0" * 16000, 16000)  # 1 s of silence
+
+
+def test_multipart_upload(tmp_path, serve):
+    main = serve("main model")
+    config = stt_config(tmp_path, main.server_port)
+    assert transcribe.transcribe_with_whisper_server(WAV, config) == "main model"
+
+    [(path, content_type, body)] = main.uploads
+    assert path == "/inference"
+    boundary = content_type.split("boundary=")[1]
+    assert content_type.startswith("multipart/form-data")
+    assert body.startswith(f"--{boundary}\r\n".encode())
+    assert body.endswith(f"\r\n--{boundary}--\r\n".encode())
+    assert b'name="response_format"\r\n\r\njson\r\n' in body
+    assert b'name="temperature"\r\n\r\n0.0\r\n' in body
+    assert (b'name="file"; filename="audio.wav"\r\nContent-Type: audio/wav\r\n\r\n'
+            + WAV + b"\r\n") in body
+
+
+def test_confident_short_clip_stays_on_small_model(tmp_path, serve):
+    main, small = serve("main model"), serve("small model", avg_logprob=-0.1)
+    config = stt_config(tmp_path, main.server_port, small.server_port)
+    assert transcribe.transcribe_with_whisper_server(WAV, config) == "small model"
+    assert len(small.uploads) == 1 and not main.uploads
+
+
+def test_low_confidence_escalates_to_main_model(tmp_path, serve):
+    main, small = serve("main model"), serve("small model", avg_logprob=-2.0)
+    config = stt_config(tmp_path, main.server_port, small.server_port)
+    assert transcribe.transcribe_with_whisper_server(WAV, config) == "main model"
+    assert len(small.uploads) == 1 and len(main.uploads) == 1
+
+
+def test_server_down_falls_back_to_cli(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(transcribe, "transcribe_with_whisper_cpp",
+                        lambda audio, model: calls.append((audio, model)) or "cli text")
+    monkeypatch.setattr(transcribe, "start_server",
+                        lambda settings, wait: calls.append(("start", settings["port"], wait)))
+    port = free_port()
+    config = stt_config(tmp_path, port, auto_start=True)
+
+    assert transcribe.transcribe_with_whisper_server(WAV, config) == "cli text"
+    assert calls == [("start", port, False), (WAV, config["stt"]["whisper_model"])]
@@ -0,0 +1,108 @@
+"""whisper-server pid files and launching, against stand-in processes."""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import whisper_server
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(whisper_server, "RUN_DIR", tmp_path)
+    return {**whisper_server.server_settings({}), "port": 18178}
+
+
+@pytest.fixture
+def fake_server(tmp_path, settings):
+    """A sleeping process whose command line looks like whisper-server's."""
+    binary = tmp_path / "whisper-server"
+    binary.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(30)\n")
+    binary.chmod(0o755)
+    proc = subprocess.Popen([str(binary), "--model", "m.bin", "--port", str(settings["port"])])
+    deadline = time.monotonic() + 5
+    while "--port" not in (whisper_server.command_line(proc.pid) or ""):
+        assert time.monotonic() < deadline, "stand-in did not start"
+        time.sleep(0.01)
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def test_read_pid_accepts_live_whisper_server(settings, fake_server):
+    whisper_server.pid_file(settings).write_text(str(fake_server.pid))
+    assert whisper_server.read_pid(settings) == fake_server.pid
+
+
+def test_read_pid_rejects_reused_pid(settings):
+    # The pid is alive but belongs to an unrelated process (this test run)
+    path = whisper_server.pid_file(settings)
+    path.write_text(str(os.getpid()))
+    assert whisper_server.read_pid(settings) is None
+    assert not path.exists()
+
+
+def test_read_pid_rejects_other_port(settings, fake_server):
+    other = {**settings, "port": settings["port"] + 1}
+    whisper_server.pid_file(other).write_text(str(fake_server.pid))
+    assert whisper_server.read_pid(other) is None
+
+
+def test_stop_leaves_unrelated_process_alone(settings, monkeypatch):
+    whisper_server.pid_file(settings).write_text(str(os.getpid()))
+    monkeypatch.setattr(whisper_server.os, "kill",
+                        lambda *a: pytest.fail("signalled an unrelated process"))
+    assert whisper_server.stop_server(settings) is False
+
+
+@pytest.fixture
+def launchable(tmp_path, settings):
+    """Settings whose binary is a stand-in that sleeps like a loading whisper-server."""
+    binary = tmp_path / "whisper-server"
+    binary.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(30)\n")
+    binary.chmod(0o755)
+    model = tmp_path / "model.bin"
+    model.touch()
+    yield {**settings, "binary": str(binary), "model": str(model)}
+    for proc in whisper_server._launched.values():
+        proc.kill()
+        proc.wait()
+    whisper_server._launched.clear()
+
+
+def test_concurrent_auto_starts_launch_one_server(launchable, monkeypatch):
+    launches = []
+    popen = subprocess.Popen
+
+    def counting_popen(*args, **kwargs):
+        launches.append(args[0])
+        time.sleep(0.05)  # widen the window between the pid check and the pid file
+        return popen(*args, **kwargs)
+
+    monkeypatch.setattr(whisper_server.subprocess, "Popen", counting_popen)
+    pids = []
+    threads = [threading.Thread(target=lambda: pids.append(whisper_server.start_server(launchable, wait=False)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(launches) == 1
+    assert len(set(pids)) == 1
+    assert whisper_server.read_pid(launchable) == pids[0]
+
+
+def test_server_started_elsewhere_is_not_duplicated(launchable, monkeypatch):
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        external = {**launchable, "port": listener.getsockname()[1]}
+        monkeypatch.setattr(whisper_server.subprocess, "Popen",
+                            lambda *a, **kw: pytest.fail("launched a second server"))
+        assert whisper_server.start_server(external) is None
+    assert not whisper_server.pid_file(external).exists()